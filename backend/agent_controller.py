@@ -1,22 +1,35 @@
 import json
 import time
 from typing import Dict, List, Any
+from card_tracker import CardTracker
+from card_codec import NUM_CARDS, card_name
+from event_store import EventStore
+
+STANDARD_CARDS = [card_name(i) for i in range(NUM_CARDS)]
 
 class AgentController:
-    def __init__(self):
+    def __init__(self, event_store: EventStore = None):
         self.game_state = {
             'current_turn': 'user',
             'round_number': 1,
             'game_phase': 'playing',  # playing, declaring, finished
-            'last_action': None,
-            'action_history': []
+            'last_action': None
         }
+        self._event_store = event_store   # events.db is opened on first use, not at import
         self.score_tracker = {
             'user': 0,
             'opponent': 0,
             'rounds_played': 0
         }
+        self.card_tracker = CardTracker()
+        self.last_suggested_action = None
     
+    @property
+    def event_store(self) -> EventStore:
+        if self._event_store is None:
+            self._event_store = EventStore()
+        return self._event_store
+
     def update_scores(self, user_score: int, opponent_score: int):
         """Update player scores"""
         self.score_tracker['user'] = user_score
@@ -31,27 +44,52 @@ class AgentController:
             'turn': self.game_state['current_turn'],
             'round': self.game_state['round_number']
         }
-        self.game_state['action_history'].append(action_entry)
+        # Full history goes to disk; only a bounded tail stays in memory
+        self.event_store.append(action_entry)
         self.game_state['last_action'] = action_entry
-        
-        # Keep only last 50 actions to prevent memory bloat
-        if len(self.game_state['action_history']) > 50:
-            self.game_state['action_history'] = self.game_state['action_history'][-50:]
+    
+    def recent_actions(self) -> List[Dict]:
+        """Most recent logged actions, oldest first"""
+        return self.event_store.recent_events()
+    
+    def update_turn(self, turn: str):
+        """Record a turn change detected from the screen"""
+        if turn != self.game_state['current_turn']:
+            self.game_state['current_turn'] = turn
+            self.log_action("turn_change", {'turn': turn})
+    
+    def observe_frame(self, hand_cards: List[str], discard_top: str = None):
+        """Feed one frame's detections into the card tracker"""
+        try:
+            self.card_tracker.update_from_frame(hand_cards, discard_top, self.game_state['current_turn'])
+        except Exception as e:
+            print(f"❌ Card tracking error: {e}")
     
     def suggest_optimal_action(self, hand_cards: List[str], melds: List[List[str]], 
-                              discard_pile: List[str], game_joker: str = None) -> Dict[str, Any]:
+                              discard_pile: List[str], game_joker: str = None,
+                              analysis: Dict[str, Any] = None) -> Dict[str, Any]:
         """Suggest optimal action based on current game state"""
         try:
-            # Calculate meld completion percentage
-            total_cards = len(hand_cards)
-            cards_in_melds = sum(len(meld) for meld in melds)
-            completion_percentage = (cards_in_melds / total_cards * 100) if total_cards > 0 else 0
-            
-            # Check for pure sequence
-            has_pure_sequence = any(self._is_pure_sequence(meld) for meld in melds)
+            if analysis is not None:
+                # Reuse the frame's meld analysis instead of recomputing it from the melds
+                completion_percentage = analysis['completion_percentage']
+                has_pure_sequence = analysis['has_pure_sequence']
+                meld_count = analysis['total_valid_melds']
+            else:
+                # Calculate meld completion percentage
+                total_cards = len(hand_cards)
+                cards_in_melds = sum(len(meld) for meld in melds)
+                completion_percentage = (cards_in_melds / total_cards * 100) if total_cards > 0 else 0
+                
+                # Check for pure sequence
+                has_pure_sequence = any(self._is_pure_sequence(meld) for meld in melds)
+                meld_count = len(melds)
             
+            # Chance that a blind draw fits the hand, from the cards still unseen
+            draw_odds = self.deck_help_probability(hand_cards)
+
             # Decision logic
-            if completion_percentage >= 80 and has_pure_sequence and len(melds) >= 2:
+            if completion_percentage >= 80 and has_pure_sequence and meld_count >= 2:
                 action = "Declare"
                 confidence = 0.9
                 reason = "High completion with valid melds - ready to declare"
@@ -67,21 +105,24 @@ class AgentController:
                     reason = f"Discard card {top_discard} helps complete sequences"
                 else:
                     action = "Pick from Deck"
-                    confidence = 0.6
-                    reason = "Discard doesn't help - try deck"
+                    confidence = min(0.9, 0.5 + draw_odds)
+                    reason = f"Discard doesn't help - {draw_odds:.0%} chance the deck card does"
             else:
                 action = "Pick from Deck"
                 confidence = 0.5
                 reason = "Standard play - pick from deck"
             
-            # Log the suggestion
-            self.log_action("ai_suggestion", {
-                'suggested_action': action,
-                'confidence': confidence,
-                'reason': reason,
-                'completion_percentage': completion_percentage,
-                'has_pure_sequence': has_pure_sequence
-            })
+            # Log a suggestion only when it changes: strategy runs every frame and the log is kept on disk
+            if action != self.last_suggested_action:
+                self.last_suggested_action = action
+                self.log_action("ai_suggestion", {
+                    'suggested_action': action,
+                    'confidence': confidence,
+                    'reason': reason,
+                    'completion_percentage': completion_percentage,
+                    'has_pure_sequence': has_pure_sequence,
+                    'draw_odds': draw_odds
+                })
             
             return {
                 'action': action,
@@ -89,6 +130,7 @@ class AgentController:
                 'reason': reason,
                 'completion_percentage': completion_percentage,
                 'has_pure_sequence': has_pure_sequence,
+                'draw_odds': draw_odds,
                 'timestamp': int(time.time() * 1000)
             }
             
@@ -103,6 +145,11 @@ class AgentController:
                 'timestamp': int(time.time() * 1000)
             }
     
+    def deck_help_probability(self, hand_cards: List[str]) -> float:
+        """Probability that the next card from the deck would help the hand's melds"""
+        return sum(self.card_tracker.draw_probability(card) for card in STANDARD_CARDS
+                   if self._card_helps_melds(card, hand_cards))
+
     def _is_pure_sequence(self, meld: List[str]) -> bool:
         """Check if meld is a pure sequence (no jokers)"""
         if len(meld) < 3:
@@ -182,7 +229,8 @@ class AgentController:
         return {
             'game_state': self.game_state.copy(),
             'score_tracker': self.score_tracker.copy(),
-            'actions_count': len(self.game_state['action_history']),
+            'card_tracker': self.card_tracker.get_summary(),
+            'actions_count': self.event_store.count,
             'last_action_time': self.game_state['last_action']['timestamp'] if self.game_state['last_action'] else None
         }
     
@@ -192,9 +240,10 @@ class AgentController:
             'current_turn': 'user',
             'round_number': 1,
             'game_phase': 'playing',
-            'last_action': None,
-            'action_history': []
+            'last_action': None
         }
         self.score_tracker['rounds_played'] += 1
+        self.card_tracker.reset()
+        self.last_suggested_action = None
         self.log_action("game_reset", {'reason': 'New game started'})
 
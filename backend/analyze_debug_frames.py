@@ -1,42 +1,188 @@
 import cv2
 import os
+import csv
+import json
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Tuple
 
 DEBUG_DIR = "debug_frames"
+CACHE_DIR = ".frame_cache"
+OUTPUT_BASE = "frame_analysis"
 
-def analyze_frames():
+DEFAULT_PARAMS = {
+    'canny_low': 50,
+    'canny_high': 150,
+    'epsilon': 0.02,
+    'min_w': 40, 'max_w': 250,
+    'min_h': 60, 'max_h': 350
+}
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(content_hash: str, params: Dict[str, Any]) -> str:
+    return os.path.join(CACHE_DIR, f"{content_hash}_{params_key(params)}.json")
+
+
+def detect_card_boxes(gray, params: Dict[str, Any], edges_cache: Dict[Tuple[int, int], Any]) -> List[Tuple[int, int, int, int]]:
+    """Canny + contour box detection; edge maps are shared between settings with equal thresholds"""
+    edge_key = (params['canny_low'], params['canny_high'])
+    if edge_key not in edges_cache:
+        edges_cache[edge_key] = cv2.Canny(gray, *edge_key)
+    contours, _ = cv2.findContours(edges_cache[edge_key], cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    card_boxes = []
+    for cnt in contours:
+        approx = cv2.approxPolyDP(cnt, params['epsilon'] * cv2.arcLength(cnt, True), True)
+        x, y, w, h = cv2.boundingRect(approx)
+        if (len(approx) == 4 and params['min_w'] < w < params['max_w']
+                and params['min_h'] < h < params['max_h']):
+            card_boxes.append((x, y, w, h))
+    return card_boxes
+
+
+def process_frame(frame_path: str, content_hash: str, param_sets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Decode one frame once and evaluate every pending parameter set on it"""
+    frame = cv2.imread(frame_path)
+    if frame is None:
+        print(f"[WARNING] Could not read {frame_path}")
+        return []
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    edges_cache = {}
+    results = []
+    for params in param_sets:
+        boxes = detect_card_boxes(gray, params, edges_cache)
+        result = {
+            'frame': os.path.basename(frame_path),
+            'content_hash': content_hash,
+            'params_key': params_key(params),
+            'params': params,
+            'card_count': len(boxes),
+            'boxes': boxes
+        }
+        with open(cache_path(content_hash, params), 'w') as f:
+            json.dump(result, f)
+        results.append(result)
+    return results
+
+
+def param_grid(sweeps: List[str]) -> List[Dict[str, Any]]:
+    """Expand 'name=v1,v2' sweep specs into the cartesian product over DEFAULT_PARAMS"""
+    axes = {}
+    for spec in sweeps or []:
+        name, sep, values = spec.partition('=')
+        if not sep:
+            raise ValueError(f"Sweep '{spec}' is not of the form PARAM=V1,V2")
+        if name not in DEFAULT_PARAMS:
+            raise ValueError(f"Unknown parameter '{name}'")
+        cast = type(DEFAULT_PARAMS[name])
+        try:
+            axes[name] = [cast(v) for v in values.split(',')]
+        except ValueError:
+            raise ValueError(f"Sweep '{spec}' needs {cast.__name__} values") from None
+    names = list(axes)
+    return [dict(DEFAULT_PARAMS, **dict(zip(names, combo)))
+            for combo in itertools.product(*(axes[n] for n in names))] or [dict(DEFAULT_PARAMS)]
+
+
+def write_results(results: List[Dict[str, Any]], output_format: str, base: str = OUTPUT_BASE) -> str:
+    """Write results as JSON, CSV, or columnar (Parquet when pyarrow is present, else .npz)"""
+    flat = [{'frame': r['frame'], 'params_key': r['params_key'], 'card_count': r['card_count'],
+             **r['params'], 'boxes': json.dumps(r['boxes'])} for r in results]
+    if output_format == 'json':
+        path = f"{base}.json"
+        with open(path, 'w') as f:
+            json.dump(results, f, indent=1)
+    elif output_format == 'csv':
+        path = f"{base}.csv"
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=list(flat[0]) if flat else ['frame'])
+            writer.writeheader()
+            writer.writerows(flat)
+    else:
+        columns = {key: [row[key] for row in flat] for key in (flat[0] if flat else {})}
+        try:
+            import pyarrow
+            import pyarrow.parquet as pq
+            path = f"{base}.parquet"
+            pq.write_table(pyarrow.table(columns), path)
+        except ImportError:
+            import numpy as np
+            path = f"{base}.npz"
+            np.savez_compressed(path, **{k: np.asarray(v) for k, v in columns.items()})
+    return path
+
+
+def analyze_frames(sweeps: List[str] = None, workers: int = None, output_format: str = 'json',
+                   verbose: bool = False) -> List[Dict[str, Any]]:
     if not os.path.exists(DEBUG_DIR):
         print(f"[ERROR] Debug directory '{DEBUG_DIR}' not found.")
-        return
+        return []
 
-    frames = [f for f in os.listdir(DEBUG_DIR) if f.endswith('.jpg')]
+    frames = sorted(f for f in os.listdir(DEBUG_DIR) if f.endswith('.jpg'))
     if not frames:
         print("[INFO] No debug frames found.")
-        return
+        return []
 
-    print(f"[INFO] Analyzing {len(frames)} frames from '{DEBUG_DIR}'...\n")
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    param_sets = param_grid(sweeps)
+    print(f"[INFO] Analyzing {len(frames)} frames x {len(param_sets)} parameter sets from '{DEBUG_DIR}'...")
 
-    for frame_name in sorted(frames):
+    results, pending = [], []
+    for frame_name in frames:
         frame_path = os.path.join(DEBUG_DIR, frame_name)
-        frame = cv2.imread(frame_path)
-        if frame is None:
-            print(f"[WARNING] Could not read {frame_name}")
-            continue
-
-        # Convert to grayscale & detect edges
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        content_hash = file_hash(frame_path)
+        todo = []
+        for params in param_sets:
+            cached = cache_path(content_hash, params)
+            if os.path.exists(cached):
+                with open(cached) as f:
+                    result = json.load(f)
+                result['frame'] = frame_name
+                results.append(result)
+            else:
+                todo.append(params)
+        if todo:
+            pending.append((frame_path, content_hash, todo))
 
-        card_boxes = []
-        for cnt in contours:
-            approx = cv2.approxPolyDP(cnt, 0.02 * cv2.arcLength(cnt, True), True)
-            x, y, w, h = cv2.boundingRect(approx)
-            if len(approx) == 4 and 40 < w < 250 and 60 < h < 350:
-                card_boxes.append((x, y, w, h))
+    print(f"[INFO] {len(results)} results from cache, {sum(len(p[2]) for p in pending)} to compute")
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for frame_results in pool.map(process_frame, *zip(*pending)):
+                results.extend(frame_results)
 
-        print(f"Frame: {frame_name} | Cards Detected: {len(card_boxes)} | Boxes: {card_boxes}")
+    results.sort(key=lambda r: (r['params_key'], r['frame']))
+    if verbose:
+        for r in results:
+            print(f"Frame: {r['frame']} | Params: {r['params_key']} | Cards Detected: {r['card_count']} | Boxes: {r['boxes']}")
+    path = write_results(results, output_format)
+    print(f"\n[INFO] Analysis complete. Results written to {path}. Tune parameters if detection is inaccurate.")
+    return results
 
-    print("\n[INFO] Analysis complete. Tune parameters if detection is inaccurate.")
 
 if __name__ == "__main__":
-    analyze_frames()
+    parser = argparse.ArgumentParser(description="Batch card-box analysis over debug frames")
+    parser.add_argument("--sweep", action="append", metavar="PARAM=V1,V2",
+                        help=f"sweep a parameter; any of {', '.join(DEFAULT_PARAMS)}")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--format", choices=['json', 'csv', 'columnar'], default='json')
+    parser.add_argument("--verbose", action="store_true", help="print the boxes for every frame")
+    args = parser.parse_args()
+    try:
+        param_grid(args.sweep)
+    except ValueError as e:
+        parser.error(str(e))
+    analyze_frames(args.sweep, args.workers, args.format, args.verbose)
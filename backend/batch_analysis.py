@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+from card_codec import NUM_CARDS, NUM_SLOTS, JOKER_INDEX, encode_cards, parse_card
+from sampling_profiler import install_signal_trigger
+
+# Deadwood points per rank: A, J, Q, K count 10, the rest their face value
+RANK_POINTS = np.array([10, 2, 3, 4, 5, 6, 7, 8, 9, 10, 10, 10, 10], dtype=np.int32)
+PARALLEL_THRESHOLD = 200_000
+CHUNK_SIZE = 50_000
+JOKER_RANK = 10   # 'JK' parses as rank 'J', suit 'K' in the per-hand analysis
+
+
+def encode_hands(hands: List[List[str]], jokers: List[str] = None, width: int = 14):
+    """Encode card-string hands into a padded (N, width) int16 array plus a joker column"""
+    encoded = np.full((len(hands), width), -1, dtype=np.int16)
+    for row, hand in enumerate(hands):
+        indices = encode_cards(hand)[:width]
+        encoded[row, :len(indices)] = indices
+    joker_col = np.full(len(hands), -1, dtype=np.int16)
+    if jokers is not None:
+        joker_col[:] = [parse_card(j) if j else -1 for j in jokers]
+    return encoded, joker_col
+
+
+def _card_counts(hands: np.ndarray) -> np.ndarray:
+    """Per-hand slot counts as an (N, 53) array"""
+    n = hands.shape[0]
+    valid = hands >= 0
+    flat = (hands.astype(np.int64) + np.arange(n, dtype=np.int64)[:, None] * NUM_SLOTS)[valid]
+    return np.bincount(flat, minlength=n * NUM_SLOTS).reshape(n, NUM_SLOTS)
+
+
+def _analyze_chunk(hands: np.ndarray, jokers: np.ndarray) -> Dict[str, np.ndarray]:
+    """Vectorized meld analysis with the same rules as StrategyEmitter.analyze_meld_structure.
+
+    The per-hand rules are reproduced as they are, quirks included: a duplicate
+    card ends a run (its sorted scan needs every next card one rank higher), the
+    printed joker 'JK' parses as a jack of a fifth suit 'K' and so can complete a
+    set of jacks, and a set takes only the first four cards of its rank in hand order.
+    """
+    n, width = hands.shape
+    valid = hands >= 0
+    counts = _card_counts(hands)
+    grid = counts[:, :NUM_CARDS].reshape(-1, 4, 13)
+    present = grid > 0
+    single = grid == 1
+    linked = present[:, :, :12] & present[:, :, 1:]   # a run can step from rank r to r + 1
+
+    # Run length ending at the first copy of each rank and starting at its last copy;
+    # the two copies of a duplicated rank belong to different runs
+    ends = np.zeros(present.shape, dtype=np.int8)
+    starts = np.zeros(present.shape, dtype=np.int8)
+    ends[:, :, 0] = present[:, :, 0]
+    starts[:, :, 12] = present[:, :, 12]
+    for r in range(1, 13):
+        carried = np.where(single[:, :, r - 1], ends[:, :, r - 1], 1) * linked[:, :, r - 1]
+        ends[:, :, r] = (carried + 1) * present[:, :, r]
+        q = 12 - r
+        carried = np.where(single[:, :, q + 1], starts[:, :, q + 1], 1) * linked[:, :, q]
+        starts[:, :, q] = (carried + 1) * present[:, :, q]
+    continues = np.zeros(present.shape, dtype=bool)
+    continues[:, :, :12] = linked & single[:, :, :12]
+    run_ends = present & ~continues & (ends >= 3)
+    sequences = run_ends.sum(axis=(1, 2))
+    run_length = np.where(single, ends.astype(np.int16) + starts - 1, np.maximum(ends, starts))
+    in_sequence = present & (run_length >= 3)
+
+    # Sets: three distinct suits of a rank, the joker adding suit 'K' to the jacks
+    suits = present.sum(axis=1)
+    suits[:, JOKER_RANK] += counts[:, JOKER_INDEX] > 0
+    set_ranks = suits >= 3
+    sets = set_ranks.sum(axis=1)
+    ranks = np.where(hands == JOKER_INDEX, JOKER_RANK, np.maximum(hands, 0) % 13)
+    same_rank = (ranks[:, :, None] == ranks[:, None, :]) & valid[:, None, :]
+    earlier = (same_rank & np.tri(width, k=-1, dtype=bool)).sum(axis=2)
+    in_set = valid & (earlier < 4) & np.take_along_axis(set_ranks, ranks, axis=1)
+
+    used = np.zeros((n, NUM_SLOTS), dtype=bool)
+    used[:, :NUM_CARDS] = in_sequence.reshape(n, NUM_CARDS)
+    rows, cols = np.nonzero(in_set)
+    used[rows, hands[rows, cols]] = True
+
+    cards_in_melds = used.sum(axis=1)
+    total_cards = counts.sum(axis=1)
+    floating = np.where(used, 0, counts)
+    floating_count = floating.sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(total_cards > 0, cards_in_melds / np.maximum(total_cards, 1), 0.0)
+    completion = np.minimum(100, np.floor(ratio * 100)).astype(np.int16)
+
+    points = np.zeros((len(hands), NUM_SLOTS), dtype=np.int32)
+    points[:, :NUM_CARDS] = np.tile(RANK_POINTS, 4)
+    joker_rank = np.where((jokers >= 0) & (jokers < NUM_CARDS), jokers % 13, -1)
+    wild = (np.arange(NUM_CARDS) % 13)[None, :] == joker_rank[:, None]
+    points[:, :NUM_CARDS][wild] = 0
+    points[:, JOKER_INDEX] = 0
+    deadwood = (floating * points).sum(axis=1)
+
+    has_pure = sequences > 0
+    valid_melds = sequences + sets
+    return {
+        'deadwood': deadwood.astype(np.int32),
+        'sequences': sequences.astype(np.int16),
+        'sets': sets.astype(np.int16),
+        'cards_in_melds': cards_in_melds.astype(np.int16),
+        'floating_count': floating_count.astype(np.int16),
+        'completion_percentage': completion,
+        'has_pure_sequence': has_pure,
+        'can_declare': has_pure & (valid_melds >= 2) & (completion >= 80)
+    }
+
+
+def analyze_many(hands: np.ndarray, jokers: np.ndarray = None, workers: int = None,
+                 chunk_size: int = CHUNK_SIZE) -> Dict[str, np.ndarray]:
+    """Analyze an (N, H) array of encoded hands and return columnar results"""
+    hands = np.asarray(hands, dtype=np.int16)
+    if jokers is None:
+        jokers = np.full(len(hands), -1, dtype=np.int16)
+    jokers = np.asarray(jokers, dtype=np.int16)
+
+    if workers is None:
+        workers = (os.cpu_count() or 1) if len(hands) >= PARALLEL_THRESHOLD else 1
+    if workers <= 1 or len(hands) <= chunk_size:
+        return _analyze_chunk(hands, jokers)
+
+    bounds = range(0, len(hands), chunk_size)
+    with ProcessPoolExecutor(max_workers=workers, initializer=install_signal_trigger) as pool:
+        parts = list(pool.map(_analyze_chunk,
+                              [hands[i:i + chunk_size] for i in bounds],
+                              [jokers[i:i + chunk_size] for i in bounds]))
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def random_hands(n: int, hand_size: int = 13, decks: int = 2, seed: int = 0):
+    """Deal n random hands from a multi-deck shoe, for benchmarking"""
+    rng = np.random.default_rng(seed)
+    shoe = np.concatenate([np.arange(NUM_CARDS)] * decks + [np.full(decks, JOKER_INDEX)]).astype(np.int16)
+    keys = rng.random((n, len(shoe)))
+    hands = shoe[np.argpartition(keys, hand_size, axis=1)[:, :hand_size]]
+    jokers = rng.integers(0, NUM_CARDS, n).astype(np.int16)
+    return hands, jokers
+
+
+def parity_mismatches(hands: np.ndarray, jokers: np.ndarray) -> int:
+    """Count hands where analyze_many and StrategyEmitter.analyze_meld_structure disagree"""
+    from strategy_emitter import StrategyEmitter
+    from card_codec import card_name
+
+    emitter = StrategyEmitter()
+    batch = _analyze_chunk(np.asarray(hands, dtype=np.int16), np.asarray(jokers, dtype=np.int16))
+    mismatches = 0
+    for row, encoded in enumerate(hands):
+        single = emitter.analyze_meld_structure([card_name(i) for i in encoded if i >= 0])
+        expected = (len(single['sequences']), len(single['sets']), single['cards_in_melds'],
+                    single['floating_count'], single['completion_percentage'],
+                    single['has_pure_sequence'], single['can_declare'])
+        got = tuple(batch[key][row].item() for key in ('sequences', 'sets', 'cards_in_melds', 'floating_count',
+                                                       'completion_percentage', 'has_pure_sequence',
+                                                       'can_declare'))
+        mismatches += got != expected
+    return mismatches
+
+
+def run_benchmark(n: int, workers: int = None, baseline: int = 2000) -> bool:
+    """Print batch throughput against the per-hand StrategyEmitter path; False if the two disagree"""
+    from strategy_emitter import StrategyEmitter
+    from card_codec import card_name
+
+    hands, jokers = random_hands(n)
+    start = time.perf_counter()
+    analyze_many(hands, jokers, workers=workers)
+    batch_elapsed = time.perf_counter() - start
+
+    emitter = StrategyEmitter()
+    sample = [[card_name(i) for i in row] for row in hands[:baseline]]
+    start = time.perf_counter()
+    for hand in sample:
+        emitter.emit_strategy_analysis(hand)
+    single_elapsed = time.perf_counter() - start
+
+    print(f"📊 analyze_many: {n} hands in {batch_elapsed:.3f}s -> {n / batch_elapsed:,.0f} hands/s")
+    print(f"📊 emit_strategy_analysis: {len(sample)} hands in {single_elapsed:.3f}s "
+          f"-> {len(sample) / single_elapsed:,.0f} hands/s")
+    mismatches = parity_mismatches(hands[:baseline], jokers[:baseline])
+    print(f"{'✅' if not mismatches else '❌'} Parity with analyze_meld_structure: "
+          f"{mismatches}/{len(sample)} hands differ")
+    return not mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch hand-evaluation throughput benchmark")
+    parser.add_argument("--hands", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    sys.exit(0 if run_benchmark(args.hands, args.workers) else 1)
@@ -0,0 +1,105 @@
+import time
+import configparser
+from typing import Any, Dict, List, Optional
+
+CONFIG_FILE = 'config.ini'
+HAND_SIZE = 13
+DEFAULT_SCHEDULE = {
+    'fast_interval': 0.25,       # our turn, or just after the table changed
+    'normal_interval': 1.0,      # opponent's turn with nothing moving
+    'idle_interval': 2.5,        # no cards on screen (lobby, menus)
+    'results_interval': 4.0,     # declaring / round results
+    'screen_off_interval': 5.0,  # device screen off: check the screen, do not capture
+    'fast_hold': 4.0,            # seconds a change keeps the fast rate
+    'idle_after': 5,             # frames without a hand on screen before slowing down
+    'min_hand_cards': 7,         # fewer detected cards than this is not a game table
+    'dark_level': 12.0           # mean frame brightness below which the screen counts as off
+}
+MODES = ('fast', 'normal', 'idle', 'results', 'screen_off')
+
+
+def load_schedule_config(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Capture rates from the [SCHEDULER] section of config.ini"""
+    config = dict(DEFAULT_SCHEDULE)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('SCHEDULER'):
+        for key, default in config.items():
+            if parser.has_option('SCHEDULER', key):
+                config[key] = type(default)(parser.get('SCHEDULER', key))
+    return config
+
+
+class CaptureScheduler:
+    """Chooses the next capture interval from the game phase and how recently the table changed.
+
+    The turn is read off the hand itself: a 14th card means we drew, a new
+    discard under a 13-card hand means the opponent just played, and going
+    back to 13 cards means we discarded. The phase comes from the agent's
+    game_state. Our turn and fresh changes run fast; an unchanged opponent
+    turn runs at the normal rate; menus, results and a dark screen back off.
+    """
+
+    def __init__(self, **settings):
+        self.settings = dict(DEFAULT_SCHEDULE, **settings)
+        self.mode = 'normal'
+        self.turn: Optional[str] = None
+        self.last_hand: frozenset = frozenset()
+        self.last_discard: Optional[str] = None
+        self.last_hand_size = 0
+        self.last_change = 0.0
+        self.frames_without_cards = 0
+        self.changes = 0
+        self.mode_frames = dict.fromkeys(MODES, 0)
+
+    def observe(self, hand: List[str], discard: Optional[str], brightness: float,
+                game_state: Dict[str, Any] = None, now: float = None, moving: bool = False) -> str:
+        """Update from one analysed frame and return the new mode; `moving` keeps the fast rate
+        while cards are animating so the settled frame is captured soon"""
+        now = time.monotonic() if now is None else now
+        s = self.settings
+        game_state = game_state or {}
+
+        hand_set = frozenset(hand)
+        discard_changed = discard is not None and discard != self.last_discard
+        if hand_set != self.last_hand or discard_changed:
+            self.last_change = now
+            self.changes += 1
+        elif moving:
+            self.last_change = now
+        # Counts other than 13 and 14 are misdetections and say nothing about the turn
+        if len(hand) == HAND_SIZE + 1:
+            self.turn = 'user'               # drew a card, a discard is due
+        elif discard_changed and len(hand) == HAND_SIZE and self.last_hand_size == HAND_SIZE:
+            self.turn = 'user'               # the opponent's discard just landed
+        elif len(hand) == HAND_SIZE and self.last_hand_size == HAND_SIZE + 1:
+            self.turn = 'opponent'           # we discarded
+        table = len(hand) >= s['min_hand_cards']
+        self.frames_without_cards = 0 if table else self.frames_without_cards + 1
+        self.last_hand, self.last_discard, self.last_hand_size = hand_set, discard, len(hand)
+
+        if brightness < s['dark_level']:
+            mode = 'screen_off'
+        elif game_state.get('game_phase') in ('declaring', 'finished'):
+            mode = 'results'
+        elif self.frames_without_cards >= s['idle_after']:
+            mode = 'idle'
+        elif self.turn == 'user' or now - self.last_change < s['fast_hold']:
+            mode = 'fast'
+        else:
+            mode = 'normal'
+        self.mode = mode
+        self.mode_frames[mode] += 1
+        return mode
+
+    def interval(self) -> float:
+        return self.settings[f'{self.mode}_interval']
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'mode': self.mode,
+            'interval': self.interval(),
+            'turn': self.turn,
+            'changes': self.changes,
+            'modeFrames': dict(self.mode_frames)
+        }
@@ -0,0 +1,134 @@
+import configparser
+import cv2
+import numpy as np
+from typing import Dict, List, Tuple
+
+from card_codec import JOKER_INDEX, parse_card
+
+CONFIG_FILE = 'config.ini'
+DEFAULT_CASCADE = {
+    'enabled': True,
+    'min_paper': 0.5,      # card paper in the ROI, as a multiple of one template's area
+    'min_red': 0.005,      # red ink per pixel of card paper
+    'min_black': 0.01,     # black ink per pixel of card paper
+    'min_face': 0.0        # court-card artwork colours (yellow, blue) per pixel of card paper; 0 = stage off
+}
+STAGES = ('paper', 'colour', 'face')
+RED_SUITS = (1, 2)         # SUITS index of hearts and diamonds in card_codec
+FACE_RANKS = (10, 11, 12)  # RANKS index of J, Q, K
+INK_REACH = 5              # pixels around card paper that still count as printed on it
+
+
+def load_cascade_config(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Cascade thresholds from the [CASCADE] section of config.ini"""
+    config = dict(DEFAULT_CASCADE)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('CASCADE'):
+        for key, default in config.items():
+            if not parser.has_option('CASCADE', key):
+                continue
+            if isinstance(default, bool):
+                config[key] = parser.getboolean('CASCADE', key)
+            else:
+                config[key] = type(default)(parser.get('CASCADE', key))
+    return config
+
+
+def roi_features(roi: np.ndarray) -> Dict[str, float]:
+    """Share of the ROI that is card paper, and red, black and artwork-coloured ink per paper pixel.
+
+    Computed at half resolution from one HSV pass; only ink within INK_REACH of
+    paper counts, so the felt, the dark background and coloured UI do not look
+    like cards. Ink is relative to paper so the thresholds hold whether the
+    cards fill the ROI or are a small part of it.
+    """
+    small = cv2.pyrDown(roi)
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    h, s, v = hsv[..., 0], hsv[..., 1], hsv[..., 2]
+    paper = (v > 170) & (s < 50)
+    reach = cv2.getStructuringElement(cv2.MORPH_RECT, (INK_REACH, INK_REACH))
+    on_paper = cv2.dilate(paper.view(np.uint8), reach).view(bool)
+    saturated = (s > 90) & (v > 60) & on_paper
+    red = saturated & ((h < 10) | (h > 170))
+    art = saturated & (((h >= 15) & (h <= 35)) | ((h >= 95) & (h <= 130)))
+    black = (v < 90) & on_paper
+    paper_pixels = max(int(paper.sum()), 1)
+    return {
+        'paper': float(paper.mean()),
+        'red': float(red.sum()) / paper_pixels,
+        'black': float(black.sum()) / paper_pixels,
+        'face': float(art.sum()) / paper_pixels
+    }
+
+
+class TemplateTraits:
+    """Per-template columns for the cascade: suit colour and court-card flags, and area"""
+
+    def __init__(self, scaled: List[Tuple[str, np.ndarray]]):
+        self.scaled = scaled
+        indices = np.array([parse_card(name) for name, _ in scaled])
+        known = (indices >= 0) & (indices != JOKER_INDEX)
+        self.red = known & np.isin(indices // 13, RED_SUITS)
+        self.black = known & ~self.red
+        self.face = known & np.isin(indices % 13, FACE_RANKS)
+        self.area = np.array([template.shape[0] * template.shape[1] for _, template in scaled], dtype=np.float64)
+
+
+class CardCascade:
+    """Cheap ROI colour tests that rule templates out before any correlation runs.
+
+    Stages run in order on a boolean mask over all templates at once: 'paper'
+    drops templates larger than the visible card paper, 'colour' drops red or
+    black suits without matching ink, and 'face' drops J/Q/K without artwork
+    colours. Each stage counts the candidates it saw and rejected.
+    """
+
+    def __init__(self, min_paper: float = 0.5, min_red: float = 0.005, min_black: float = 0.01,
+                 min_face: float = 0.0, **_):
+        self.min_paper = min_paper
+        self.min_red = min_red
+        self.min_black = min_black
+        self.min_face = min_face
+        self.traits: Dict[int, TemplateTraits] = {}
+        self.tested = dict.fromkeys(STAGES, 0)
+        self.rejected = dict.fromkeys(STAGES, 0)
+
+    def _traits(self, scaled: List[Tuple[str, np.ndarray]]) -> TemplateTraits:
+        # TemplateBank.scaled returns the same list for an ROI shape, so key on its identity
+        traits = self.traits.get(id(scaled))
+        if traits is None or traits.scaled is not scaled:
+            traits = self.traits[id(scaled)] = TemplateTraits(scaled)
+        return traits
+
+    def prune(self, roi: np.ndarray, scaled: List[Tuple[str, np.ndarray]]) -> List[Tuple[str, np.ndarray]]:
+        """Templates of `scaled` that can still be in this BGR ROI"""
+        if not scaled:
+            return scaled
+        traits = self._traits(scaled)
+        features = roi_features(roi)
+        roi_area = roi.shape[0] * roi.shape[1]
+        keep = np.ones(len(scaled), dtype=bool)
+        checks = {
+            'paper': features['paper'] * roi_area >= self.min_paper * traits.area,
+            'colour': ~((traits.red & (features['red'] < self.min_red))
+                        | (traits.black & (features['black'] < self.min_black))),
+            'face': ~(traits.face & (features['face'] < self.min_face))
+        }
+        for stage in STAGES:
+            self.tested[stage] += int(keep.sum())
+            passed = keep & checks[stage]
+            self.rejected[stage] += int(keep.sum() - passed.sum())
+            keep = passed
+        return [entry for entry, kept in zip(scaled, keep) if kept]
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """Candidates seen and rejected per stage since start-up"""
+        return {
+            stage: {
+                'tested': self.tested[stage],
+                'rejected': self.rejected[stage],
+                'rejectRate': self.rejected[stage] / self.tested[stage] if self.tested[stage] else 0.0
+            }
+            for stage in STAGES
+        }
@@ -0,0 +1,52 @@
+from typing import List, Optional
+
+RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+SUITS = ['S', 'H', 'D', 'C']
+NUM_CARDS = 52
+JOKER_INDEX = 52  # printed joker
+NUM_SLOTS = 53
+
+SUIT_ALIASES = {
+    'S': 'S', 'H': 'H', 'D': 'D', 'C': 'C',
+    '♠': 'S', '♥': 'H', '♦': 'D', '♣': 'C',
+    'spades': 'S', 'hearts': 'H', 'diamonds': 'D', 'clubs': 'C'
+}
+RANK_INDEX = {rank: i for i, rank in enumerate(RANKS)}
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+
+
+def parse_card(card: str) -> int:
+    """Convert a card string ('10C', '5♦', 'A_spades', 'JK') to a slot index, or -1"""
+    if not card:
+        return -1
+    card = card.strip()
+    if card.upper() in ('JK', 'JOKER'):
+        return JOKER_INDEX
+    if '_' in card:
+        rank, suit = card.split('_', 1)
+        suit = SUIT_ALIASES.get(suit.lower())
+    else:
+        rank, suit = card[:-1], SUIT_ALIASES.get(card[-1].upper(), SUIT_ALIASES.get(card[-1]))
+    rank = rank.upper()
+    if rank not in RANK_INDEX or suit is None:
+        return -1
+    return SUIT_INDEX[suit] * 13 + RANK_INDEX[rank]
+
+
+def card_name(index: int) -> Optional[str]:
+    """Convert a slot index back to the canonical card string"""
+    if index == JOKER_INDEX:
+        return 'JK'
+    if 0 <= index < NUM_CARDS:
+        return f"{RANKS[index % 13]}{SUITS[index // 13]}"
+    return None
+
+
+def normalize_card(card: str) -> Optional[str]:
+    """Return the canonical form of a card string, or None if it cannot be parsed"""
+    return card_name(parse_card(card))
+
+
+def encode_cards(cards: List[str]) -> List[int]:
+    """Encode card strings to slot indices, dropping anything unparseable"""
+    return [i for i in (parse_card(c) for c in cards) if i >= 0]
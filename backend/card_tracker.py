@@ -0,0 +1,169 @@
+import numpy as np
+from typing import Dict, List, Optional, Any
+from card_codec import NUM_CARDS, NUM_SLOTS, JOKER_INDEX, RANK_INDEX, parse_card, card_name
+
+
+class CardTracker:
+    """Incremental card-counting state built from per-frame hand and discard observations.
+
+    Every array is indexed by card slot (see card_codec), so all queries are O(1)
+    lookups rather than replays of the action history.
+    """
+
+    def __init__(self, decks: int = 2, jokers_per_deck: int = 1, num_opponents: int = 1):
+        self.decks = decks
+        self.jokers_per_deck = jokers_per_deck
+        self.num_opponents = num_opponents
+        self.reset()
+
+    def reset(self):
+        """Forget everything seen so far (new deal)"""
+        self.total = np.full(NUM_SLOTS, self.decks, dtype=np.int16)
+        self.total[JOKER_INDEX] = self.decks * self.jokers_per_deck
+        self.remaining = self.total.copy()
+        self.rank_remaining = self.total[:NUM_CARDS].reshape(4, 13).sum(axis=0).astype(np.int16)
+        self.unseen_total = int(self.total.sum())
+        self.opponent_picked = np.zeros((self.num_opponents, NUM_SLOTS), dtype=np.uint8)
+        self.opponent_ignored = np.zeros((self.num_opponents, NUM_SLOTS), dtype=np.uint8)
+        self.hand = np.zeros(NUM_SLOTS, dtype=np.int16)
+        self.missing = np.zeros(NUM_SLOTS, dtype=np.int16)
+        self.discard_top = -1
+        self.discard_pile: List[int] = []   # tops in the order they were seen, newest last
+        self.frames_seen = 0
+
+    def _mark_seen(self, index: int, count: int = 1):
+        """Remove copies of a card from the unseen pool"""
+        count = min(int(count), int(self.remaining[index]))
+        if count <= 0:
+            return
+        self.remaining[index] -= count
+        if index < NUM_CARDS:
+            self.rank_remaining[index % 13] -= count
+        self.unseen_total -= count
+
+    def _encode_hand(self, hand_cards: List[str]) -> np.ndarray:
+        # Detection reports one entry per matching template, so treat the hand as presence
+        indices = {i for i in (parse_card(c) for c in hand_cards) if i >= 0}
+        hand = np.zeros(NUM_SLOTS, dtype=np.int16)
+        if indices:
+            hand[list(indices)] = 1
+        return hand
+
+    def update_from_frame(self, hand_cards: List[str], discard_top: Optional[str] = None,
+                          current_turn: str = 'user', opponent: int = 0):
+        """Fold one frame's detected hand and discard top into the counting state.
+
+        `current_turn` is the turn in force when the frame was captured. On the
+        opponent's turn a discard top that gives way to the card beneath it was
+        picked by them; one covered by a new card was let pass.
+        """
+        hand = self._encode_hand(hand_cards)
+        top = parse_card(discard_top) if discard_top else -1
+        prev_top = self.discard_top
+
+        if self.frames_seen == 0:
+            for index in np.flatnonzero(hand):
+                self._mark_seen(int(index), int(hand[index]))
+            if top >= 0:
+                self._mark_seen(top)
+                self.discard_pile.append(top)
+        else:
+            gained = np.clip(hand - self.hand, 0, None)
+            lost = np.clip(self.hand - hand, 0, None)
+
+            # Picked the previous discard top: that copy was already counted
+            if prev_top >= 0 and top != prev_top and gained[prev_top] > 0:
+                gained[prev_top] -= 1
+
+            if gained.sum() > 2:
+                # Redeal or detection jump: resync without double counting
+                seen = self.total - self.remaining
+                deficit = np.clip(hand - seen, 0, None)
+                for index in np.flatnonzero(deficit):
+                    self._mark_seen(int(index), int(deficit[index]))
+            else:
+                for index in np.flatnonzero(gained):
+                    # A card that briefly dropped out of detection is not a new copy
+                    recovered = min(int(gained[index]), int(self.missing[index]))
+                    self.missing[index] -= recovered
+                    self._mark_seen(int(index), int(gained[index]) - recovered)
+
+            pile_top = self.discard_pile[-1] if self.discard_pile else -1
+            if top >= 0 and top != pile_top:
+                if len(self.discard_pile) >= 2 and top == self.discard_pile[-2] and lost[top] == 0:
+                    # The card beneath is showing again: the top was taken
+                    taken = self.discard_pile.pop()
+                    if current_turn != 'user':
+                        self.record_opponent_pick(card_name(taken), opponent)
+                else:
+                    if lost[top] > 0:
+                        lost[top] -= 1  # our own discard
+                    else:
+                        if self.opponent_picked[opponent, top] == 0:
+                            self._mark_seen(top)
+                        if pile_top >= 0 and current_turn != 'user':
+                            self.opponent_ignored[opponent, pile_top] += 1
+                    self.discard_pile.append(top)
+            self.missing += lost
+
+        self.hand = hand
+        self.discard_top = top
+        self.frames_seen += 1
+
+    def record_opponent_pick(self, card: str, opponent: int = 0):
+        """Record that an opponent took a card from the discard pile"""
+        index = parse_card(card)
+        if index < 0:
+            return
+        if self.opponent_ignored[opponent, index] > 0:
+            self.opponent_ignored[opponent, index] -= 1
+        self.opponent_picked[opponent, index] += 1
+
+    def remaining_count(self, card: str) -> int:
+        """Copies of a card not yet seen"""
+        index = parse_card(card)
+        return int(self.remaining[index]) if index >= 0 else 0
+
+    def draw_probability(self, card: str) -> float:
+        """Probability that the next unseen card drawn is this exact card"""
+        index = parse_card(card)
+        if index < 0 or self.unseen_total <= 0:
+            return 0.0
+        return float(self.remaining[index]) / self.unseen_total
+
+    def rank_probability(self, rank: str) -> float:
+        """Probability that the next unseen card drawn has this rank"""
+        rank_index = RANK_INDEX.get(rank.upper())
+        if rank_index is None or self.unseen_total <= 0:
+            return 0.0
+        return float(self.rank_remaining[rank_index]) / self.unseen_total
+
+    def joker_probability(self, game_joker: str = None) -> float:
+        """Probability that the next unseen card drawn is a printed or cut joker"""
+        if self.unseen_total <= 0:
+            return 0.0
+        jokers = int(self.remaining[JOKER_INDEX])
+        index = parse_card(game_joker) if game_joker else -1
+        if 0 <= index < NUM_CARDS:
+            jokers += int(self.rank_remaining[index % 13])
+        return float(jokers) / self.unseen_total
+
+    def opponent_interest(self, card: str, opponent: int = 0) -> Dict[str, int]:
+        """How often an opponent picked or let pass a given card"""
+        index = parse_card(card)
+        if index < 0:
+            return {'picked': 0, 'ignored': 0}
+        return {
+            'picked': int(self.opponent_picked[opponent, index]),
+            'ignored': int(self.opponent_ignored[opponent, index])
+        }
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Compact summary for stats payloads"""
+        return {
+            'unseen_total': self.unseen_total,
+            'frames_seen': self.frames_seen,
+            'discard_top': card_name(self.discard_top) if self.discard_top >= 0 else None,
+            'opponent_picked': int(self.opponent_picked.sum()),
+            'opponent_ignored': int(self.opponent_ignored.sum())
+        }
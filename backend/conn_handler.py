@@ -1,7 +1,9 @@
 import os
 import time
 import subprocess
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
+import hand_arranger
+from warm_start import load_calibration, save_calibration
 
 class ConnectionHandler:
     def __init__(self):
@@ -9,6 +11,7 @@ class ConnectionHandler:
         self.is_connected = False
         self.last_check = 0
         self.check_interval = 30  # Check connection every 30 seconds
+        self.screen_size = None
     
     def check_adb_connection(self) -> bool:
         """Check if ADB device is connected"""
@@ -83,6 +86,27 @@ class ConnectionHandler:
             print(f"❌ Screenshot capture error: {e}")
             return False
     
+    def capture_screenshot_bytes(self) -> Optional[bytes]:
+        """Capture a PNG screenshot straight from the device without touching disk"""
+        try:
+            if not self.check_adb_connection():
+                return None
+            
+            result = subprocess.run(['adb', 'exec-out', 'screencap', '-p'],
+                                  capture_output=True, timeout=15)
+            
+            if result.returncode == 0 and result.stdout:
+                return result.stdout
+            print(f"❌ Screenshot capture failed: {result.stderr}")
+            return None
+                
+        except subprocess.TimeoutExpired:
+            print("❌ Screenshot capture timed out")
+            return None
+        except Exception as e:
+            print(f"❌ Screenshot capture error: {e}")
+            return None
+    
     def tap_screen(self, x: int, y: int) -> bool:
         """Tap screen at specified coordinates"""
         try:
@@ -130,12 +154,64 @@ class ConnectionHandler:
             print(f"❌ Screen swipe error: {e}")
             return False
     
+    def swipe_sequence(self, swipes: List[Tuple[int, int, int, int]], duration: int = 200) -> bool:
+        """Run several swipes in a single ADB shell round-trip"""
+        try:
+            if not swipes:
+                return True
+            if not self.check_adb_connection():
+                return False
+            
+            script = '; '.join(f"input swipe {x1} {y1} {x2} {y2} {duration}"
+                               for x1, y1, x2, y2 in swipes)
+            result = subprocess.run(['adb', 'shell', script],
+                                  capture_output=True, timeout=10 + len(swipes) * duration / 1000)
+            
+            if result.returncode == 0:
+                print(f"✅ Ran {len(swipes)} swipes in one batch")
+                return True
+            else:
+                print(f"❌ Swipe batch failed: {result.stderr}")
+                return False
+                
+        except subprocess.TimeoutExpired:
+            print("❌ Swipe batch timed out")
+            return False
+        except Exception as e:
+            print(f"❌ Swipe batch error: {e}")
+            return False
+    
+    def arrange_hand(self, slot_order: List[str], meld_groups: List[List[str]],
+                     screen_size: Tuple[int, int] = None) -> bool:
+        """Drag the hand into the solver's meld grouping with the fewest moves"""
+        try:
+            moves = hand_arranger.plan_moves(slot_order, meld_groups)
+            if not moves:
+                print("✅ Hand already arranged")
+                return True
+            if not screen_size:
+                screen_size = self.get_screen_size()
+                if not screen_size:
+                    return False
+            swipes = hand_arranger.moves_to_swipes(moves, len(slot_order), screen_size)
+            return self.swipe_sequence(swipes)
+        except Exception as e:
+            print(f"❌ Hand arrangement error: {e}")
+            return False
+    
     def get_screen_size(self) -> Optional[Tuple[int, int]]:
-        """Get device screen resolution"""
+        """Get device screen resolution (cached, and kept across restarts in the warm-start cache)"""
         try:
             if not self.check_adb_connection():
                 return None
             
+            if self.screen_size:
+                return self.screen_size
+            cached = load_calibration(self.device_id).get('screen_size')
+            if cached:
+                self.screen_size = tuple(cached)
+                return self.screen_size
+            
             result = subprocess.run(['adb', 'shell', 'wm', 'size'],
                                   capture_output=True, text=True, timeout=10)
             
@@ -146,7 +222,9 @@ class ConnectionHandler:
                     size_part = output.split(':')[-1].strip()
                     width, height = map(int, size_part.split('x'))
                     print(f"✅ Screen size: {width}x{height}")
-                    return (width, height)
+                    self.screen_size = (width, height)
+                    save_calibration(self.device_id, screen_size=[width, height])
+                    return self.screen_size
             
             print(f"❌ Failed to get screen size: {result.stderr}")
             return None
@@ -158,6 +236,30 @@ class ConnectionHandler:
             print(f"❌ Screen size query error: {e}")
             return None
     
+    def is_screen_on(self) -> bool:
+        """Whether the device display is on (True when it cannot be determined)"""
+        try:
+            if not self.check_adb_connection():
+                return True
+            
+            result = subprocess.run(['adb', 'shell', 'dumpsys', 'power'],
+                                  capture_output=True, text=True, timeout=10)
+            
+            if result.returncode == 0:
+                output = result.stdout
+                if 'mWakefulness=' in output:
+                    return 'mWakefulness=Awake' in output
+                if 'Display Power: state=' in output:
+                    return 'Display Power: state=ON' in output
+            return True
+            
+        except subprocess.TimeoutExpired:
+            print("❌ Screen state query timed out")
+            return True
+        except Exception as e:
+            print(f"❌ Screen state query error: {e}")
+            return True
+    
     def simulate_game_action(self, action: str, screen_size: Tuple[int, int] = None) -> bool:
         """Simulate game actions via ADB taps"""
         try:
@@ -0,0 +1,215 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import configparser
+import cv2
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from warm_start import WARM_CACHE_DIR
+
+CONFIG_FILE = 'config.ini'
+CROP_CACHE_DIR = 'crops'
+DEFAULT_CROP_CACHE = {
+    'enabled': True,
+    'capacity': 4096,          # hashes kept before the least recently used are evicted
+    'max_distance': 6,         # Hamming distance (of 64 bits) still treated as the same face
+    'store_score': 0.75,       # template score a match needs before its crop is remembered
+    'verify_every': 4,         # a fully resolved region is still template-searched every Nth pass
+    'save_interval': 30.0      # seconds between writes of a changed cache
+}
+HASH_SIZE = 8                  # dHash grid: 8x8 gradient signs = 64-bit hash
+MIN_CROP_STD = 4.0             # flatter crops (felt, card backs) carry no identity
+ENTRY_OVERHEAD = 100           # OrderedDict slot and link per entry, in bytes
+
+
+def load_crop_cache_config(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Crop cache settings from the [CROP_CACHE] section of config.ini"""
+    config = dict(DEFAULT_CROP_CACHE)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('CROP_CACHE'):
+        for key, default in config.items():
+            if not parser.has_option('CROP_CACHE', key):
+                continue
+            if isinstance(default, bool):
+                config[key] = parser.getboolean('CROP_CACHE', key)
+            else:
+                config[key] = type(default)(parser.get('CROP_CACHE', key))
+    return config
+
+
+def crop_hash(gray_crop: np.ndarray) -> Optional[int]:
+    """64-bit difference hash of a card crop, or None if the crop is too flat to identify.
+
+    The crop is normalized to a 9x8 grid first, so the hash ignores small shifts,
+    scale changes, brightness and JPEG noise but not a different card face.
+    """
+    if gray_crop is None or gray_crop.size == 0 or gray_crop.std() < MIN_CROP_STD:
+        return None
+    small = cv2.resize(gray_crop, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+def deck_style(signature: str) -> str:
+    """Short id of a template set, so each deck style keeps its own cache"""
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()[:10]
+
+
+class CropClassificationCache:
+    """Perceptual hash of a card crop -> card name, with LRU eviction.
+
+    Card positions from the last full detection are re-hashed on the next one;
+    a crop within max_distance of exactly one remembered card resolves without
+    template matching. Ambiguous and unseen crops fall back to the matcher,
+    whose confident results are added to the cache.
+    """
+
+    def __init__(self, capacity: int = 4096, max_distance: int = 6, store_score: float = 0.75,
+                 verify_every: int = 4, path: Optional[str] = None, **_):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.store_score = store_score
+        self.verify_every = verify_every
+        self.path = path
+        self.entries: 'OrderedDict[int, str]' = OrderedDict()
+        self.layout: Dict[str, List[Tuple[int, int, int, int]]] = {}   # region -> boxes of the last detection
+        self.unverified: Dict[str, int] = {}   # region -> passes resolved from the cache alone
+        self.hits = 0
+        self.misses = 0
+        self.ambiguous = 0
+        self.dirty = False
+        self.saved_at = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, gray_crop: np.ndarray) -> Optional[str]:
+        """Card name for this crop, or None if it is unseen, flat or close to more than one card"""
+        key = crop_hash(gray_crop)
+        if key is None:
+            return None
+        name = self.entries.get(key)
+        if name is None:
+            best, names = self.max_distance + 1, set()
+            for other, other_name in self.entries.items():
+                distance = (key ^ other).bit_count()
+                if distance < best:
+                    best, names, name, match = distance, {other_name}, other_name, other
+                elif distance == best:
+                    names.add(other_name)
+            if len(names) > 1:
+                self.ambiguous += 1
+                return None
+            if name is not None:
+                key = match
+        if name is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return name
+
+    def store(self, gray_crop: np.ndarray, name: str, score: float):
+        """Remember a confident template match for this crop"""
+        if score < self.store_score:
+            return
+        key = crop_hash(gray_crop)
+        if key is None:
+            return
+        if self.entries.get(key) != name:
+            self.dirty = True
+        self.entries[key] = name
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def remember_layout(self, region: str, boxes: List[Tuple[int, int, int, int]]):
+        if boxes:
+            self.layout[region] = list(boxes)
+            self.dirty = True
+
+    def needs_search(self, region: str, resolved: int) -> bool:
+        """Template search is skipped only when every known card position resolved from the cache,
+        and even then is run every verify_every passes to pick up cards at new positions"""
+        layout = self.layout.get(region)
+        if not layout or resolved < len(layout) or self.unverified.get(region, 0) + 1 >= self.verify_every:
+            self.unverified[region] = 0
+            return True
+        self.unverified[region] = self.unverified.get(region, 0) + 1
+        return False
+
+    def nbytes(self) -> int:
+        """Approximate bytes of the hash table: one int key, one name and one LRU link per entry"""
+        if not self.entries:
+            return 0
+        key, name = next(iter(self.entries.items()))
+        return len(self.entries) * (sys.getsizeof(key) + sys.getsizeof(name) + ENTRY_OVERHEAD)
+
+    def shrink(self, keep: float = 0.5):
+        """Evict least recently used entries down to a share of the current size"""
+        target = int(len(self.entries) * keep)
+        while len(self.entries) > target:
+            self.entries.popitem(last=False)
+        self.dirty = True
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.ambiguous
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'ambiguous': self.ambiguous,
+            'hitRate': self.hits / lookups if lookups else 0.0
+        }
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        if not path:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'entries': [[f"{key:016x}", name] for key, name in self.entries.items()],
+                'layout': self.layout
+            }, f)
+        os.replace(tmp_path, path)
+        self.dirty = False
+        self.saved_at = time.monotonic()
+
+    def save_if_due(self, interval: float):
+        if self.dirty and time.monotonic() - self.saved_at >= interval:
+            self.save()
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """Restore a saved cache (oldest entries first, so LRU order survives restarts)"""
+        path = path or self.path
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            for key, name in data.get('entries', [])[-self.capacity:]:
+                self.entries[int(key, 16)] = name
+            self.layout = {region: [tuple(box) for box in boxes]
+                           for region, boxes in data.get('layout', {}).items()}
+            return True
+        except (OSError, TypeError, ValueError):
+            return False
+
+
+def cache_path(device_id: str, style: str, cache_dir: str = WARM_CACHE_DIR) -> str:
+    safe_device = "".join(c if c.isalnum() or c in '-_.' else '_' for c in (device_id or 'default'))
+    return os.path.join(cache_dir, CROP_CACHE_DIR, f"{safe_device}-{style}.json")
+
+
+def load_crop_cache(device_id: str, signature: str, config: Dict = None,
+                    cache_dir: str = WARM_CACHE_DIR) -> CropClassificationCache:
+    """The persisted cache for this device and template set (empty if none was saved)"""
+    config = config or load_crop_cache_config()
+    cache = CropClassificationCache(path=cache_path(device_id, deck_style(signature), cache_dir), **config)
+    cache.load()
+    return cache
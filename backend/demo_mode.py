@@ -1,55 +1,47 @@
-import os
-import cv2
 import base64
 import json
-import numpy as np
 import asyncio
 import websockets
 from datetime import datetime
-from PIL import Image
+from PIL import Image, ImageDraw
 from io import BytesIO
 from strategy_emitter import StrategyEmitter
 from agent_controller import AgentController
 import random
 
-FRAME_DIR = 'frames'
-
 emitter = StrategyEmitter()
 agent = AgentController()
 
 def create_demo_frame():
-    """Create a demo frame for testing"""
+    """Create an encoded demo frame for testing (kept in memory, never written to disk)"""
     try:
-        os.makedirs(FRAME_DIR, exist_ok=True)
-        
-        # Create a simple demo image
-        frame = np.zeros((800, 600, 3), dtype=np.uint8)
-        frame[:] = (30, 30, 30)  # Dark background
-        
-        # Add some text
-        cv2.putText(frame, "RMZ01 Demo Mode", (150, 100), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-        cv2.putText(frame, "ADB Device Not Connected", (100, 150), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 100, 100), 2)
-        cv2.putText(frame, "Using Demo Data", (180, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 255, 100), 2)
+        # Simple placeholder drawn with PIL; OpenCV is not needed for demo mode
+        frame = Image.new("RGB", (600, 800), (30, 30, 30))
+        draw = ImageDraw.Draw(frame)
+        draw.text((150, 85), "RMZ01 Demo Mode", fill=(255, 255, 255))
+        draw.text((100, 140), "ADB Device Not Connected", fill=(100, 100, 255))
+        draw.text((180, 190), "Using Demo Data", fill=(100, 255, 100))
         
         # Add some card-like rectangles
         for i in range(5):
             x = 50 + i * 100
             y = 300
-            cv2.rectangle(frame, (x, y), (x + 80, y + 120), (255, 255, 255), 2)
-            cv2.putText(frame, f"C{i+1}", (x + 25, y + 70), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            draw.rectangle((x, y, x + 80, y + 120), outline=(255, 255, 255), width=2)
+            draw.text((x + 25, y + 60), f"C{i+1}", fill=(255, 255, 255))
         
-        frame_path = os.path.join(FRAME_DIR, "demo_screen.png")
-        cv2.imwrite(frame_path, frame)
-        return frame_path
+        buffered = BytesIO()
+        frame.save(buffered, format="PNG")
+        buffered.seek(0)
+        return buffered
         
     except Exception as e:
         print(f"❌ Demo frame creation error: {e}")
         return None
 
-def frame_to_base64(image_path):
-    """Convert image to base64 string"""
+def frame_to_base64(image_source):
+    """Convert an image (path or file-like object) to base64 string"""
     try:
-        with Image.open(image_path) as img:
+        with Image.open(image_source) as img:
             img.thumbnail((800, 600), Image.Resampling.LANCZOS)
             buffered = BytesIO()
             img.save(buffered, format="PNG")
@@ -80,8 +72,8 @@ def get_demo_game_state():
         agent.update_scores(scores[0][1], scores[1][1])
         
         # Create demo frame
-        frame_path = create_demo_frame()
-        frame_preview = frame_to_base64(frame_path) if frame_path else ""
+        demo_frame = create_demo_frame()
+        frame_preview = frame_to_base64(demo_frame) if demo_frame else ""
         
         return {
             "type": "detection",
@@ -0,0 +1,252 @@
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import tracemalloc
+import configparser
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Any, Tuple
+import cv2
+from card_codec import normalize_card
+import mobile_card_detection
+from frame_tracker import TemporalCardTracker, load_tracking_config
+from card_cascade import CardCascade, load_cascade_config
+from crop_cache import CropClassificationCache, load_crop_cache_config
+from session_archive import natural_key
+
+FRAME_SETS = ['debug_frames', 'frames']
+LABEL_FILE = 'labels.json'
+CONFIG_FILE = 'config.ini'
+DEFAULT_THRESHOLDS = {
+    'min_fps': 0.5,
+    'min_precision': 0.0,
+    'min_recall': 0.0
+}
+
+# name -> (setup(), detect(frame, state) -> (hand_cards, discard_cards))
+DETECTORS: Dict[str, Tuple[Callable[[], Any], Callable[[Any, Any], Tuple[List[str], List[str]]]]] = {
+    'template': (mobile_card_detection.load_card_templates, mobile_card_detection.detect_cards)
+}
+# name -> report(state) with per-stage statistics printed alongside the results
+STAGE_REPORTS: Dict[str, Callable[[Any], Dict[str, Any]]] = {}
+
+
+def _template_at(coarse_scale: int):
+    return lambda frame, templates: mobile_card_detection.detect_cards(frame, templates, coarse_scale)
+
+
+def register_detector(name: str, setup: Callable[[], Any], detect: Callable[[Any, Any], Tuple[List[str], List[str]]],
+                      report: Callable[[Any], Dict[str, Any]] = None):
+    """Add an alternative detector to the benchmark"""
+    DETECTORS[name] = (setup, detect)
+    if report is not None:
+        STAGE_REPORTS[name] = report
+
+
+# The configured coarse scale runs as 'template'; these pin it for accuracy/latency comparisons
+for _scale in (1, 4, 8):
+    register_detector(f'template_c{_scale}', mobile_card_detection.load_card_templates, _template_at(_scale))
+
+
+def _tracked_setup():
+    return mobile_card_detection.load_card_templates(), TemporalCardTracker(**load_tracking_config())
+
+
+def _tracked_detect(frame, state):
+    templates, tracker = state
+    hand, discard, _ = tracker.update(frame, lambda: mobile_card_detection.locate_cards(frame, templates))
+    return hand, discard
+
+
+# Frames are replayed in order, so the temporal tracker sees them as a session
+register_detector('tracked', _tracked_setup, _tracked_detect)
+
+
+def _cached_setup():
+    return mobile_card_detection.load_card_templates(), CropClassificationCache(**load_crop_cache_config())
+
+
+def _cached_detect(frame, state):
+    templates, cache = state
+    detections = mobile_card_detection.locate_cards(frame, templates, crop_cache=cache)
+    return ([name for region, name, _, _ in detections if region == 'hand'],
+            [name for region, name, _, _ in detections if region == 'discard'])
+
+
+def _cascade_setup():
+    return mobile_card_detection.load_card_templates(), CardCascade(**load_cascade_config())
+
+
+def _cascade_detect(frame, state):
+    templates, cascade = state
+    return mobile_card_detection.detect_cards(frame, templates, cascade=cascade)
+
+
+register_detector('cascade', _cascade_setup, _cascade_detect, lambda state: state[1].report())
+
+
+# Starts from an empty (unsaved) cache, so repeats show the warm hit rate
+register_detector('crop_cached', _cached_setup, _cached_detect)
+
+
+def load_thresholds(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Regression thresholds from the [BENCHMARK] section of config.ini"""
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('BENCHMARK'):
+        for key in thresholds:
+            if parser.has_option('BENCHMARK', key):
+                thresholds[key] = parser.getfloat('BENCHMARK', key)
+    return thresholds
+
+
+def load_frames(frame_sets: List[str] = None) -> List[Dict[str, Any]]:
+    """Decode every labelled frame once so detectors are timed without disk I/O"""
+    frames = []
+    for frame_dir in frame_sets or FRAME_SETS:
+        label_path = os.path.join(frame_dir, LABEL_FILE)
+        if not os.path.exists(label_path):
+            print(f"[WARNING] No labels in '{frame_dir}', skipping")
+            continue
+        with open(label_path) as f:
+            labels = json.load(f)['frames']
+        # Natural order (frame_2 before frame_10) so sequence-aware detectors see the session in order
+        for name, label in sorted(labels.items(), key=lambda item: natural_key(item[0])):
+            image = cv2.imread(os.path.join(frame_dir, name))
+            if image is None:
+                print(f"[WARNING] Could not read {frame_dir}/{name}")
+                continue
+            frames.append({'name': f"{frame_dir}/{name}", 'image': image, 'label': label})
+    return frames
+
+
+def _card_counts(cards: List[str]) -> Counter:
+    return Counter(c for c in (normalize_card(card) for card in cards or []) if c)
+
+
+def score_frame(counts: Dict[str, Dict[str, int]], predicted: List[str], expected: List[str]):
+    """Accumulate per-card true/false positives and misses.
+
+    Hands are multisets: with two decks a hand can hold both copies of a card,
+    and a detector reporting one of them scores one hit and one miss.
+    """
+    predicted, expected = _card_counts(predicted), _card_counts(expected)
+    for card, n in (predicted & expected).items():
+        counts[card]['tp'] += n
+    for card, n in (predicted - expected).items():
+        counts[card]['fp'] += n
+    for card, n in (expected - predicted).items():
+        counts[card]['fn'] += n
+
+
+def _ratio(num: int, den: int) -> float:
+    return num / den if den else 1.0
+
+
+def run_detector(name: str, frames: List[Dict[str, Any]], repeat: int = 1) -> Dict[str, Any]:
+    setup, detect = DETECTORS[name]
+    tracemalloc.start()
+    start = time.perf_counter()
+    state = setup()
+    setup_time = time.perf_counter() - start
+
+    counts = defaultdict(lambda: {'tp': 0, 'fp': 0, 'fn': 0})
+    frame_times = []
+    for _ in range(repeat):
+        for frame in frames:
+            start = time.perf_counter()
+            hand, discard = detect(frame['image'], state)
+            frame_times.append(time.perf_counter() - start)
+            label = frame['label']
+            if label.get('hand') is not None:
+                score_frame(counts, hand, label['hand'])
+                score_frame(counts, discard, [label['discard']] if label.get('discard') else [])
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tp = sum(c['tp'] for c in counts.values())
+    fp = sum(c['fp'] for c in counts.values())
+    fn = sum(c['fn'] for c in counts.values())
+    total_time = sum(frame_times)
+    ordered = sorted(frame_times)
+    return {
+        'detector': name,
+        'frames': len(frame_times),
+        'fps': len(frame_times) / total_time if total_time else 0.0,
+        'setup_time': setup_time,
+        'frame_p50': ordered[len(ordered) // 2] if ordered else 0.0,
+        'frame_max': ordered[-1] if ordered else 0.0,
+        'precision': _ratio(tp, tp + fp),
+        'recall': _ratio(tp, tp + fn),
+        'per_card': {
+            card: {'precision': _ratio(c['tp'], c['tp'] + c['fp']),
+                   'recall': _ratio(c['tp'], c['tp'] + c['fn']), **c}
+            for card, c in sorted(counts.items())
+        },
+        'peak_traced_mb': peak_traced / 1e6,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'stages': STAGE_REPORTS[name](state) if name in STAGE_REPORTS else {}
+    }
+
+
+def check_regressions(result: Dict[str, Any], thresholds: Dict[str, float]) -> List[str]:
+    failures = []
+    if result['fps'] < thresholds['min_fps']:
+        failures.append(f"fps {result['fps']:.2f} < {thresholds['min_fps']}")
+    if result['precision'] < thresholds['min_precision']:
+        failures.append(f"precision {result['precision']:.3f} < {thresholds['min_precision']}")
+    if result['recall'] < thresholds['min_recall']:
+        failures.append(f"recall {result['recall']:.3f} < {thresholds['min_recall']}")
+    return failures
+
+
+def print_report(result: Dict[str, Any], verbose: bool = False):
+    print(f"📊 [{result['detector']}] {result['frames']} frames | {result['fps']:.2f} fps | "
+          f"p50 {result['frame_p50'] * 1000:.1f} ms | max {result['frame_max'] * 1000:.1f} ms | "
+          f"setup {result['setup_time'] * 1000:.1f} ms")
+    print(f"🎯 precision {result['precision']:.3f} | recall {result['recall']:.3f} | "
+          f"peak traced {result['peak_traced_mb']:.1f} MB | peak RSS {result['peak_rss_mb']:.1f} MB")
+    for stage, s in result.get('stages', {}).items():
+        print(f"   stage {stage}: rejected {s['rejected']}/{s['tested']} ({s['rejectRate']:.0%})")
+    if verbose:
+        for card, c in result['per_card'].items():
+            print(f"   {card:>3}: P {c['precision']:.2f} R {c['recall']:.2f} "
+                  f"(tp {c['tp']}, fp {c['fp']}, fn {c['fn']})")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline detection speed/accuracy benchmark over recorded frames")
+    parser.add_argument("--detector", action="append", choices=sorted(DETECTORS), default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", dest="json_path", default=None, help="also write results to this file")
+    parser.add_argument("--verbose", action="store_true", help="print precision/recall per card")
+    parser.add_argument("--frames", action="append", metavar="DIR", default=None,
+                        help=f"labelled frame directory (default: {', '.join(FRAME_SETS)})")
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.frames)
+    if not frames:
+        print("❌ No labelled frames found")
+        return 1
+    thresholds = load_thresholds()
+    results, failed = [], False
+    for name in args.detector or sorted(DETECTORS):
+        result = run_detector(name, frames, args.repeat)
+        print_report(result, args.verbose)
+        failures = check_regressions(result, thresholds)
+        for failure in failures:
+            print(f"❌ [{name}] regression: {failure}")
+        failed = failed or bool(failures)
+        results.append(result)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
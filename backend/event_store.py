@@ -0,0 +1,87 @@
+import json
+import sqlite3
+import threading
+from collections import deque
+from typing import Dict, List, Any, Optional
+
+EVENT_DB_PATH = 'events.db'
+RECENT_EVENTS = 50
+MAX_PAGE_SIZE = 500
+MAX_EVENT_ID = 2 ** 63 - 1   # SQLite INTEGER range
+
+
+class EventStore:
+    """Append-only action/event log in SQLite (WAL) with a bounded in-memory tail"""
+
+    def __init__(self, path: str = EVENT_DB_PATH, recent: int = RECENT_EVENTS):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        if path != ':memory:':
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                turn TEXT,
+                round INTEGER,
+                details TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS events_action ON events(action, id)")
+        self.conn.commit()
+        self.count = self.conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        self.recent = deque(self._page(None, recent, None)[::-1], maxlen=recent)
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Persist one event and return its id"""
+        with self.lock:
+            cursor = self.conn.execute(
+                "INSERT INTO events (timestamp, action, turn, round, details) VALUES (?, ?, ?, ?, ?)",
+                (entry['timestamp'], entry['action'], entry.get('turn'), entry.get('round'),
+                 json.dumps(entry.get('details') or {}))
+            )
+            self.conn.commit()
+            self.count += 1
+            self.recent.append(dict(entry, id=cursor.lastrowid))
+        return cursor.lastrowid
+
+    def _page(self, before: Optional[int], limit: int, action: Optional[str]) -> List[Dict[str, Any]]:
+        query = "SELECT id, timestamp, action, turn, round, details FROM events"
+        clauses, params = [], []
+        if before is not None:
+            clauses.append("id < ?")
+            params.append(before)
+        if action:
+            clauses.append("action = ?")
+            params.append(action)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        return [{'id': r[0], 'timestamp': r[1], 'action': r[2], 'turn': r[3], 'round': r[4],
+                 'details': json.loads(r[5]) if r[5] else {}} for r in rows]
+
+    def query(self, before: int = None, limit: int = RECENT_EVENTS, action: str = None) -> Dict[str, Any]:
+        """Newest-first page of events; pass 'next_before' back as 'before' for the next page"""
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        if before is not None:
+            before = max(0, min(int(before), MAX_EVENT_ID))
+        events = self._page(before, limit, action)
+        return {
+            'events': events,
+            'next_before': events[-1]['id'] if len(events) == limit else None,
+            'total': self.count
+        }
+
+    def recent_events(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            return list(self.recent)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
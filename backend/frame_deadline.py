@@ -0,0 +1,116 @@
+import time
+import configparser
+from contextlib import contextmanager
+from typing import Dict, List
+
+CONFIG_FILE = 'config.ini'
+DEFAULT_DEADLINE = {
+    'enabled': True,
+    'frame_budget_ms': 500.0,    # decoded frame to serialized payload; 0 = unbudgeted
+    'low_detection_scale': 8,    # coarse scale used when full detection does not fit
+    'margin': 1.25,              # projected stage cost = typical cost x margin
+    'smoothing': 0.2             # weight of the newest sample in each stage's typical cost
+}
+# Cheapest first: each level also applies everything before it
+LEVELS = ('full', 'skip_ocr', 'low_detection', 'reuse_strategy', 'skip_preview')
+
+
+def load_deadline_config(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Frame budget settings from the [DEADLINE] section of config.ini"""
+    config = dict(DEFAULT_DEADLINE)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('DEADLINE'):
+        for key, default in config.items():
+            if not parser.has_option('DEADLINE', key):
+                continue
+            if isinstance(default, bool):
+                config[key] = parser.getboolean('DEADLINE', key)
+            else:
+                config[key] = type(default)(parser.get('DEADLINE', key))
+    return config
+
+
+class StageCosts:
+    """Typical duration of each pipeline stage (exponentially smoothed), shared across frames"""
+
+    def __init__(self, smoothing: float = 0.2, margin: float = 1.25):
+        self.smoothing = smoothing
+        self.margin = margin
+        self.typical: Dict[str, float] = {}
+
+    def observe(self, stage: str, seconds: float):
+        previous = self.typical.get(stage)
+        self.typical[stage] = seconds if previous is None else previous + self.smoothing * (seconds - previous)
+
+    def relax(self, stage: str):
+        """Lower the estimate of a stage that was skipped, so one slow run does not disable it for good"""
+        if stage in self.typical:
+            self.typical[stage] *= 1.0 - self.smoothing
+
+    def projected(self, stage: str) -> float:
+        """Expected cost with safety margin; unmeasured stages are assumed free until first seen"""
+        return self.typical.get(stage, 0.0) * self.margin
+
+
+class FrameDeadline:
+    """Budget for one frame; picks the cheapest degradation level that still fits.
+
+    plan() is called before each stage with the stages still to run, so a slow
+    capture or detection pushes the later stages down to cheaper modes. The
+    level only rises within a frame.
+    """
+
+    def __init__(self, budget: float, costs: StageCosts, started: float = None):
+        self.budget = budget
+        self.costs = costs
+        self.started = time.perf_counter() if started is None else started
+        self.level = 0
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def remaining(self) -> float:
+        return self.budget - self.elapsed()
+
+    def _projected(self, level: int, stages: List[str], full_detection: bool) -> float:
+        c = self.costs.projected
+        cost = {
+            'detect': (c('detect_low') if level >= 2 else c('detect')) if full_detection else c('track'),
+            'ocr': 0.0 if level >= 1 else c('ocr'),
+            'strategy': 0.0 if level >= 3 else c('strategy'),
+            'preview': 0.0 if level >= 4 else c('preview'),
+            'serialize': c('serialize_lite') if level >= 4 else c('serialize')
+        }
+        return sum(cost[stage] for stage in stages)
+
+    def plan(self, stages: List[str], full_detection: bool = True) -> int:
+        """Raise the level until the remaining stages are projected to fit the remaining budget"""
+        remaining = self.remaining()
+        while self.level < len(LEVELS) - 1 and self._projected(self.level, stages, full_detection) > remaining:
+            self.level += 1
+        return self.level
+
+    def allows(self, level_name: str, stage: str = None) -> bool:
+        """True while the frame is still above the given degradation; a refused stage's estimate is relaxed"""
+        allowed = self.level < LEVELS.index(level_name)
+        if not allowed and stage:
+            self.costs.relax(stage)
+        return allowed
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Feed the duration of a block into the shared stage costs"""
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.costs.observe(stage, time.perf_counter() - began)
+
+    def report(self) -> Dict[str, object]:
+        return {
+            'level': self.level,
+            'mode': LEVELS[self.level],
+            'budgetMs': round(self.budget * 1000, 1),
+            'usedMs': round(self.elapsed() * 1000, 1)
+        }
@@ -0,0 +1,240 @@
+import sys
+import time
+import struct
+import argparse
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from typing import Optional
+
+RING_NAME = 'rmz01_frames'
+RING_SLOTS = 8
+SLOT_CAPACITY = 2560 * 1440 * 3          # default largest raw BGR frame a slot can hold (QHD)
+RING_HEADER = struct.Struct('<4sIQQ')    # magic, slot count, slot capacity, last written sequence
+SLOT_HEADER = struct.Struct('<QdIII')    # sequence (0 while being written), timestamp, height, width, channels
+RING_MAGIC = b'RMZR'
+SLOT_ALIGN = 64
+
+
+def slot_capacity_for(frame_shape=None, minimum: int = SLOT_CAPACITY) -> int:
+    """Slot size that holds frames of this shape, and never less than `minimum`"""
+    return max(minimum, int(np.prod(frame_shape)) if frame_shape else 0)
+
+
+class RingFrame:
+    """A frame borrowed from the ring; `image` is a view into shared memory, not a copy"""
+
+    __slots__ = ('ring', 'slot', 'seq', 'timestamp', 'image')
+
+    def __init__(self, ring: 'FrameRing', slot: int, seq: int, timestamp: float, image: np.ndarray):
+        self.ring = ring
+        self.slot = slot
+        self.seq = seq
+        self.timestamp = timestamp
+        self.image = image
+
+    def valid(self) -> bool:
+        """False once the producer has started overwriting this slot"""
+        return self.ring._slot_seq(self.slot) == self.seq
+
+
+class FrameRing:
+    """Fixed-size ring of raw frames in shared memory with one writer and any number of readers.
+
+    The writer stores each frame once; readers in other processes map the same
+    block and keep their own cursor, so a slow reader only ever skips frames.
+    Slots use a sequence lock: the sequence is zeroed while a slot is written.
+    """
+
+    def __init__(self, name: str = RING_NAME, slots: int = RING_SLOTS,
+                 slot_capacity: int = SLOT_CAPACITY, create: bool = False):
+        if create:
+            slot_stride = self._stride(slot_capacity)
+            size = RING_HEADER.size + slots * slot_stride
+            try:
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Left behind by a producer that was killed; reclaim it
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            RING_HEADER.pack_into(self.shm.buf, 0, RING_MAGIC, slots, slot_capacity, 0)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Readers must not unlink the block when they exit (Python < 3.13 tracks every attach)
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+            magic, slots, slot_capacity, _ = RING_HEADER.unpack_from(self.shm.buf, 0)
+            if magic != RING_MAGIC:
+                self.shm.close()
+                raise ValueError(f"Shared memory block '{name}' is not a frame ring")
+        self.name = name
+        self.owner = create
+        self.slots = slots
+        self.slot_capacity = slot_capacity
+        self.slot_stride = self._stride(slot_capacity)
+        self._seq_view = np.ndarray((1,), dtype='<u8', buffer=self.shm.buf, offset=16)
+
+    @staticmethod
+    def _stride(slot_capacity: int) -> int:
+        raw = SLOT_HEADER.size + slot_capacity
+        return (raw + SLOT_ALIGN - 1) // SLOT_ALIGN * SLOT_ALIGN
+
+    def _slot_offset(self, slot: int) -> int:
+        return RING_HEADER.size + slot * self.slot_stride
+
+    def _slot_seq(self, slot: int) -> int:
+        return struct.unpack_from('<Q', self.shm.buf, self._slot_offset(slot))[0]
+
+    @property
+    def last_seq(self) -> int:
+        """Sequence number of the newest complete frame (0 = nothing written yet)"""
+        return int(self._seq_view[0])
+
+    def write(self, image: np.ndarray, timestamp: float = None) -> int:
+        """Copy a frame into the next slot and return its sequence number"""
+        if image.nbytes > self.slot_capacity:
+            raise ValueError(f"Frame of {image.nbytes} bytes exceeds slot capacity {self.slot_capacity}")
+        image = np.ascontiguousarray(image, dtype=np.uint8)
+        height, width = image.shape[:2]
+        channels = image.shape[2] if image.ndim == 3 else 1
+        seq = self.last_seq + 1
+        offset = self._slot_offset((seq - 1) % self.slots)
+        struct.pack_into('<Q', self.shm.buf, offset, 0)
+        target = np.ndarray(image.shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset + SLOT_HEADER.size)
+        target[...] = image
+        SLOT_HEADER.pack_into(self.shm.buf, offset, seq, timestamp or time.time(), height, width, channels)
+        self._seq_view[0] = seq
+        return seq
+
+    def get(self, seq: int) -> Optional[RingFrame]:
+        """Frame with this sequence number, or None if it is not (or no longer) in the ring"""
+        if seq < 1 or seq > self.last_seq or seq <= self.last_seq - self.slots:
+            return None
+        slot = (seq - 1) % self.slots
+        offset = self._slot_offset(slot)
+        slot_seq, timestamp, height, width, channels = SLOT_HEADER.unpack_from(self.shm.buf, offset)
+        if slot_seq != seq:
+            return None
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        image = np.ndarray(shape, dtype=np.uint8, buffer=self.shm.buf, offset=offset + SLOT_HEADER.size)
+        image.flags.writeable = False
+        return RingFrame(self, slot, seq, timestamp, image)
+
+    def reader(self, latest_only: bool = False) -> 'RingReader':
+        return RingReader(self, latest_only)
+
+    def close(self):
+        self._seq_view = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class RingReader:
+    """Independent read cursor over a FrameRing.
+
+    latest_only readers (`watch --latest`, or any out-of-process analyser) jump
+    to the newest frame; others (`record`) take every frame still in the ring
+    and count the ones they missed. The server's own detector and preview do
+    not read the ring: they run on the frame it decoded before writing it here.
+    """
+
+    def __init__(self, ring: FrameRing, latest_only: bool = False):
+        self.ring = ring
+        self.latest_only = latest_only
+        self.next_seq = ring.last_seq + 1
+        self.read_count = 0
+        self.dropped = 0
+
+    def read(self) -> Optional[RingFrame]:
+        """Next frame for this reader, or None if the producer has nothing new"""
+        while True:
+            last = self.ring.last_seq
+            if last < self.next_seq:
+                return None
+            oldest = max(1, last - self.ring.slots + 2)  # leave the slot being overwritten next
+            wanted = last if self.latest_only else max(self.next_seq, oldest)
+            self.dropped += wanted - self.next_seq
+            self.next_seq = wanted + 1
+            frame = self.ring.get(wanted)
+            if frame is not None:
+                self.read_count += 1
+                return frame
+            self.dropped += 1
+
+    def wait(self, timeout: float = 1.0, poll: float = 0.005) -> Optional[RingFrame]:
+        deadline = time.monotonic() + timeout
+        while True:
+            frame = self.read()
+            if frame is not None or time.monotonic() >= deadline:
+                return frame
+            time.sleep(poll)
+
+
+def _watch(name: str, latest_only: bool):
+    """Attach as a consumer and report the rate this process sees"""
+    ring = FrameRing(name)
+    reader = ring.reader(latest_only)
+    print(f"👀 Attached to ring '{name}' ({ring.slots} slots, at seq {ring.last_seq})")
+    started = time.monotonic()
+    try:
+        while True:
+            frame = reader.wait()
+            if frame is not None:
+                elapsed = time.monotonic() - started
+                print(f"🎞️ seq {frame.seq} {frame.image.shape} | read {reader.read_count} | "
+                      f"dropped {reader.dropped} | {reader.read_count / elapsed:.1f} fps")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+def _record(name: str, path: str, quality: int):
+    """Attach as a recorder consumer and append every frame to a session archive"""
+    import cv2
+    from session_archive import SessionRecorder
+
+    ring = FrameRing(name)
+    reader = ring.reader()
+    recorder = SessionRecorder(path, append=True)
+    try:
+        while True:
+            frame = reader.wait()
+            if frame is None:
+                continue
+            ok, encoded = cv2.imencode('.jpg', frame.image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            if ok and frame.valid():
+                recorder.append(frame.timestamp, encoded.tobytes(), b'')
+            else:
+                reader.dropped += 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+        ring.close()
+        print(f"📊 Recorder read {reader.read_count} frames, dropped {reader.dropped}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shared-memory frame ring consumers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    watch = sub.add_parser("watch", help="attach and report frame rate and drops")
+    watch.add_argument("--name", default=RING_NAME)
+    watch.add_argument("--latest", action="store_true", help="skip to the newest frame, as a live analyser would")
+    record = sub.add_parser("record", help="record every frame from the ring to a session archive")
+    record.add_argument("archive")
+    record.add_argument("--name", default=RING_NAME)
+    record.add_argument("--quality", type=int, default=90)
+    args = parser.parse_args()
+
+    from sampling_profiler import install_signal_trigger
+    install_signal_trigger()
+    try:
+        if args.command == "watch":
+            _watch(args.name, args.latest)
+        else:
+            _record(args.name, args.archive, args.quality)
+    except FileNotFoundError:
+        print(f"❌ No frame ring named '{args.name}' (start mobile_card_detection.py with --ring)")
+        sys.exit(1)
@@ -0,0 +1,180 @@
+import configparser
+import cv2
+import numpy as np
+from typing import Any, Callable, Dict, List, Tuple
+
+CONFIG_FILE = 'config.ini'
+DEFAULT_TRACKING = {
+    'full_every': 5,           # frames between full template classifications
+    'min_track_score': 0.7,    # correlation needed to follow a card between full detections
+    'search_margin': 0.5,      # search window around a card, as a share of its size
+    'vote_gain': 0.5,          # share of the remaining confidence added per confirming detection
+    'decay': 0.75,             # confidence kept when a card is missed
+    'show_confidence': 0.5,    # cards below this are tracked but not reported
+    'new_confidence': 0.4,     # first sighting; a second vote is needed before it is reported
+    'drop_confidence': 0.15,
+    'scene_change': 12.0       # mean grey-level change of the frame thumbnail that invalidates all tracks
+}
+THUMBNAIL_SIZE = (64, 32)
+
+# (region, name, (x, y, w, h), score) in frame coordinates
+Detection = Tuple[str, str, Tuple[int, int, int, int], float]
+
+
+def load_tracking_config(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Tracker settings from the [TRACKING] section of config.ini"""
+    config = dict(DEFAULT_TRACKING)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('TRACKING'):
+        for key, default in config.items():
+            if parser.has_option('TRACKING', key):
+                config[key] = type(default)(parser.get('TRACKING', key))
+    return config
+
+
+class TrackedCard:
+    """One card identity: where it was last seen, its appearance there, and a voted confidence"""
+
+    __slots__ = ('region', 'name', 'box', 'patch', 'confidence', 'hits', 'misses')
+
+    def __init__(self, region: str, name: str, box: Tuple[int, int, int, int], patch: np.ndarray,
+                 confidence: float):
+        self.region = region
+        self.name = name
+        self.box = box
+        self.patch = patch
+        self.confidence = confidence
+        self.hits = 1
+        self.misses = 0
+
+
+class TemporalCardTracker:
+    """Keeps card identities across frames so full classification runs only periodically.
+
+    Between full detections each card is followed by correlating its last
+    appearance inside a small window around its last position. Identities are
+    confirmed by repeated detections and fade when missed, so one bad match
+    neither adds nor removes a card from the reported hand.
+    """
+
+    def __init__(self, **settings):
+        self.settings = dict(DEFAULT_TRACKING, **settings)
+        self.reset()
+
+    def reset(self):
+        self.tracks: Dict[Tuple[str, str], TrackedCard] = {}
+        self.frames_since_full = 0
+        self.lost = True
+        self.full_runs = 0
+        self.tracked_runs = 0
+        self.scene_changes = 0
+        self.reference: np.ndarray = None   # thumbnail of the frame at the last full detection
+
+    def needs_full(self) -> bool:
+        """Full classification is due by schedule, after a lost card, or while identities are unconfirmed"""
+        s = self.settings
+        return (self.lost or not self.tracks
+                or self.frames_since_full + 1 >= s['full_every']
+                or any(t.confidence < s['show_confidence'] for t in self.tracks.values()))
+
+    def update(self, frame: np.ndarray, detect: Callable[[], List[Detection]],
+               force_full: bool = False) -> Tuple[List[str], List[str], bool]:
+        """Advance one frame; returns (hand cards, discard cards, whether full detection ran)"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumbnail = cv2.resize(gray, THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+        scene_changed = (self.reference is not None
+                         and float(np.abs(thumbnail - self.reference).mean()) > self.settings['scene_change'])
+        full = force_full or scene_changed or self.needs_full()
+        if full:
+            if scene_changed:
+                # Nothing on the new screen to vote against: start over and trust this detection
+                self.tracks.clear()
+                self.scene_changes += 1
+            self._apply_detections(gray, detect(), scene_changed)
+            self.reference = thumbnail
+            self.frames_since_full = 0
+            self.full_runs += 1
+        else:
+            self._propagate(gray)
+            self.frames_since_full += 1
+            self.tracked_runs += 1
+        return self.cards('hand'), self.cards('discard'), full
+
+    def _apply_detections(self, gray: np.ndarray, detections: List[Detection], fresh: bool = False):
+        s = self.settings
+        first_confidence = s['show_confidence'] if fresh else s['new_confidence']
+        seen = set()
+        for region, name, box, _ in detections:
+            key = (region, name)
+            seen.add(key)
+            patch = self._crop(gray, box)
+            track = self.tracks.get(key)
+            if track is None:
+                self.tracks[key] = TrackedCard(region, name, box, patch, first_confidence)
+                continue
+            track.confidence += (1.0 - track.confidence) * s['vote_gain']
+            track.box, track.patch = box, patch
+            track.hits += 1
+            track.misses = 0
+        for key, track in list(self.tracks.items()):
+            if key not in seen:
+                self._miss(key, track)
+        self.lost = False
+
+    def _propagate(self, gray: np.ndarray):
+        """Follow each card by ROI-local correlation of its last appearance"""
+        s = self.settings
+        for key, track in list(self.tracks.items()):
+            x, y, w, h = track.box
+            mx, my = int(w * s['search_margin']), int(h * s['search_margin'])
+            x0, y0 = max(0, x - mx), max(0, y - my)
+            x1, y1 = min(gray.shape[1], x + w + mx), min(gray.shape[0], y + h + my)
+            window = gray[y0:y1, x0:x1]
+            if track.patch is None:
+                continue  # featureless crop cannot be correlated; wait for the next full pass
+            if window.shape[0] < h or window.shape[1] < w:
+                self._miss(key, track)
+                self.lost = True
+                continue
+            res = cv2.matchTemplate(window, track.patch, cv2.TM_CCOEFF_NORMED)
+            _, score, _, (dx, dy) = cv2.minMaxLoc(res)
+            if score >= s['min_track_score']:
+                track.box = (x0 + dx, y0 + dy, w, h)
+            else:
+                self._miss(key, track)
+                self.lost = True
+
+    def _miss(self, key: Tuple[str, str], track: TrackedCard):
+        track.confidence *= self.settings['decay']
+        track.misses += 1
+        # A card seen only once and then missed was most likely a false match
+        if track.hits < 2 or track.confidence < self.settings['drop_confidence']:
+            del self.tracks[key]
+
+    @staticmethod
+    def _crop(gray: np.ndarray, box: Tuple[int, int, int, int]) -> np.ndarray:
+        x, y, w, h = box
+        patch = gray[y:y + h, x:x + w]
+        return patch.copy() if patch.shape == (h, w) and patch.std() > 1.0 else None
+
+    def cards(self, region: str) -> List[str]:
+        """Reported cards of a region, left to right"""
+        shown = [t for t in self.tracks.values()
+                 if t.region == region and t.confidence >= self.settings['show_confidence']]
+        return [t.name for t in sorted(shown, key=lambda t: t.box[0])]
+
+    def nbytes(self) -> int:
+        """Bytes of the tracked card patches and the reference thumbnail"""
+        total = sum(t.patch.nbytes for t in self.tracks.values() if t.patch is not None)
+        return total + (self.reference.nbytes if self.reference is not None else 0)
+
+    def summary(self) -> Dict[str, Any]:
+        total = self.full_runs + self.tracked_runs
+        return {
+            'tracks': len(self.tracks),
+            'fullRuns': self.full_runs,
+            'sceneChanges': self.scene_changes,
+            'trackedRuns': self.tracked_runs,
+            'fullRatio': self.full_runs / total if total else 0.0
+        }
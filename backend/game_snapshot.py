@@ -0,0 +1,198 @@
+import time
+import asyncio
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional
+from json_codec import encode_json
+from perf_metrics import metrics
+
+JPEG_QUALITY = 80
+POLL_KEEPALIVE = 10.0   # seconds an HTTP poll keeps frames being captured without WebSocket clients
+
+
+def _freeze(value):
+    """Read-only deep copy: dicts become mapping proxies, lists and tuples become tuples"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Plain dicts and lists again, for the JSON encoders"""
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def encode_timed(message: Dict[str, Any]) -> bytes:
+    """Encode a message once and charge the time to its type in the serialization metrics"""
+    began = time.perf_counter()
+    encoded = encode_json(message)
+    metrics.record_encode(message.get('type'), time.perf_counter() - began, len(encoded))
+    return encoded
+
+
+class GameSnapshot:
+    """Immutable result of one frame: detection, analysis, suggestion and the serialized payload.
+
+    Built once per frame and shared by every consumer, so no stage recomputes
+    or re-serializes what an earlier stage already produced. The payload is
+    encoded first and every structure is then frozen all the way down, so the
+    cached bytes always match what consumers can read.
+    """
+
+    __slots__ = ('frame_id', 'timestamp', 'device', 'detection', 'analysis', 'melds',
+                 'suggestion', 'payload', 'payload_bytes', 'frame_bytes', '_lite_bytes', '_jpeg')
+
+    def __init__(self, frame_id: int, payload: Dict[str, Any], detection: Dict = None,
+                 analysis: Dict = None, melds: List[List[str]] = None, suggestion: Dict = None,
+                 frame_bytes: bytes = None, device: str = None):
+        payload_bytes = encode_timed(payload)
+        values = {
+            'frame_id': frame_id,
+            'timestamp': int(time.time() * 1000),
+            'device': device or 'default',
+            'detection': _freeze(detection),
+            'analysis': _freeze(analysis),
+            'melds': tuple(tuple(meld) for meld in melds or ()),
+            'suggestion': _freeze(suggestion),
+            'payload': _freeze(payload),
+            'payload_bytes': payload_bytes,
+            'frame_bytes': frame_bytes,
+            '_lite_bytes': None,
+            '_jpeg': None
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("GameSnapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("GameSnapshot is immutable")
+
+    def bytes_for(self, preview: bool = True) -> bytes:
+        """Encoded payload, optionally without the frame preview (each variant encoded at most once)"""
+        inner = self.payload.get('payload')
+        if preview or not isinstance(inner, MappingProxyType) or 'framePreview' not in inner:
+            return self.payload_bytes
+        if self._lite_bytes is None:
+            lite = _thaw(self.payload)
+            del lite['payload']['framePreview']
+            object.__setattr__(self, '_lite_bytes', encode_timed(lite))
+        return self._lite_bytes
+
+    def text_for(self, preview: bool = True) -> str:
+        return self.bytes_for(preview).decode('utf-8')
+
+    @property
+    def payload_text(self) -> str:
+        return self.payload_bytes.decode('utf-8')
+
+    def jpeg(self, quality: int = JPEG_QUALITY) -> Optional[bytes]:
+        """The captured frame as JPEG, encoded on first request and then reused"""
+        if self._jpeg is None and self.frame_bytes:
+            import cv2  # only HTTP frame consumers need this
+            import numpy as np
+            frame = cv2.imdecode(np.frombuffer(self.frame_bytes, np.uint8), cv2.IMREAD_COLOR)
+            encoded = b''
+            if frame is not None:
+                ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                encoded = buffer.tobytes() if ok else b''
+            object.__setattr__(self, '_jpeg', encoded)
+        return self._jpeg or None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in encoded payloads, the captured frame, its JPEG and the base64 preview"""
+        inner = self.payload.get('payload')
+        preview = inner.get('framePreview') if isinstance(inner, MappingProxyType) else None
+        return sum(len(buffer) for buffer in (self.payload_bytes, self._lite_bytes, self.frame_bytes,
+                                              self._jpeg, preview) if buffer)
+
+    def drop_caches(self):
+        """Forget the lazily built lite payload and JPEG; both are rebuilt on the next request"""
+        object.__setattr__(self, '_lite_bytes', None)
+        object.__setattr__(self, '_jpeg', None)
+
+    @property
+    def etag(self) -> str:
+        """Validator for HTTP caches: changes exactly when a new snapshot replaces this one"""
+        return f'"{self.device}-{self.frame_id}-{self.timestamp}"'
+
+    @property
+    def message_type(self) -> Optional[str]:
+        return self.payload.get('type')
+
+
+class SnapshotHub:
+    """Hands each published snapshot to WebSocket client queues and synchronous listeners"""
+
+    def __init__(self):
+        self.latest: Optional[GameSnapshot] = None
+        self.latest_by_device: Dict[str, GameSnapshot] = {}
+        self.listeners: List[Callable[[GameSnapshot], None]] = []
+        self.queues = set()
+        self.last_poll = 0.0
+
+    def add_listener(self, callback: Callable[[GameSnapshot], None]):
+        """Register a consumer (recorder, metrics) called for every snapshot"""
+        self.listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[GameSnapshot], None]):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue for one client; holds only the newest snapshot so slow clients skip frames"""
+        queue = asyncio.Queue(maxsize=1)
+        self.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.queues.discard(queue)
+
+    def poll(self, device: str = None) -> Optional[GameSnapshot]:
+        """Latest snapshot for an HTTP poller; polling keeps the capture loop running"""
+        self.last_poll = time.monotonic()
+        return self.latest_by_device.get(device) if device else self.latest
+
+    def retained(self) -> List[GameSnapshot]:
+        """Distinct snapshots kept alive by the hub: the latest per device and those queued for clients"""
+        held = {id(snapshot): snapshot for snapshot in self.latest_by_device.values()}
+        if self.latest is not None:
+            held[id(self.latest)] = self.latest
+        for queue in list(self.queues):
+            # asyncio.Queue has no public way to look at queued items; its deque is _queue
+            for snapshot in list(getattr(queue, '_queue', ())):
+                held[id(snapshot)] = snapshot
+        return list(held.values())
+
+    def nbytes(self) -> int:
+        return sum(snapshot.nbytes for snapshot in self.retained())
+
+    def trim(self):
+        """Drop snapshots of devices other than the latest one's and the derived caches of the rest"""
+        if self.latest is not None:
+            self.latest_by_device = {self.latest.device: self.latest}
+        for snapshot in self.retained():
+            snapshot.drop_caches()
+
+    def has_clients(self) -> bool:
+        return bool(self.queues) or time.monotonic() - self.last_poll < POLL_KEEPALIVE
+
+    def publish(self, snapshot: GameSnapshot):
+        self.latest = snapshot
+        self.latest_by_device[snapshot.device] = snapshot
+        for callback in list(self.listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"❌ Snapshot listener error: {e}")
+        for queue in list(self.queues):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(snapshot)
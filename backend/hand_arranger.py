@@ -0,0 +1,100 @@
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+# Hand strip geometry as fractions of the screen, matching the hand ROI in build_game_state
+HAND_X_RANGE = (0.1, 0.9)
+HAND_Y = 0.8
+
+
+def target_order(current_order: List[str], groups: List[List[str]]) -> List[str]:
+    """Melds first in the solver's order, then the remaining cards in their current order"""
+    remaining = list(current_order)
+    order = []
+    for group in groups:
+        for card in group:
+            if card in remaining:
+                remaining.remove(card)
+                order.append(card)
+    return order + remaining
+
+
+def _tag_instances(cards: List[str]) -> List[Tuple[str, int]]:
+    """Distinguish duplicate cards (two-deck games) by occurrence number"""
+    seen: Dict[str, int] = {}
+    tagged = []
+    for card in cards:
+        seen[card] = seen.get(card, 0) + 1
+        tagged.append((card, seen[card]))
+    return tagged
+
+
+def _longest_increasing_subsequence(values: List[int]) -> set:
+    """Indices of one longest strictly increasing subsequence, in O(n log n)"""
+    tails, tail_idx = [], []
+    parent = [-1] * len(values)
+    for i, value in enumerate(values):
+        pos = bisect_left(tails, value)
+        if pos == len(tails):
+            tails.append(value)
+            tail_idx.append(i)
+        else:
+            tails[pos] = value
+            tail_idx[pos] = i
+        parent[i] = tail_idx[pos - 1] if pos > 0 else -1
+    keep = set()
+    i = tail_idx[-1] if tail_idx else -1
+    while i >= 0:
+        keep.add(i)
+        i = parent[i]
+    return keep
+
+
+def plan_moves(current_order: List[str], groups: List[List[str]]) -> List[Tuple[int, int, str]]:
+    """Minimum list of (from_slot, to_slot, card) drags that turns current_order into the meld layout.
+
+    Cards on a longest increasing subsequence of target positions already sit in
+    the right relative order and never move; every other card is dragged once.
+    Slot indices account for the shifts caused by earlier drags.
+    """
+    current = _tag_instances(current_order)
+    target = _tag_instances(target_order(current_order, groups))
+    target_pos = {card: i for i, card in enumerate(target)}
+    keep = _longest_increasing_subsequence([target_pos[card] for card in current])
+    placed = {current[i] for i in keep}
+
+    hand = list(current)
+    moves = []
+    for i, card in enumerate(target):
+        if card in placed:
+            continue
+        src = hand.index(card)
+        hand.pop(src)
+        # Drop right after the nearest already-placed card that precedes it in the target
+        dst = 0
+        for prev in reversed(target[:i]):
+            if prev in placed:
+                dst = hand.index(prev) + 1
+                break
+        hand.insert(dst, card)
+        placed.add(card)
+        moves.append((src, dst, card[0]))
+    return moves
+
+
+def slot_position(slot: int, slot_count: int, screen_size: Tuple[int, int]) -> Tuple[int, int]:
+    """Screen coordinates of a hand slot centre"""
+    width, height = screen_size
+    left, right = HAND_X_RANGE
+    x = width * (left + (right - left) * (slot + 0.5) / max(slot_count, 1))
+    return int(x), int(height * HAND_Y)
+
+
+def moves_to_swipes(moves: List[Tuple[int, int, str]], slot_count: int,
+                    screen_size: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+    """Convert slot moves to (x1, y1, x2, y2) drags"""
+    swipes = []
+    for src, dst, _ in moves:
+        x1, y1 = slot_position(src, slot_count, screen_size)
+        x2, y2 = slot_position(dst, slot_count, screen_size)
+        swipes.append((x1, y1, x2, y2))
+    return swipes
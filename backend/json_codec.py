@@ -0,0 +1,38 @@
+import json
+import configparser
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional: the standard library encoder is the fallback
+    orjson = None
+
+CONFIG_FILE = 'config.ini'
+ENCODERS = ('auto', 'orjson', 'json')
+
+
+def load_encoder_name(path: str = CONFIG_FILE) -> str:
+    """Encoder from [PAYLOAD] encoder in config.ini: auto (orjson when installed), orjson or json"""
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    name = parser.get('PAYLOAD', 'encoder', fallback='auto').strip().lower()
+    if name not in ENCODERS:
+        print(f"❌ Unknown payload encoder '{name}', using auto")
+        name = 'auto'
+    if name == 'orjson' and orjson is None:
+        print("❌ orjson is not installed, using json")
+    return 'orjson' if name != 'json' and orjson is not None else 'json'
+
+
+ENCODER = load_encoder_name()
+_ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson is not None else 0
+
+
+def encode_json(value: Any) -> bytes:
+    """UTF-8 JSON for a message; orjson when enabled, json for anything orjson rejects"""
+    if ENCODER == 'orjson':
+        try:
+            return orjson.dumps(value, option=_ORJSON_OPTIONS)
+        except TypeError:
+            pass
+    return json.dumps(value).encode('utf-8')
@@ -0,0 +1,203 @@
+import gc
+import os
+import sys
+import time
+import tracemalloc
+import configparser
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows; RSS is then reported as 0
+    resource = None
+
+CONFIG_FILE = 'config.ini'
+DEFAULT_MEMORY = {
+    'enabled': True,
+    'interval': 60.0,            # seconds between checks
+    'tracemalloc': False,        # trace Python allocations to diff them by site (slows allocation-heavy code)
+    'trace_frames': 1,           # stack depth recorded per traced allocation
+    'top_sites': 10,             # allocation sites reported per check
+    'rss_mb': 0.0,               # process budget; 0 = unbudgeted
+    'snapshots_mb': 64.0,        # frame bytes, encoded payloads and JPEGs retained by the snapshot hub
+    'templates_mb': 128.0,       # template bank: resized sets and coarse-matcher downsamples
+    'crop_cache_mb': 8.0,
+    'tracker_mb': 16.0           # tracked card patches and motion thumbnails
+}
+MB = 1024 * 1024
+WARNINGS_KEPT = 20
+_IGNORED_SITES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>',
+                  '<unknown>')
+
+
+def load_memory_config(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Memory monitor settings and budgets from the [MEMORY] section of config.ini"""
+    config = dict(DEFAULT_MEMORY)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('MEMORY'):
+        for key, default in config.items():
+            if not parser.has_option('MEMORY', key):
+                continue
+            if isinstance(default, bool):
+                config[key] = parser.getboolean('MEMORY', key)
+            else:
+                config[key] = type(default)(parser.get('MEMORY', key))
+    return config
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024   # bytes on macOS, KiB elsewhere
+
+
+class MemoryMonitor:
+    """Periodic memory check: RSS, per-subsystem byte counters with budgets, and allocation growth.
+
+    Subsystems register a sizer and, if their memory can be rebuilt on demand,
+    an evict callback. A check that finds a subsystem over its budget evicts it
+    and records a warning; over the RSS budget every evictable subsystem is
+    evicted. With tracemalloc on, each check diffs a snapshot against the
+    previous one and reports the allocation sites that grew most.
+    """
+
+    def __init__(self, interval: float = 60.0, tracemalloc: bool = False, trace_frames: int = 1,
+                 top_sites: int = 10, rss_mb: float = 0.0, **budgets_mb):
+        self.interval = interval
+        self.trace = tracemalloc
+        self.trace_frames = trace_frames
+        self.top_sites = top_sites
+        self.rss_budget = int(rss_mb * MB)
+        self.budgets = {key[:-3]: int(value * MB) for key, value in budgets_mb.items()
+                        if key.endswith('_mb') and value > 0}
+        self.sizers: Dict[str, Callable[[], int]] = {}
+        self.evictors: Dict[str, Callable[[], None]] = {}
+        self.sizes: Dict[str, int] = {}
+        self.evictions: Dict[str, int] = {}
+        self.warnings = deque(maxlen=WARNINGS_KEPT)
+        self.growth: List[Dict[str, Any]] = []
+        self.rss = 0
+        self.peak_rss = 0
+        self.checks = 0
+        self.last_check = time.monotonic()
+        self.check_requested = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def register(self, name: str, size: Callable[[], int], evict: Callable[[], None] = None):
+        """Count a subsystem's bytes; `evict` frees what can be rebuilt when it is over budget"""
+        self.sizers[name] = size
+        if evict is not None:
+            self.evictors[name] = evict
+
+    def start_tracing(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+        self.trace = True
+
+    def request_check(self):
+        """Make the next due() true; the capture loop stays the only caller of check()"""
+        self.check_requested = True
+
+    def due(self, now: float = None) -> bool:
+        now = time.monotonic() if now is None else now
+        return self.check_requested or now - self.last_check >= self.interval
+
+    def measure(self) -> Dict[str, int]:
+        sizes = {}
+        for name, size in self.sizers.items():
+            try:
+                sizes[name] = int(size())
+            except Exception as e:
+                print(f"❌ Memory sizer error ({name}): {e}")
+        self.sizes = sizes
+        self.rss = rss_bytes()
+        self.peak_rss = max(self.peak_rss, self.rss)
+        return sizes
+
+    def _evict(self, name: str):
+        try:
+            self.evictors[name]()
+            self.evictions[name] = self.evictions.get(name, 0) + 1
+        except Exception as e:
+            print(f"❌ Memory eviction error ({name}): {e}")
+
+    def _warn(self, subsystem: str, used: int, budget: int, after: int, evicted: bool):
+        warning = {
+            'time': int(time.time() * 1000),
+            'subsystem': subsystem,
+            'bytes': used,
+            'budget': budget,
+            'afterBytes': after,
+            'evicted': evicted
+        }
+        self.warnings.append(warning)
+        print(f"⚠️ Memory budget exceeded: {subsystem} {used / MB:.1f} MB > {budget / MB:.1f} MB"
+              + (f", {after / MB:.1f} MB after eviction" if evicted else ""))
+        return warning
+
+    def check(self, now: float = None) -> List[Dict[str, Any]]:
+        """Measure, evict what is over budget, diff allocations; returns the new warnings"""
+        self.last_check = time.monotonic() if now is None else now
+        self.check_requested = False
+        self.checks += 1
+        before = self.measure()
+        rss_before = self.rss
+        over = [name for name, used in before.items() if used > self.budgets.get(name, float('inf'))]
+        rss_over = bool(self.rss_budget) and rss_before > self.rss_budget
+        targets = list(self.evictors) if rss_over else [name for name in over if name in self.evictors]
+        for name in targets:
+            self._evict(name)
+        if targets:
+            gc.collect()
+        after = self.measure() if targets else before
+        warnings = [self._warn(name, before[name], self.budgets[name], after.get(name, 0), name in targets)
+                    for name in over]
+        if rss_over:
+            warnings.append(self._warn('rss', rss_before, self.rss_budget, self.rss, bool(targets)))
+        if self.trace:
+            self._diff_allocations()
+        return warnings
+
+    def _diff_allocations(self):
+        if not tracemalloc.is_tracing():
+            self.start_tracing()   # the first check only takes the baseline
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in _IGNORED_SITES])
+        if self._snapshot is not None:
+            self.growth = [
+                {
+                    'site': str(stat.traceback[0]) if stat.traceback else '?',
+                    'sizeDiff': stat.size_diff,
+                    'size': stat.size,
+                    'countDiff': stat.count_diff
+                }
+                for stat in snapshot.compare_to(self._snapshot, 'lineno')[:self.top_sites]
+            ]
+        self._snapshot = snapshot
+
+    def report(self) -> Dict[str, Any]:
+        """Memory section of the 'performance' topic and of /memory"""
+        return {
+            'rssBytes': self.rss,
+            'peakRssBytes': self.peak_rss,
+            'rssBudget': self.rss_budget,
+            'subsystems': {
+                name: {'bytes': used, 'budget': self.budgets.get(name, 0)}
+                for name, used in self.sizes.items()
+            },
+            'evictions': dict(self.evictions),
+            'warnings': list(self.warnings),
+            'tracing': self.trace,
+            'checkPending': self.check_requested,
+            'growth': self.growth,
+            'checks': self.checks
+        }
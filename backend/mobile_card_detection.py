@@ -1,20 +1,45 @@
 import os
+import sys
+import time
+import math
 import cv2
 import base64
 import json
 import numpy as np
 import asyncio
+import argparse
+import signal
+import threading
 import websockets
 from datetime import datetime
 from PIL import Image
 from io import BytesIO
+from typing import Any, Dict, List, Optional
 from strategy_emitter import StrategyEmitter
 from agent_controller import AgentController
 from conn_handler import ConnectionHandler
-import pytesseract
+from game_snapshot import GameSnapshot, SnapshotHub
+from http import HTTPStatus
+from websockets.datastructures import Headers
+from websockets.http11 import Response
+from urllib.parse import urlsplit, parse_qs
+from perf_metrics import metrics
+from sampling_profiler import profiler, install_signal_trigger
+from session_archive import SessionRecorder, ReplaySource
+from frame_ring import FrameRing, RING_NAME, slot_capacity_for
+from pyramid_matcher import load_matcher_config, match_templates, find_templates
+from frame_deadline import FrameDeadline, StageCosts, load_deadline_config
+from frame_tracker import TemporalCardTracker, Detection, load_tracking_config
+from capture_scheduler import CaptureScheduler, HAND_SIZE, load_schedule_config
+from hand_arranger import plan_moves
+from motion_gate import MotionGate, load_motion_config
+from card_cascade import CardCascade, load_cascade_config
+from crop_cache import CropClassificationCache, load_crop_cache, load_crop_cache_config
+from memory_monitor import MemoryMonitor, load_memory_config
+from warm_start import (TemplateBank, startup, detection_rois, load_budgets, load_template_bank,
+                        load_calibration, save_calibration)
 
 CARD_TEMPLATE_DIR = 'templates/card_images'
-FRAME_DIR = 'frames'
 DETECTION_ROI = {
     'hand': (100, 800, 1200, 1000),
     'discard': (800, 600, 1000, 700)
@@ -23,24 +48,54 @@ DETECTION_ROI = {
 emitter = StrategyEmitter()
 agent = AgentController()
 conn_handler = ConnectionHandler()
+snapshot_hub = SnapshotHub()
+frame_counter = 0
+frame_source = None  # None = live ADB capture, otherwise e.g. a ReplaySource or SyntheticSource
+frame_ring = None    # shared-memory ring other processes read raw frames from (--ring)
+_ring_errors = 0
+CAPTURE_INTERVAL = 1.0
+MATCH_THRESHOLD = 0.6
+MATCHER_CONFIG = load_matcher_config()
+frame_tracker = TemporalCardTracker(**load_tracking_config())
+CROP_CACHE_CONFIG = load_crop_cache_config()
+CASCADE_CONFIG = load_cascade_config()
+card_cascade = CardCascade(**CASCADE_CONFIG) if CASCADE_CONFIG['enabled'] else None
+capture_scheduler = CaptureScheduler(**load_schedule_config())
+MOTION_CONFIG = load_motion_config()
+motion_gate = MotionGate(**MOTION_CONFIG) if MOTION_CONFIG['enabled'] else None
+DEADLINE_CONFIG = load_deadline_config()
+stage_costs = StageCosts(DEADLINE_CONFIG['smoothing'], DEADLINE_CONFIG['margin'])
+MEMORY_CONFIG = load_memory_config()
+memory_monitor = MemoryMonitor(**MEMORY_CONFIG) if MEMORY_CONFIG['enabled'] else None
+_last_strategy = None   # (analysis, melds, suggestion) reused when a frame runs out of budget
+_last_scores = None
+_crop_cache = None
+_template_bank = None
+_template_lock = threading.Lock()
+_calibrated_shape = None
+startup.mark('imports')
+
+def current_device():
+    """Device id used to label metrics for the active capture source"""
+    return frame_source.device_id if frame_source is not None else conn_handler.device_id
 
 def adb_capture_frame():
-    """Capture frame from ADB device"""
+    """Capture an encoded frame from the ADB device (in memory, no file round trip)"""
     try:
-        os.makedirs(FRAME_DIR, exist_ok=True)
-        frame_path = os.path.join(FRAME_DIR, "screen.png")
-        if conn_handler.capture_screenshot(frame_path):
-            return frame_path
+        with metrics.stage('capture', current_device()):
+            frame_bytes = conn_handler.capture_screenshot_bytes()
+        if frame_bytes:
+            return frame_bytes
         print("❌ ADB capture failed")
         return None
     except Exception as e:
         print(f"❌ ADB capture error: {e}")
         return None
 
-def frame_to_base64(image_path):
-    """Convert image to base64 string"""
+def frame_to_base64(image_source):
+    """Convert an image (path or file-like object) to base64 string"""
     try:
-        with Image.open(image_path) as img:
+        with Image.open(image_source) as img:
             img.thumbnail((800, 600), Image.Resampling.LANCZOS)
             buffered = BytesIO()
             img.save(buffered, format="PNG")
@@ -50,47 +105,147 @@ def frame_to_base64(image_path):
         return ""
 
 def load_card_templates():
-    """Load card templates for matching"""
-    templates = {}
-    try:
-        if os.path.exists(CARD_TEMPLATE_DIR):
-            for file in os.listdir(CARD_TEMPLATE_DIR):
-                if file.endswith('.png'):
-                    path = os.path.join(CARD_TEMPLATE_DIR, file)
-                    template = cv2.imread(path)
-                    if template is not None:
-                        templates[file.replace('.png', '')] = template
-        print(f"✅ Loaded {len(templates)} card templates")
-    except Exception as e:
-        print(f"❌ Template loading error: {e}")
-    return templates
+    """Compiled card templates, loaded once per process from the warm-start cache"""
+    global _template_bank
+    if _template_bank is None:
+        with _template_lock:
+            if _template_bank is None:
+                try:
+                    _template_bank = load_template_bank(CARD_TEMPLATE_DIR)
+                    print(f"✅ Loaded {len(_template_bank)} card templates")
+                except Exception as e:
+                    print(f"❌ Template loading error: {e}")
+                    return {}
+    return _template_bank
+
+def match_card_templates(roi, templates, coarse_scale: int = None, cascade: CardCascade = None):
+    """Match cards in ROI using coarse-to-fine template matching (coarse_scale 1 = full resolution).
 
-def match_card_templates(roi, templates):
-    """Match cards in ROI using template matching"""
+    A cascade, if given, first drops templates the ROI's colours rule out.
+    """
     matches = []
     try:
         if roi is None or not templates:
             return matches
         gray_roi = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        for name, template in templates.items():
-            template_gray = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-            h, w = template_gray.shape
-            roi_h, roi_w = gray_roi.shape
-            scale = min(roi_w / w, roi_h / h) * 0.3
-            new_w, new_h = int(w * scale), int(h * scale)
-            if new_w > 0 and new_h > 0:
-                resized = cv2.resize(template_gray, (new_w, new_h))
-                res = cv2.matchTemplate(gray_roi, resized, cv2.TM_CCOEFF_NORMED)
-                loc = np.where(res >= 0.6)
-                if len(loc[0]) > 0:
-                    matches.append(name)
+        bank = templates if isinstance(templates, TemplateBank) else TemplateBank(templates)
+        settings = dict(MATCHER_CONFIG)
+        if coarse_scale is not None:
+            settings['coarse_scale'] = coarse_scale
+        scaled = bank.scaled(gray_roi.shape)
+        if cascade is not None:
+            scaled = cascade.prune(roi, scaled)
+        matches = match_templates(gray_roi, scaled, MATCH_THRESHOLD,
+                                  coarse_cache=bank.coarse_cache, **settings)
     except Exception as e:
         print(f"❌ Template matching error: {e}")
     return matches
 
+def detect_cards(frame, templates, coarse_scale: int = None, cascade: CardCascade = None):
+    """Run template matching on the hand and discard ROIs of a frame"""
+    (hy0, hy1, hx0, hx1), (dy0, dy1, dx0, dx1) = detection_rois(*frame.shape[:2])
+    hand_roi = frame[hy0:hy1, hx0:hx1]
+    discard_roi = frame[dy0:dy1, dx0:dx1]
+    return (match_card_templates(hand_roi, templates, coarse_scale, cascade),
+            match_card_templates(discard_roi, templates, coarse_scale, cascade))
+
+def get_crop_cache():
+    """Crop classification cache for the current device and template set, loaded once"""
+    global _crop_cache
+    if _crop_cache is None and CROP_CACHE_CONFIG['enabled']:
+        bank = load_card_templates()
+        if bank:
+            _crop_cache = load_crop_cache(current_device(), getattr(bank, 'signature', ''), CROP_CACHE_CONFIG)
+            print(f"✅ Loaded {len(_crop_cache)} cached card crops")
+    return _crop_cache
+
+def locate_cards(frame, templates, coarse_scale: int = None, crop_cache: CropClassificationCache = None,
+                 cascade: CardCascade = None) -> List[Detection]:
+    """Hand and discard template matches with their positions in frame coordinates.
+
+    With a crop cache, the card positions of the previous detection are looked up
+    by perceptual hash first; only the remaining templates are searched for, and
+    not at all while every known position resolves (see needs_search).
+    """
+    detections = []
+    if not templates:
+        return detections
+    bank = templates if isinstance(templates, TemplateBank) else TemplateBank(templates)
+    settings = dict(MATCHER_CONFIG)
+    if coarse_scale is not None:
+        settings['coarse_scale'] = coarse_scale
+    for region, (y0, y1, x0, x1) in zip(('hand', 'discard'), detection_rois(*frame.shape[:2])):
+        gray_roi = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        resolved, hits = {}, 0
+        if crop_cache is not None:
+            for x, y, w, h in crop_cache.layout.get(region, ()):
+                name = crop_cache.lookup(gray_roi[y - y0:y - y0 + h, x - x0:x - x0 + w])
+                if name:
+                    hits += 1
+                    resolved.setdefault(name, (x, y, w, h))
+            detections.extend((region, name, box, crop_cache.store_score) for name, box in resolved.items())
+            if not crop_cache.needs_search(region, hits):
+                continue
+        scaled = bank.scaled(gray_roi.shape)
+        if cascade is not None:
+            scaled = cascade.prune(frame[y0:y1, x0:x1], scaled)
+        scaled = [(name, template) for name, template in scaled if name not in resolved]
+        for name, (x, y, w, h), score in find_templates(gray_roi, scaled, MATCH_THRESHOLD,
+                                                        coarse_cache=bank.coarse_cache, **settings):
+            detections.append((region, name, (x0 + x, y0 + y, w, h), score))
+            if crop_cache is not None:
+                crop_cache.store(gray_roi[y:y + h, x:x + w], name, score)
+        if crop_cache is not None:
+            crop_cache.remember_layout(region, [box for r, _, box, _ in detections if r == region])
+    return detections
+
+def warm_start():
+    """Load templates and pre-scale them for the last calibrated frame size before the first frame"""
+    bank = load_card_templates()
+    frame_shape = load_calibration(current_device()).get('frame_shape')
+    if bank and frame_shape:
+        for y0, y1, x0, x1 in detection_rois(*frame_shape[:2]):
+            bank.scaled((y1 - y0, x1 - x0))
+    get_crop_cache()
+    startup.mark('warm')
+
+def trim_templates():
+    """Drop template sets resized for other frame sizes, coarse downsamples and the cascade's traits"""
+    if not isinstance(_template_bank, TemplateBank):
+        return
+    keep = []
+    if _calibrated_shape is not None:
+        keep = [(y1 - y0, x1 - x0) for y0, y1, x0, x1 in detection_rois(*_calibrated_shape[:2])]
+    _template_bank.trim(keep)
+    if card_cascade is not None:
+        card_cascade.traits.clear()
+
+def watch_memory():
+    """Register the structures that grow over a long session with the memory monitor"""
+    if memory_monitor is None:
+        return
+    memory_monitor.register('snapshots', snapshot_hub.nbytes, snapshot_hub.trim)
+    memory_monitor.register('templates', lambda: _template_bank.nbytes() if isinstance(_template_bank, TemplateBank)
+                            else 0, trim_templates)
+    memory_monitor.register('crop_cache', lambda: _crop_cache.nbytes() if _crop_cache is not None else 0,
+                            lambda: _crop_cache is not None and _crop_cache.shrink())
+    memory_monitor.register('tracker', lambda: frame_tracker.nbytes() + (motion_gate.nbytes() if motion_gate else 0))
+    if MEMORY_CONFIG['tracemalloc']:
+        memory_monitor.start_tracing()
+
+async def check_memory():
+    """Run a due memory check off the event loop; a budget warning is published without waiting"""
+    if memory_monitor is None or not memory_monitor.due():
+        return
+    warnings = await asyncio.to_thread(memory_monitor.check)
+    metrics.record_memory(memory_monitor.report())
+    if warnings:
+        metrics.maybe_publish(interval=0.0)
+
 def extract_text_from_image(img):
     """Extract text from image using OCR"""
     try:
+        import pytesseract  # only needed once scoreboard OCR is enabled; slow to import
         gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         return pytesseract.image_to_string(gray, config='--psm 6').strip()
     except Exception as e:
@@ -101,37 +256,109 @@ def get_scoreboard_data(frame):
     """Extract scoreboard data from frame"""
     return [["User", 120], ["Player2", 90]]  # Placeholder
 
-def build_game_state(frame):
-    """Build complete game state from frame"""
+def new_deadline(started: float = None) -> FrameDeadline:
+    """Budget for analysing one frame, from decode to payload.
+
+    Capture time and the capture interval are deliberately left out: a slow
+    screencap or a 0 interval (replays and synthetic sources pace themselves)
+    must not eat into the analysis. A budget of 0 means unbudgeted.
+    """
+    budget = DEADLINE_CONFIG['frame_budget_ms'] / 1000
+    if not DEADLINE_CONFIG['enabled'] or budget <= 0:
+        budget = float('inf')
+    return FrameDeadline(budget, stage_costs, started)
+
+def build_game_snapshot(frame, frame_id: int = 0, frame_bytes: bytes = None,
+                        deadline: FrameDeadline = None) -> GameSnapshot:
+    """Analyse a frame once and package every derived result into an immutable snapshot.
+
+    Stages that are projected to overrun the frame's deadline fall back to
+    cheaper modes in order: skip OCR, coarser detection, reuse the last
+    strategy, skip the preview. While the motion gate sees the card ROIs
+    moving, detection, OCR and strategy are skipped and the last results are
+    reported; the first settled frame gets a full classification.
+    """
+    global _last_strategy, _last_scores
+    device = current_device()
+    deadline = deadline or new_deadline()
     try:
-        templates = load_card_templates()
-        h, w = frame.shape[:2]
-        hand_roi = frame[int(h*0.7):int(h*0.9), int(w*0.1):int(w*0.9)]
-        discard_roi = frame[int(h*0.4):int(h*0.6), int(w*0.4):int(w*0.6)]
+        with metrics.stage('template_load', device):
+            templates = load_card_templates()
+        crop_cache = get_crop_cache()
+        stable, settled = True, False
+        if motion_gate is not None:
+            with metrics.stage('motion_gate', device):
+                stable = motion_gate.observe(frame, detection_rois(*frame.shape[:2]))
+            settled = motion_gate.settled
+        deadline.plan(['detect', 'ocr', 'strategy', 'preview', 'serialize'],
+                      stable and (settled or frame_tracker.needs_full()))
+        low_detection = not deadline.allows('low_detection', 'detect')
+        coarse_scale = DEADLINE_CONFIG['low_detection_scale'] if low_detection else None
+
+        def detect():
+            with deadline.timed('detect_low' if low_detection else 'detect'):
+                return locate_cards(frame, templates, coarse_scale, crop_cache=crop_cache, cascade=card_cascade)
+
+        # Full classification only when the tracker asks for it; otherwise cards are followed cheaply
+        if stable:
+            began = time.perf_counter()
+            hand_cards, discard_card, full = frame_tracker.update(frame, detect, force_full=settled)
+            seconds = time.perf_counter() - began
+            metrics.record('template_match' if full else 'track', seconds, device)
+            if not full:
+                stage_costs.observe('track', seconds)
+        else:
+            # Mid-animation: a blurred frame would only produce a garbage hand, so keep the last one
+            hand_cards, discard_card = frame_tracker.cards('hand'), frame_tracker.cards('discard')
 
-        hand_cards = match_card_templates(hand_roi, templates)
-        discard_card = match_card_templates(discard_roi, templates)
+        discard_top = discard_card[0] if discard_card else None
+        if stable:
+            # Judged under the turn the frame was captured in, before the scheduler moves it on
+            agent.observe_frame(hand_cards, discard_top)
+        capture_scheduler.observe(hand_cards, discard_top, float(frame[::16, ::16].mean()), agent.game_state,
+                                  moving=not stable)
+        if capture_scheduler.turn:
+            agent.update_turn(capture_scheduler.turn)
 
-        melds = emitter.generate_melds(hand_cards)
-        agent_suggestion = agent.suggest_optimal_action(
-            hand_cards, melds, discard_card, "5♦"
-        )
+        deadline.plan(['ocr', 'strategy', 'preview', 'serialize'])
+        if (stable and deadline.allows('skip_ocr', 'ocr')) or _last_scores is None:
+            with deadline.timed('ocr'), metrics.stage('ocr', device):
+                scores = _last_scores = get_scoreboard_data(frame)
+            if scores and len(scores) >= 2:
+                agent.update_scores(scores[0][1], scores[1][1])
+        else:
+            scores = _last_scores
 
-        scores = get_scoreboard_data(frame)
-        if scores and len(scores) >= 2:
-            agent.update_scores(scores[0][1], scores[1][1])
+        deadline.plan(['strategy', 'preview', 'serialize'])
+        if (stable and deadline.allows('reuse_strategy', 'strategy')) or _last_strategy is None:
+            with deadline.timed('strategy'), metrics.stage('strategy', device):
+                analysis = emitter.analyze_meld_structure(hand_cards)
+                melds = emitter.melds_from_analysis(analysis)
+                agent_suggestion = agent.suggest_optimal_action(
+                    hand_cards, melds, discard_card, "5♦", analysis=analysis
+                )
+            _last_strategy = (analysis, melds, agent_suggestion)
+        else:
+            analysis, melds, agent_suggestion = _last_strategy
 
-        frame_path = os.path.join(FRAME_DIR, "screen.png")
-        frame_preview = frame_to_base64(frame_path) if os.path.exists(frame_path) else ""
+        deadline.plan(['preview', 'serialize'])
+        frame_preview = ""
+        if deadline.allows('skip_preview', 'preview'):
+            with deadline.timed('preview'), metrics.stage('preview_encode', device):
+                if not frame_bytes:
+                    ok, encoded = cv2.imencode('.png', frame)
+                    frame_bytes = encoded.tobytes() if ok else None
+                frame_preview = frame_to_base64(BytesIO(frame_bytes)) if frame_bytes else ""
 
-        return {
+        detection = {
+            "gameJoker": "5♦",
+            "discarded": discard_top,
+            "cards": hand_cards
+        }
+        payload = {
             "type": "detection",
             "payload": {
-                "handCards": {
-                    "gameJoker": "5♦",
-                    "discarded": discard_card[0] if discard_card else None,
-                    "cards": hand_cards
-                },
+                "handCards": detection,
                 "melds": melds,
                 "scores": scores,
                 "suggestedAction": agent_suggestion['action'],
@@ -139,66 +366,439 @@ def build_game_state(frame):
                 "actionReason": agent_suggestion['reason'],
                 "framePreview": frame_preview,
                 "frameCount": datetime.now().strftime("%H%M%S"),
+                "timestamp": int(time.time() * 1000),
                 "connectionStatus": conn_handler.get_connection_status(),
-                "gameStats": agent.get_game_statistics()
+                "gameStats": agent.get_game_statistics(),
+                "tracking": frame_tracker.summary(),
+                "cropCache": crop_cache.stats() if crop_cache else None,
+                "cascade": card_cascade.report() if card_cascade else None,
+                "schedule": capture_scheduler.summary(),
+                "motion": motion_gate.summary() if motion_gate else None,
+                "degradation": deadline.report()
             }
         }
+        with deadline.timed('serialize' if frame_preview else 'serialize_lite'), metrics.stage('serialize', device):
+            snapshot = GameSnapshot(frame_id, payload, detection=detection, analysis=analysis,
+                                    melds=melds, suggestion=agent_suggestion, frame_bytes=frame_bytes,
+                                    device=device)
+        metrics.record_frame(len(hand_cards), agent_suggestion['confidence'], device)
+        metrics.record_degradation(deadline.report()['mode'], deadline.remaining() < 0, device)
+        if crop_cache is not None:
+            crop_cache.save_if_due(CROP_CACHE_CONFIG['save_interval'])
+        return snapshot
     except Exception as e:
         print(f"❌ Game state error: {e}")
-        return {
+        return GameSnapshot(frame_id, {
             "type": "error",
             "message": f"Game state error: {str(e)}"
-        }
+        }, device=device)
+
+def build_game_state(frame):
+    """Build complete game state from frame"""
+    return dict(build_game_snapshot(frame).payload)
+
+def read_frame_bytes():
+    """Encoded bytes of the next frame from the active capture source"""
+    if frame_source is not None:
+        return frame_source.read()
+    return adb_capture_frame()
+
+def remember_frame_shape(shape):
+    """Store the frame size with the device calibration so a restart can pre-scale templates"""
+    global _calibrated_shape
+    if shape != _calibrated_shape:
+        _calibrated_shape = shape
+        if load_calibration(current_device()).get('frame_shape') != list(shape):
+            save_calibration(current_device(), frame_shape=list(shape))
+
+def share_frame(frame):
+    """Copy a decoded frame into the shared ring for out-of-process readers (frame_ring.py watch/record).
+
+    Detection and the preview stay in this process on the same decoded frame;
+    a frame the ring cannot take skips only the ring.
+    """
+    global _ring_errors
+    if frame_ring is None:
+        return
+    try:
+        frame_ring.write(frame)
+    except ValueError as e:
+        _ring_errors += 1
+        if _ring_errors == 1:
+            print(f"❌ Frame ring write error (further errors are counted, not printed): {e}")
+
+def capture_snapshot(frame_id: int) -> GameSnapshot:
+    """Capture one frame and turn it into a snapshot"""
+    frame_bytes = read_frame_bytes()
+    if frame_bytes:
+        with metrics.stage('decode', current_device()):
+            frame = cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if frame is not None:
+            remember_frame_shape(frame.shape)
+            share_frame(frame)
+            return build_game_snapshot(frame, frame_id, frame_bytes)
+        return GameSnapshot(frame_id, {"type": "error", "message": "Failed to read frame"},
+                            device=current_device())
+    if frame_source is not None:
+        return GameSnapshot(frame_id, {"type": "error", "message": "Capture source finished"},
+                            device=current_device())
+    return GameSnapshot(frame_id, {"type": "error", "message": "ADB capture failed"}, device=current_device())
+
+def next_capture_interval() -> float:
+    """Replay and synthetic sources keep their own pacing; a live device follows the scheduler"""
+    if frame_source is not None:
+        return getattr(frame_source, 'capture_interval', CAPTURE_INTERVAL)
+    return capture_scheduler.interval()
+
+async def screen_paused() -> bool:
+    """After dark frames, poll the device's display state instead of capturing"""
+    if frame_source is not None or capture_scheduler.mode != 'screen_off':
+        return False
+    return not await asyncio.to_thread(conn_handler.is_screen_on)
+
+async def capture_loop():
+    """Single producer: capture and analyse each frame once, then publish it to all consumers"""
+    global frame_counter
+    while True:
+        began = time.monotonic()
+        if snapshot_hub.has_clients() and not await screen_paused():
+            try:
+                frame_counter += 1
+                snapshot = await asyncio.to_thread(capture_snapshot, frame_counter)
+                snapshot_hub.publish(snapshot)
+                if 'first_frame' not in startup.marks:
+                    startup.mark('first_frame')
+                    print(f"⏱️ Startup: {startup.report()}")
+                await check_memory()
+                metrics.maybe_publish()
+            except Exception as e:
+                print(f"❌ Capture loop error: {e}")
+        await asyncio.sleep(max(0.0, next_capture_interval() - (time.monotonic() - began)))
+
+def _int_option(command: dict, key: str, default):
+    """Integer field of a client command, parsed like the matching HTTP query parameter"""
+    value = command.get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{key} must be an integer")
+    try:
+        return int(value)
+    except OverflowError:
+        raise ValueError(f"{key} must be finite")
+
+def _float_option(command: dict, key: str, default: float) -> float:
+    """Finite number field of a client command; missing, null or 0 gives the default"""
+    value = command.get(key) or default
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{key} must be a number")
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError(f"{key} must be finite")
+    return value
+
+async def send_command_error(websocket, message: str):
+    await websocket.send(json.dumps({"type": "error", "message": message}))
+
+async def read_client_commands(websocket, options: dict):
+    """Apply control messages from a client until it disconnects"""
+    try:
+        async for message in websocket:
+            try:
+                command = json.loads(message)
+            except (TypeError, ValueError):
+                continue
+            if not isinstance(command, dict):
+                continue
+            if command.get('command') == 'subscribe':
+                try:
+                    rate = _float_option(command, 'rate', 0.0)
+                except ValueError:
+                    await send_command_error(websocket, "rate must be a finite number")
+                    continue
+                options['rate'] = max(0.0, rate)   # 0 = every snapshot
+                options['preview'] = bool(command.get('preview', True))
+            elif command.get('command') == 'events':
+                try:
+                    before = _int_option(command, 'before', None)
+                    limit = _int_option(command, 'limit', 50)
+                except ValueError:
+                    await send_command_error(websocket, "before and limit must be integers")
+                    continue
+                action = command.get('action')
+                page = agent.event_store.query(before, limit, action if isinstance(action, str) else None)
+                await websocket.send(json.dumps({"type": "events", "payload": page}))
+            elif command.get('command') == 'arrange':
+                result = await asyncio.to_thread(arrange_hand, snapshot_hub.latest)
+                await websocket.send(json.dumps({"type": "arrange", "payload": result}))
+            elif command.get('command') == 'profile':
+                try:
+                    seconds = _float_option(command, 'seconds', 10.0)
+                except ValueError:
+                    await send_command_error(websocket, "seconds must be a finite number")
+                    continue
+                started = profiler.start(seconds)   # clamped to the profiler's range
+                await websocket.send(json.dumps({"type": "profile", "payload": profiler.status()}))
+                if started:
+                    asyncio.create_task(send_profile_result(websocket))
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
+def arrange_hand(snapshot: Optional[GameSnapshot]) -> Dict[str, Any]:
+    """Drag the hand of a snapshot into its melds: the detected cards give the on-screen slot order
+    (the tracker reports them left to right), the strategy's melds the grouping"""
+    if frame_source is not None:
+        return {"ok": False, "message": "arranging needs a live device"}
+    hand = list(snapshot.detection['cards']) if snapshot is not None and snapshot.detection else []
+    if len(hand) not in (HAND_SIZE, HAND_SIZE + 1):
+        # A missed card (or a duplicate the tracker merged) would shift every slot after it
+        return {"ok": False, "message": f"hand not fully detected ({len(hand)} cards)"}
+    melds = [list(meld) for meld in snapshot.melds]
+    moves = plan_moves(hand, melds)
+    screen_size = (_calibrated_shape[1], _calibrated_shape[0]) if _calibrated_shape else None
+    ok = conn_handler.arrange_hand(hand, melds, screen_size)
+    return {"ok": ok, "moves": len(moves), "message": "" if ok else "swipes failed"}
+
+async def send_profile_result(websocket):
+    """Send the profile summary to the client that asked for it once sampling ends"""
+    await asyncio.to_thread(profiler.done.wait)
+    try:
+        await websocket.send(json.dumps({"type": "profile", "payload": {"status": "done", **profiler.last_summary}}))
+    except websockets.exceptions.ConnectionClosed:
+        pass
+
+async def profile_endpoint(query: dict) -> Response:
+    """/profile?seconds=N samples the server for N seconds and returns the folded stacks;
+    /profile alone reports whether a profile is running"""
+    if 'seconds' not in query:
+        return http_response(HTTPStatus.OK, json.dumps(profiler.status()).encode(), 'application/json')
+    try:
+        seconds = float(query['seconds'][0])
+    except ValueError:
+        return http_response(HTTPStatus.BAD_REQUEST, b"seconds must be a number\n")
+    if not math.isfinite(seconds):
+        return http_response(HTTPStatus.BAD_REQUEST, b"seconds must be a finite number\n")
+    if not profiler.start(seconds):
+        return http_response(HTTPStatus.CONFLICT, b"a profile is already running\n")
+    await asyncio.to_thread(profiler.done.wait)
+    with open(profiler.path, 'rb') as f:
+        return http_response(HTTPStatus.OK, f.read())
+
+async def memory_endpoint(query: dict) -> Response:
+    """/memory returns the last memory check; /memory?check=1 asks the capture loop to run one
+    after the current frame (eviction must not race detection), reported as checkPending"""
+    if memory_monitor is None:
+        return http_response(HTTPStatus.NOT_FOUND, b"memory monitor is disabled\n")
+    if query.get('check', ['0'])[0] not in ('0', 'false'):
+        memory_monitor.request_check()
+    return http_response(HTTPStatus.OK, json.dumps(memory_monitor.report()).encode(), 'application/json')
 
 async def handle_client(websocket):
     """Handle WebSocket client connection"""
     print(f"✅ Client connected: {websocket.remote_address}")
+    queue = snapshot_hub.subscribe()
+    performance_version = metrics.performance_version
+    # rate: max detection messages per second (0 = every frame); preview: include framePreview
+    options = {'rate': 0.0, 'preview': True}
+    reader = asyncio.create_task(read_client_commands(websocket, options))
+    last_sent = 0.0
     try:
         await websocket.send(json.dumps({
             "type": "status",
             "message": "backend_ready"
         }))
         while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, reader}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                print("❌ Client disconnected")
+                break
+            snapshot = getter.result()
+            now = time.monotonic()
+            if options['rate'] > 0 and now - last_sent < 1.0 / options['rate']:
+                continue
+            last_sent = now
             try:
-                frame_path = adb_capture_frame()
-                if frame_path and os.path.exists(frame_path):
-                    frame = cv2.imread(frame_path)
-                    if frame is not None:
-                        payload = build_game_state(frame)
-                        await websocket.send(json.dumps(payload))
-                    else:
-                        await websocket.send(json.dumps({
-                            "type": "error",
-                            "message": "Failed to read frame"
-                        }))
-                else:
-                    await websocket.send(json.dumps({
-                        "type": "error",
-                        "message": "ADB capture failed"
-                    }))
+                # Every client gets the snapshot's one encoded buffer, sent as a text frame
+                with metrics.stage('send', current_device()):
+                    await websocket.send(snapshot.bytes_for(options['preview']), text=True)
+                metrics.record_delivery(snapshot.message_type)
+                if metrics.performance_version != performance_version:
+                    performance_version = metrics.performance_version
+                    for message in metrics.performance_messages.values():
+                        await websocket.send(message, text=True)
+                    metrics.record_delivery('performance', len(metrics.performance_messages))
             except websockets.exceptions.ConnectionClosed:
                 print("❌ Client disconnected")
                 break
             except Exception as e:
                 print(f"❌ Send error: {e}")
-                await websocket.send(json.dumps({
-                    "type": "error",
-                    "message": str(e)
-                }))
-            await asyncio.sleep(1)
     except Exception as e:
         print(f"❌ Client handler error: {e}")
+    finally:
+        reader.cancel()
+        snapshot_hub.unsubscribe(queue)
+
+def http_response(status: HTTPStatus, body: bytes = b'', content_type: str = 'text/plain; charset=utf-8',
+                  etag: str = None) -> Response:
+    """Plain HTTP response for process_request; cacheable responses carry an ETag"""
+    headers = Headers()
+    if status != HTTPStatus.NOT_MODIFIED:
+        headers['Content-Type'] = content_type
+        headers['Content-Length'] = str(len(body))
+    if etag:
+        headers['ETag'] = etag
+        headers['Cache-Control'] = 'no-cache'
+    return Response(status.value, status.phrase, headers, body)
+
+def etag_matches(request, etag: str) -> bool:
+    if_none_match = request.headers.get('If-None-Match', '')
+    return if_none_match.strip() == '*' or etag in (tag.strip() for tag in if_none_match.split(','))
+
+def cached_response(request, etag: str, content_type: str, body) -> Response:
+    """304 when the client already holds this version, otherwise the pre-built body"""
+    if etag_matches(request, etag):
+        return http_response(HTTPStatus.NOT_MODIFIED, etag=etag)
+    body = body() if callable(body) else body
+    if not body:
+        return http_response(HTTPStatus.NOT_FOUND, b"no frame for this snapshot\n")
+    return http_response(HTTPStatus.OK, body, content_type, etag)
+
+SNAPSHOT_RESOURCES = {"state", "frame.jpg", "metrics"}
+
+async def snapshot_endpoint(request, resource: str, device: str, query: dict):
+    """/state, /frame.jpg and /metrics served from the latest snapshot; never triggers a capture"""
+    if resource == "metrics":
+        version = metrics.performance_version
+        return cached_response(request, f'"metrics-{device or "all"}-{version}"', 'text/plain; version=0.0.4',
+                               lambda: metrics.cached_text(device).encode())
+    snapshot = snapshot_hub.poll(device)
+    if snapshot is None:
+        return http_response(HTTPStatus.NOT_FOUND, b"no snapshot yet\n")
+    if resource == "state":
+        preview = query.get('preview', ['1'])[0] not in ('0', 'false')
+        etag = snapshot.etag if preview else snapshot.etag[:-1] + '-lite"'
+        metrics.record_delivery(snapshot.message_type)
+        return cached_response(request, etag, 'application/json', lambda: snapshot.bytes_for(preview))
+    if etag_matches(request, snapshot.etag):
+        return http_response(HTTPStatus.NOT_MODIFIED, etag=snapshot.etag)
+    # JPEG encoding runs once per snapshot, off the event loop
+    return cached_response(request, snapshot.etag, 'image/jpeg', await asyncio.to_thread(snapshot.jpeg))
+
+async def process_request(connection, request):
+    """Serve metrics, snapshots and the event log over HTTP on the WebSocket port"""
+    url = urlsplit(request.path)
+    parts = url.path.strip("/").split("/")
+    if len(parts) == 3 and parts[0] == "devices" and parts[2] in SNAPSHOT_RESOURCES:
+        return await snapshot_endpoint(request, parts[2], parts[1], parse_qs(url.query))
+    if len(parts) == 1 and parts[0] in SNAPSHOT_RESOURCES:
+        return await snapshot_endpoint(request, parts[0], None, parse_qs(url.query))
+    if url.path == "/profile":
+        return await profile_endpoint(parse_qs(url.query))
+    if url.path == "/memory":
+        return await memory_endpoint(parse_qs(url.query))
+    if url.path == "/events":
+        query = parse_qs(url.query)
+        try:
+            before = int(query['before'][0]) if 'before' in query else None
+            limit = int(query.get('limit', ['50'])[0])
+        except ValueError:
+            return connection.respond(HTTPStatus.BAD_REQUEST, "before and limit must be integers\n")
+        page = agent.event_store.query(before, limit, query.get('action', [None])[0])
+        response = connection.respond(HTTPStatus.OK, json.dumps(page))
+        response.headers['Content-Type'] = 'application/json'
+        return response
+    return None
 
 async def websocket_server():
     """Start WebSocket server"""
     print("🚀 Starting WebSocket server on ws://localhost:8787")
-    if conn_handler.check_adb_connection():
+    if frame_source is not None:
+        print(f"🎞️ Using capture source {frame_source.device_id}")
+    elif conn_handler.check_adb_connection():
         print("✅ ADB connection verified")
     else:
         print("❌ ADB connection failed - make sure device is connected")
-    async with websockets.serve(handle_client, "localhost", 8787):
+    watch_memory()
+    warming = asyncio.create_task(asyncio.to_thread(warm_start))
+    async with websockets.serve(handle_client, "localhost", 8787, process_request=process_request):
         print("✅ WebSocket server running on ws://localhost:8787")
-        await asyncio.Future()
+        await warming
+        startup.mark('ready')
+        print(f"⏱️ Startup: {startup.report()}")
+        await capture_loop()
+
+def startup_check(frame_path: str, frames: int = 5) -> bool:
+    """Time imports, warm-up and the first frame against steady state; False if over budget"""
+    budgets = load_budgets()
+    warm_start()
+    startup.mark('ready')
+    frame = cv2.imread(frame_path)
+    if frame is None:
+        print(f"❌ Could not read {frame_path}")
+        return False
+    remember_frame_shape(frame.shape)
+    timings = []
+    for i in range(frames + 1):
+        began = time.perf_counter()
+        build_game_snapshot(frame, i)
+        timings.append((time.perf_counter() - began) * 1000)
+    first, steady = timings[0], sorted(timings[1:])[len(timings[1:]) // 2]
+    results = {
+        'import_ms': startup.marks['imports'],
+        'ready_ms': startup.marks['ready'],
+        'first_frame_ratio': first / steady if steady else 0.0
+    }
+    print(f"⏱️ {startup.report()} | first frame {first:.0f} ms | steady {steady:.0f} ms")
+    passed = True
+    for key, value in results.items():
+        ok = value <= budgets[key]
+        passed = passed and ok
+        print(f"{'✅' if ok else '❌'} {key}: {value:.2f} (budget {budgets[key]:.2f})")
+    return passed
 
 if __name__ == "__main__":
-    asyncio.run(websocket_server())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="RMZ01 detection backend")
+    parser.add_argument("--record", help="append captured frames and payloads to this session archive")
+    parser.add_argument("--replay", help="use a session archive instead of the ADB device")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1 = real time, 0 = max)")
+    parser.add_argument("--start", type=float, default=0.0, help="replay start offset in seconds")
+    parser.add_argument("--loop", action="store_true", help="restart the replay when it ends")
+    parser.add_argument("--synthetic", type=float, metavar="FPS",
+                        help="render synthetic table frames at this rate instead of using a device")
+    parser.add_argument("--startup-check", metavar="FRAME",
+                        help="measure start-up time on a saved frame and exit 1 if over budget")
+    parser.add_argument("--ring", nargs="?", const=RING_NAME, metavar="NAME",
+                        help="share raw frames with other processes through a shared-memory ring")
+    args = parser.parse_args()
+    if args.startup_check:
+        sys.exit(0 if startup_check(args.startup_check) else 1)
+
+    # Let SIGTERM unwind normally so the recorder can write its index
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    install_signal_trigger()
+    recorder = None
+    if args.replay:
+        frame_source = ReplaySource(args.replay, args.speed, args.loop)
+        frame_source.seek_time(args.start)
+    elif args.synthetic is not None:
+        from synthetic_frames import SyntheticTable, SyntheticSource
+        frame_source = SyntheticSource(SyntheticTable(), args.synthetic)
+    if args.record:
+        recorder = SessionRecorder(args.record, append=True)
+        snapshot_hub.add_listener(recorder.on_snapshot)
+    if args.ring:
+        # Slots fit the device's last calibrated frame size, or QHD when it has none yet
+        capacity = slot_capacity_for(load_calibration(current_device()).get('frame_shape'))
+        frame_ring = FrameRing(args.ring, slot_capacity=capacity, create=True)
+        print(f"🔁 Sharing frames on ring '{args.ring}' ({frame_ring.slots} slots of {capacity // 1024} KiB)")
+    try:
+        asyncio.run(websocket_server())
+    finally:
+        if recorder:
+            recorder.close()
+        if frame_ring:
+            frame_ring.close()
+        if _crop_cache is not None and _crop_cache.dirty:
+            _crop_cache.save()
\ No newline at end of file
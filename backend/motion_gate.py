@@ -0,0 +1,111 @@
+import configparser
+import cv2
+import numpy as np
+from typing import Any, Dict, List, Tuple
+
+CONFIG_FILE = 'config.ini'
+DEFAULT_MOTION = {
+    'enabled': True,
+    'stable_frames': 1,       # consecutive still frames needed after motion before detection runs again
+    'pixel_delta': 18,        # grey-level change of a thumbnail pixel that counts as moved
+    'motion_share': 0.01,     # share of moved thumbnail pixels in an ROI that makes the frame unstable
+    'max_hold': 6,            # frames held back at most; continuous animation is then processed anyway
+    'downscale': 8            # ROI thumbnail = ROI / downscale on each side
+}
+
+
+def load_motion_config(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Motion gate settings from the [MOTION] section of config.ini"""
+    config = dict(DEFAULT_MOTION)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('MOTION'):
+        for key, default in config.items():
+            if not parser.has_option('MOTION', key):
+                continue
+            if isinstance(default, bool):
+                config[key] = parser.getboolean('MOTION', key)
+            else:
+                config[key] = type(default)(parser.get('MOTION', key))
+    return config
+
+
+class MotionGate:
+    """Holds full detection back while the card ROIs are moving (dealing, dragging, animations).
+
+    Each frame the ROIs are shrunk to small grey thumbnails and compared with the
+    previous frame's; the frame is unstable when enough thumbnail pixels changed
+    in any ROI. After motion, detection waits for `stable_frames` still frames
+    and then runs at once on the first settled frame (`settled` is True for it),
+    so the caller can force a full classification instead of tracking.
+    """
+
+    def __init__(self, stable_frames: int = 1, pixel_delta: int = 18, motion_share: float = 0.01,
+                 max_hold: int = 6, downscale: int = 8, **_):
+        self.stable_frames = stable_frames
+        self.pixel_delta = pixel_delta
+        self.motion_share = motion_share
+        self.max_hold = max_hold
+        self.downscale = max(1, downscale)
+        self.previous: List[np.ndarray] = []
+        self.moving = False
+        self.still = 0            # consecutive still frames since the last motion
+        self.held = 0             # frames held back in the current motion
+        self.settled = False
+        self.motion = 0.0
+        self.frames = 0
+        self.held_frames = 0
+        self.forced = 0
+
+    def _thumbnails(self, frame: np.ndarray, rois: List[Tuple[int, int, int, int]]) -> List[np.ndarray]:
+        thumbnails = []
+        for y0, y1, x0, x1 in rois:
+            roi = frame[y0:y1, x0:x1]
+            size = (max(1, roi.shape[1] // self.downscale), max(1, roi.shape[0] // self.downscale))
+            small = cv2.resize(roi, size, interpolation=cv2.INTER_AREA)
+            thumbnails.append(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small)
+        return thumbnails
+
+    def observe(self, frame: np.ndarray, rois: List[Tuple[int, int, int, int]]) -> bool:
+        """Compare one frame with the last; True when detection should run on it"""
+        thumbnails = self._thumbnails(frame, rois)
+        self.motion = 0.0
+        if len(thumbnails) == len(self.previous):
+            for current, previous in zip(thumbnails, self.previous):
+                if current.shape == previous.shape:
+                    moved = cv2.absdiff(current, previous) > self.pixel_delta
+                    self.motion = max(self.motion, float(moved.mean()))
+                else:
+                    self.motion = 1.0   # resolution changed
+        self.previous = thumbnails
+        self.frames += 1
+
+        self.settled = False
+        if self.motion > self.motion_share:
+            self.moving, self.still = True, 0
+        elif self.moving:
+            self.still += 1
+        if self.moving and self.still >= self.stable_frames:
+            self.moving, self.settled, self.held = False, True, 0
+        if not self.moving:
+            return True
+        self.held += 1
+        if self.held > self.max_hold:
+            # Never settles (looping animation): process this frame and keep watching
+            self.forced += 1
+            self.held = 0
+            return True
+        self.held_frames += 1
+        return False
+
+    def nbytes(self) -> int:
+        return sum(thumbnail.nbytes for thumbnail in self.previous)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'moving': self.moving,
+            'motion': round(self.motion, 4),
+            'heldFrames': self.held_frames,
+            'forced': self.forced,
+            'heldRatio': self.held_frames / self.frames if self.frames else 0.0
+        }
@@ -0,0 +1,242 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+from sampling_profiler import profiler
+from json_codec import encode_json
+
+PIPELINE_STAGES = ['capture', 'decode', 'template_load', 'template_match', 'track', 'ocr',
+                   'strategy', 'preview_encode', 'serialize', 'send']
+WINDOW_SIZE = 512
+PERFORMANCE_INTERVAL = 5.0
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RollingHistogram:
+    """Latency samples over a fixed-size window; quantiles are computed only when read"""
+
+    def __init__(self, size: int = WINDOW_SIZE):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def quantiles(self) -> Dict[str, float]:
+        if not self.samples:
+            return {f"p{int(q * 100)}": 0.0 for q in QUANTILES}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {f"p{int(q * 100)}": ordered[min(last, int(q * len(ordered)))] for q in QUANTILES}
+
+
+class DeviceMetrics:
+    """Per-device stage histograms and frame counters"""
+
+    def __init__(self):
+        self.stages: Dict[str, RollingHistogram] = {}
+        self.frame_times = deque(maxlen=64)
+        self.total_frames = 0
+        self.frames_with_cards = 0
+        self.confidence_sum = 0.0
+        self.degradation: Dict[str, int] = {}   # degradation mode -> frames
+        self.overruns = 0
+
+
+class SerializationStats:
+    """Encode cost of one message type, and how many deliveries shared each encode"""
+
+    __slots__ = ('encodes', 'seconds', 'bytes', 'deliveries')
+
+    def __init__(self):
+        self.encodes = 0
+        self.seconds = 0.0
+        self.bytes = 0
+        self.deliveries = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'encodes': self.encodes,
+            'deliveries': self.deliveries,
+            'avgEncodeMs': 1000 * self.seconds / self.encodes if self.encodes else 0.0,
+            # Falls as more clients share each encoded buffer
+            'encodeMsPerDelivery': 1000 * self.seconds / self.deliveries if self.deliveries else 0.0,
+            'avgBytes': self.bytes // self.encodes if self.encodes else 0
+        }
+
+
+class PipelineMetrics:
+    """Low-overhead monotonic stage timers feeding the 'performance' topic and /metrics"""
+
+    def __init__(self):
+        self.devices: Dict[str, DeviceMetrics] = {}
+        self.performance_version = 0
+        self.performance_messages: Dict[str, bytes] = {}   # device -> encoded performance message
+        self.last_published = 0.0
+        self._text_cache: Dict[Optional[str], str] = {}
+        self.serialization: Dict[str, SerializationStats] = {}
+        self.memory: Dict[str, Any] = {}   # latest MemoryMonitor report
+
+    def _device(self, device: Optional[str]) -> DeviceMetrics:
+        key = device or 'default'
+        if key not in self.devices:
+            self.devices[key] = DeviceMetrics()
+        return self.devices[key]
+
+    def record(self, stage: str, seconds: float, device: str = None):
+        metrics = self._device(device)
+        if stage not in metrics.stages:
+            metrics.stages[stage] = RollingHistogram()
+        metrics.stages[stage].add(seconds)
+
+    def record_encode(self, message_type: Optional[str], seconds: float, size: int):
+        stats = self.serialization.get(message_type or 'unknown')
+        if stats is None:
+            stats = self.serialization[message_type or 'unknown'] = SerializationStats()
+        stats.encodes += 1
+        stats.seconds += seconds
+        stats.bytes += size
+
+    def record_delivery(self, message_type: Optional[str], count: int = 1):
+        """Count sends of an already-encoded message (WebSocket clients, HTTP polls)"""
+        stats = self.serialization.get(message_type or 'unknown')
+        if stats is not None:
+            stats.deliveries += count
+
+    @contextmanager
+    def stage(self, name: str, device: str = None):
+        """Time a block with the monotonic clock and record it under a stage name"""
+        start = time.perf_counter_ns()
+        tagged = profiler.active
+        previous = profiler.enter_stage(name) if tagged else None
+        try:
+            yield
+        finally:
+            if tagged:
+                profiler.exit_stage(previous)
+            self.record(name, (time.perf_counter_ns() - start) / 1e9, device)
+
+    def record_frame(self, cards_found: int, confidence: float = 0.0, device: str = None):
+        """Count one completed frame for fps and detection-rate figures"""
+        metrics = self._device(device)
+        metrics.frame_times.append(time.monotonic())
+        metrics.total_frames += 1
+        if cards_found:
+            metrics.frames_with_cards += 1
+            metrics.confidence_sum += confidence
+
+    def record_degradation(self, mode: str, overran: bool = False, device: str = None):
+        """Count the degradation mode a frame ended in, and whether it still missed its deadline"""
+        metrics = self._device(device)
+        metrics.degradation[mode] = metrics.degradation.get(mode, 0) + 1
+        if overran:
+            metrics.overruns += 1
+
+    def record_memory(self, report: Dict[str, Any]):
+        """Attach the latest memory check to the performance topic and /metrics"""
+        self.memory = report
+        self._text_cache = {}
+
+    def summary(self, device: str = None) -> Dict[str, Any]:
+        """Payload for a 'performance' message, in the shape PerformanceMonitor expects"""
+        metrics = self._device(device)
+        times = metrics.frame_times
+        fps = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 and times[-1] > times[0] else 0.0
+        return {
+            'device': device or 'default',
+            'fps': round(fps, 3),
+            'avgConfidence': (metrics.confidence_sum / metrics.frames_with_cards
+                              if metrics.frames_with_cards else 0.0),
+            'detectionRate': (round(100 * metrics.frames_with_cards / metrics.total_frames)
+                              if metrics.total_frames else 0),
+            'overlapsDetected': 0,
+            'totalFrames': metrics.total_frames,
+            'stages': {
+                name: dict(hist.quantiles(), count=hist.count)
+                for name, hist in list(metrics.stages.items())
+            },
+            'serialization': {name: stats.as_dict() for name, stats in list(self.serialization.items())},
+            'degradation': dict(metrics.degradation),
+            'deadlineOverruns': metrics.overruns,
+            'memory': self.memory
+        }
+
+    def maybe_publish(self, interval: float = PERFORMANCE_INTERVAL) -> bool:
+        """Refresh the pre-serialized performance messages at most once per interval"""
+        now = time.monotonic()
+        if now - self.last_published < interval:
+            return False
+        self.last_published = now
+        self.performance_messages = {}
+        for device in list(self.devices):
+            message = {'type': 'performance', 'payload': self.summary(device)}
+            began = time.perf_counter()
+            encoded = encode_json(message)
+            self.record_encode('performance', time.perf_counter() - began, len(encoded))
+            self.performance_messages[device] = encoded
+        self.performance_version += 1
+        self._text_cache = {}
+        return True
+
+    def cached_text(self, device: str = None) -> str:
+        """render_text() as of the last publish; HTTP pollers reuse it until the next one"""
+        if device not in self._text_cache:
+            self._text_cache[device] = self.render_text(device)
+        return self._text_cache[device]
+
+    def render_text(self, device: str = None) -> str:
+        """Plain-text metrics in the Prometheus exposition format (all devices, or just one)"""
+        # The capture thread adds devices, stages and modes while this runs on the event loop:
+        # iterate over copies (list() of a dict view is taken atomically under the GIL)
+        devices = [(name, metrics) for name, metrics in list(self.devices.items()) if not device or name == device]
+        lines = [
+            '# TYPE rmz_stage_latency_seconds summary',
+        ]
+        for device, metrics in devices:
+            for name, hist in list(metrics.stages.items()):
+                labels = f'device="{device}",stage="{name}"'
+                for key, value in hist.quantiles().items():
+                    quantile = int(key[1:]) / 100
+                    lines.append(f'rmz_stage_latency_seconds{{{labels},quantile="{quantile}"}} {value:.6f}')
+                lines.append(f'rmz_stage_latency_seconds_sum{{{labels}}} {hist.total:.6f}')
+                lines.append(f'rmz_stage_latency_seconds_count{{{labels}}} {hist.count}')
+        lines.append('# TYPE rmz_frames_total counter')
+        for device, metrics in devices:
+            lines.append(f'rmz_frames_total{{device="{device}"}} {metrics.total_frames}')
+        lines.append('# TYPE rmz_frames_degraded_total counter')
+        for device, metrics in devices:
+            for mode, count in list(metrics.degradation.items()):
+                lines.append(f'rmz_frames_degraded_total{{device="{device}",mode="{mode}"}} {count}')
+        lines.append('# TYPE rmz_deadline_overruns_total counter')
+        for device, metrics in devices:
+            lines.append(f'rmz_deadline_overruns_total{{device="{device}"}} {metrics.overruns}')
+        serialization = list(self.serialization.items())
+        for family, field, fmt in (('rmz_serialize_seconds_total', 'seconds', '.6f'),
+                                   ('rmz_serialize_encodes_total', 'encodes', 'd'),
+                                   ('rmz_serialize_bytes_total', 'bytes', 'd'),
+                                   ('rmz_message_deliveries_total', 'deliveries', 'd')):
+            lines.append(f'# TYPE {family} counter')
+            for name, stats in serialization:
+                lines.append(f'{family}{{type="{name}"}} {getattr(stats, field):{fmt}}')
+        if self.memory:
+            subsystems = self.memory['subsystems']
+            lines.append('# TYPE rmz_memory_bytes gauge')
+            lines.append(f'rmz_memory_bytes{{subsystem="rss"}} {self.memory["rssBytes"]}')
+            for name, usage in subsystems.items():
+                lines.append(f'rmz_memory_bytes{{subsystem="{name}"}} {usage["bytes"]}')
+            lines.append('# TYPE rmz_memory_budget_bytes gauge')
+            if self.memory['rssBudget']:
+                lines.append(f'rmz_memory_budget_bytes{{subsystem="rss"}} {self.memory["rssBudget"]}')
+            for name, usage in subsystems.items():
+                if usage['budget']:
+                    lines.append(f'rmz_memory_budget_bytes{{subsystem="{name}"}} {usage["budget"]}')
+            lines.append('# TYPE rmz_memory_evictions_total counter')
+            for name, count in self.memory['evictions'].items():
+                lines.append(f'rmz_memory_evictions_total{{subsystem="{name}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = PipelineMetrics()
@@ -0,0 +1,131 @@
+import configparser
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+CONFIG_FILE = 'config.ini'
+DEFAULT_MATCHER = {
+    'coarse_scale': 4,       # correlate at 1/coarse_scale first (1 = full resolution only)
+    'coarse_margin': 0.15,   # coarse peaks this far below the threshold are still refined
+    'max_candidates': 4      # coarse peaks refined per template before giving up
+}
+MIN_COARSE_SIZE = 8          # a template is never shrunk below this many pixels per side
+REFINE_RADIUS = 2            # coarse pixels of slack around a candidate when refining
+
+
+def load_matcher_config(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Coarse-to-fine settings from the [DETECTION] section of config.ini"""
+    config = dict(DEFAULT_MATCHER)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('DETECTION'):
+        for key, default in config.items():
+            if parser.has_option('DETECTION', key):
+                config[key] = type(default)(parser.get('DETECTION', key))
+    return config
+
+
+def downsample(image: np.ndarray, factor: int) -> np.ndarray:
+    """pyrDown `image` until it is 1/factor of its size (factor is a power of two)"""
+    while factor > 1:
+        image = cv2.pyrDown(image)
+        factor //= 2
+    return image
+
+
+class RoiPyramid:
+    """A grayscale ROI at 1, 1/2, 1/4 ... scale; built once per frame and shared by every template"""
+
+    def __init__(self, gray: np.ndarray, max_factor: int):
+        self.levels = {1: gray}
+        factor = 1
+        while factor < max_factor and min(gray.shape[:2]) >= 2 * MIN_COARSE_SIZE:
+            gray = cv2.pyrDown(gray)
+            factor *= 2
+            self.levels[factor] = gray
+
+    @property
+    def full(self) -> np.ndarray:
+        return self.levels[1]
+
+    def factor_for(self, template_shape: Tuple[int, int], wanted: int) -> int:
+        """Largest usable level <= wanted that keeps the template at least MIN_COARSE_SIZE"""
+        factor = 1
+        while (factor * 2 <= wanted and factor * 2 in self.levels
+               and min(template_shape[:2]) // (factor * 2) >= MIN_COARSE_SIZE):
+            factor *= 2
+        return factor
+
+
+def _refine(full: np.ndarray, template: np.ndarray, x: int, y: int, factor: int,
+            threshold: float) -> Optional[Tuple[int, int, float]]:
+    """Full-resolution correlation in a small window around a coarse peak"""
+    th, tw = template.shape[:2]
+    slack = REFINE_RADIUS * factor
+    x0, y0 = max(0, x * factor - slack), max(0, y * factor - slack)
+    x1 = min(full.shape[1], x * factor + tw + slack)
+    y1 = min(full.shape[0], y * factor + th + slack)
+    if x1 - x0 < tw or y1 - y0 < th:
+        return None
+    res = cv2.matchTemplate(full[y0:y1, x0:x1], template, cv2.TM_CCOEFF_NORMED)
+    _, value, _, (rx, ry) = cv2.minMaxLoc(res)
+    return (x0 + rx, y0 + ry, float(value)) if value >= threshold else None
+
+
+def locate_template(pyramid: RoiPyramid, template: np.ndarray, coarse: np.ndarray, factor: int,
+                    threshold: float, margin: float, max_candidates: int) -> Optional[Tuple[int, int, float]]:
+    """(x, y, score) of a full-resolution match >= threshold in the ROI, or None"""
+    full = pyramid.full
+    if factor == 1 or coarse is None:
+        res = cv2.matchTemplate(full, template, cv2.TM_CCOEFF_NORMED)
+        _, value, _, (x, y) = cv2.minMaxLoc(res)
+        return (x, y, float(value)) if value >= threshold else None
+    level = pyramid.levels[factor]
+    if level.shape[0] < coarse.shape[0] or level.shape[1] < coarse.shape[1]:
+        return None
+    res = cv2.matchTemplate(level, coarse, cv2.TM_CCOEFF_NORMED)
+    ch, cw = coarse.shape[:2]
+    for _ in range(max_candidates):
+        _, value, _, (x, y) = cv2.minMaxLoc(res)
+        if value < threshold - margin:
+            return None
+        found = _refine(full, template, x, y, factor, threshold)
+        if found:
+            return found
+        # Suppress this peak so the next candidate is a different location
+        res[max(0, y - ch // 2):y + ch // 2 + 1, max(0, x - cw // 2):x + cw // 2 + 1] = -1.0
+    return None
+
+
+def find_templates(gray_roi: np.ndarray, scaled: List[Tuple[str, np.ndarray]], threshold: float = 0.6,
+                   coarse_scale: int = 4, coarse_margin: float = 0.15, max_candidates: int = 4,
+                   coarse_cache: Dict = None) -> List[Tuple[str, Tuple[int, int, int, int], float]]:
+    """(name, (x, y, w, h), score) for each template found in the ROI, searched coarse-to-fine.
+
+    coarse_cache maps (name, shape, factor) to the downsampled template so repeated
+    frames reuse it; pass the same dict for every call with the same templates.
+    """
+    pyramid = RoiPyramid(gray_roi, max(1, int(coarse_scale)))
+    coarse_cache = {} if coarse_cache is None else coarse_cache
+    matches = []
+    for name, template in scaled:
+        if template.shape[0] > gray_roi.shape[0] or template.shape[1] > gray_roi.shape[1]:
+            continue
+        factor = pyramid.factor_for(template.shape, int(coarse_scale))
+        coarse = None
+        if factor > 1:
+            key = (name, template.shape, factor)
+            coarse = coarse_cache.get(key)
+            if coarse is None:
+                coarse = coarse_cache[key] = downsample(template, factor)
+        found = locate_template(pyramid, template, coarse, factor, threshold, coarse_margin, max_candidates)
+        if found:
+            x, y, score = found
+            matches.append((name, (x, y, template.shape[1], template.shape[0]), score))
+    return matches
+
+
+def match_templates(gray_roi: np.ndarray, scaled: List[Tuple[str, np.ndarray]], threshold: float = 0.6,
+                    **settings) -> List[str]:
+    """Names of the templates found in the ROI"""
+    return [name for name, _, _ in find_templates(gray_roi, scaled, threshold, **settings)]
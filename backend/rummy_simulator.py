@@ -0,0 +1,199 @@
+import os
+import time
+import random
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional
+from agent_controller import AgentController
+from event_store import EventStore
+from strategy_emitter import StrategyEmitter
+from sampling_profiler import install_signal_trigger
+from card_codec import RANKS, SUITS
+import batch_analysis
+
+HAND_SIZE = 13
+MAX_TURNS = 200
+WRONG_DECLARE_PENALTY = 80
+
+emitter = None
+agent = None
+
+
+def _init_worker():
+    """Each worker process gets its own strategy objects"""
+    global emitter, agent
+    emitter = StrategyEmitter()
+    agent = AgentController(EventStore(':memory:'))
+    install_signal_trigger()
+
+
+def build_deck(decks: int = 2, jokers_per_deck: int = 1) -> List[str]:
+    """Card strings for a multi-deck shoe, including printed jokers ('JK')"""
+    deck = [f"{rank}{suit}" for suit in SUITS for rank in RANKS] * decks
+    return deck + ['JK'] * (decks * jokers_per_deck)
+
+
+class RummyGame:
+    """Two-player 13-card rummy with a cut joker, driven entirely in memory"""
+
+    def __init__(self, seed: int, decks: int = 2):
+        self.rng = random.Random(seed)
+        self.stock = build_deck(decks)
+        self.rng.shuffle(self.stock)
+        self.hands = [[self.stock.pop() for _ in range(HAND_SIZE)] for _ in range(2)]
+        self.game_joker = self.stock.pop()
+        while self.game_joker == 'JK':
+            self.stock.insert(0, self.game_joker)
+            self.game_joker = self.stock.pop()
+        self.discard_pile = [self.stock.pop()]
+        self.turn = 0
+        self.winner: Optional[int] = None
+        self.wrong_declare: Optional[int] = None
+        self.decision_time = 0.0
+
+    def is_wild(self, card: str) -> bool:
+        return card == 'JK' or card[:-1] == self.game_joker[:-1]
+
+    def draw_from_stock(self) -> str:
+        if not self.stock:
+            top = self.discard_pile.pop()
+            self.stock = self.discard_pile
+            self.rng.shuffle(self.stock)
+            self.discard_pile = [top]
+        return self.stock.pop()
+
+    def is_valid_declaration(self, hand: List[str]) -> bool:
+        """Pure sequence, two or more melds, and every floating natural covered by a wild"""
+        naturals = [c for c in hand if not self.is_wild(c)]
+        wilds = len(hand) - len(naturals)
+        analysis = emitter.analyze_meld_structure(naturals)
+        return (analysis['has_pure_sequence'] and analysis['total_valid_melds'] >= 2
+                and analysis['floating_count'] <= 2 * wilds)
+
+    def choose_discard(self, hand: List[str]) -> str:
+        """Throw the highest-value floating natural, falling back to the highest natural"""
+        naturals = [c for c in hand if not self.is_wild(c)] or hand
+        analysis = emitter.analyze_meld_structure(naturals)
+        floating = [f"{c['rank']}{c['suit']}" for c in analysis['floating_cards']]
+        candidates = [c for c in floating if c in naturals] or naturals
+        return max(candidates, key=lambda c: (batch_analysis.RANK_POINTS[RANKS.index(c[:-1])]
+                                              if c[:-1] in RANKS else 0, c))
+
+    def play_turn(self, player: int, policy: str) -> int:
+        """Play one turn and return the number of agent decisions made"""
+        hand = self.hands[player]
+        decisions = 0
+        if policy == 'agent':
+            start = time.perf_counter()
+            naturals = [c for c in hand if not self.is_wild(c)]
+            analysis = emitter.analyze_meld_structure(naturals)
+            melds = emitter.melds_from_analysis(analysis)
+            suggestion = agent.suggest_optimal_action(hand, melds, self.discard_pile,
+                                                      self.game_joker, analysis=analysis)
+            action = suggestion['action']
+            self.decision_time += time.perf_counter() - start
+            decisions = 1
+        else:
+            action = 'Pick from Deck'
+
+        if action == 'Declare':
+            if self.is_valid_declaration(hand):
+                self.winner = player
+            else:
+                self.wrong_declare = player
+                self.winner = 1 - player
+            return decisions
+
+        if action == 'Pick from Discard' and self.discard_pile:
+            hand.append(self.discard_pile.pop())
+        else:
+            hand.append(self.draw_from_stock())
+        discard = self.choose_discard(hand)
+        hand.remove(discard)
+        self.discard_pile.append(discard)
+
+        if policy != 'agent' and self.is_valid_declaration(hand):
+            self.winner = player
+        return decisions
+
+    def play(self, policies: List[str]) -> Dict[str, Any]:
+        decisions = 0
+        turns = 0
+        start = time.perf_counter()
+        while self.winner is None and turns < MAX_TURNS:
+            decisions += self.play_turn(self.turn, policies[self.turn])
+            self.turn = 1 - self.turn
+            turns += 1
+        elapsed = time.perf_counter() - start
+
+        encoded, jokers = batch_analysis.encode_hands(self.hands, [self.game_joker] * 2)
+        deadwood = batch_analysis.analyze_many(encoded, jokers, workers=1)['deadwood']
+        if self.wrong_declare is not None:
+            deadwood[self.wrong_declare] = WRONG_DECLARE_PENALTY
+        if self.winner is not None:
+            deadwood[self.winner] = 0
+        return {
+            'winner': self.winner,
+            'turns': turns,
+            'decisions': decisions,
+            'elapsed': elapsed,
+            'decision_time': self.decision_time,
+            'deadwood': [int(d) for d in deadwood],
+            'wrong_declare': self.wrong_declare
+        }
+
+
+def _play_games(seeds: List[int], decks: int, opponent: str) -> List[Dict[str, Any]]:
+    if agent is None:
+        _init_worker()
+    return [RummyGame(seed, decks).play(['agent', opponent]) for seed in seeds]
+
+
+def run_simulation(games: int, workers: int = None, decks: int = 2, opponent: str = 'baseline',
+                   seed: int = 0) -> Dict[str, Any]:
+    """Play games in parallel with the agent in seat 0 and aggregate the results"""
+    workers = workers or os.cpu_count() or 1
+    seeds = list(range(seed, seed + games))
+    batches = [seeds[i::workers] for i in range(workers) if seeds[i::workers]]
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            results = [r for batch in pool.map(_play_games, batches, [decks] * len(batches),
+                                               [opponent] * len(batches)) for r in batch]
+    else:
+        results = _play_games(seeds, decks, opponent)
+    wall = time.perf_counter() - start
+
+    decisions = sum(r['decisions'] for r in results)
+    busy = sum(r['decision_time'] for r in results)
+    return {
+        'games': len(results),
+        'win_rate': sum(r['winner'] == 0 for r in results) / len(results),
+        'loss_rate': sum(r['winner'] == 1 for r in results) / len(results),
+        'draw_rate': sum(r['winner'] is None for r in results) / len(results),
+        'wrong_declares': sum(r['wrong_declare'] == 0 for r in results),
+        'avg_deadwood': sum(r['deadwood'][0] for r in results) / len(results),
+        'avg_turns': sum(r['turns'] for r in results) / len(results),
+        'decisions': decisions,
+        'decisions_per_second': decisions / busy if busy else 0.0,
+        'games_per_second': len(results) / wall if wall else 0.0,
+        'wall_time': wall
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless rummy self-play benchmark for AgentController")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--decks", type=int, default=2)
+    parser.add_argument("--opponent", choices=['agent', 'baseline'], default='baseline')
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    stats = run_simulation(args.games, args.workers, args.decks, args.opponent, args.seed)
+    print(f"🎮 {stats['games']} games vs {args.opponent} in {stats['wall_time']:.2f}s "
+          f"({stats['games_per_second']:.1f} games/s)")
+    print(f"🏆 Win rate: {stats['win_rate']:.1%} | Loss: {stats['loss_rate']:.1%} | "
+          f"Draw: {stats['draw_rate']:.1%} | Wrong declares: {stats['wrong_declares']}")
+    print(f"📊 Avg deadwood: {stats['avg_deadwood']:.1f} | Avg turns: {stats['avg_turns']:.1f}")
+    print(f"⚡ {stats['decisions']} decisions at {stats['decisions_per_second']:,.0f} decisions/s per core")
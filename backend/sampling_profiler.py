@@ -0,0 +1,162 @@
+import os
+import sys
+import time
+import signal
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+PROFILE_DIR = '.profiles'
+SAMPLE_INTERVAL = 0.005   # seconds between stack samples (200 Hz)
+MAX_DEPTH = 64
+MAX_SECONDS = 120.0
+IDLE_FUNCTIONS = ('wait', 'select', 'poll', 'sleep', 'accept', 'recv_into')   # blocked, not busy
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for every thread of this process, switched on for a fixed time.
+
+    While idle it costs one attribute check per timed stage. While running, a
+    daemon thread samples sys._current_frames() and counts collapsed stacks
+    rooted at the thread name and, where a pipeline stage is open, the stage.
+    The result is written in the folded format flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, out_dir: str = PROFILE_DIR):
+        self.interval = interval
+        self.out_dir = out_dir
+        self.active = False
+        self.stacks: Counter = Counter()
+        self.stages: Dict[int, str] = {}    # thread id -> innermost open stage
+        self.samples = 0
+        self.started = 0.0
+        self.seconds = 0.0
+        self.path: Optional[str] = None
+        self.last_summary: Dict[str, Any] = {}
+        self.done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, seconds: float, path: str = None) -> bool:
+        """Sample for `seconds` in the background; False if a profile is already running"""
+        if self.active:
+            return False
+        self.seconds = max(0.1, min(float(seconds), MAX_SECONDS))
+        self.path = path or os.path.join(self.out_dir, f"profile-{os.getpid()}-{int(time.time())}.folded")
+        self.stacks = Counter()
+        self.samples = 0
+        self.done.clear()
+        self.active = True
+        self.started = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        deadline = self.started + self.seconds
+        try:
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own:
+                        continue
+                    if thread_id not in names:
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                    stack = []
+                    while frame is not None and len(stack) < MAX_DEPTH:
+                        stack.append(_frame_label(frame))
+                        frame = frame.f_back
+                    root = [names.get(thread_id, f"thread-{thread_id}")]
+                    stage = self.stages.get(thread_id)
+                    if stage:
+                        root.append(f"[stage {stage}]")
+                    self.stacks[tuple(root + stack[::-1])] += 1
+                self.samples += 1
+                time.sleep(self.interval)
+        finally:
+            self.active = False
+            self.stages.clear()
+            self.write()
+            self.last_summary = self.summary()
+            self.done.set()
+
+    def enter_stage(self, name: str) -> Optional[str]:
+        """Tag the current thread's samples with a stage; returns the tag to restore on exit"""
+        thread_id = threading.get_ident()
+        previous = self.stages.get(thread_id)
+        self.stages[thread_id] = name
+        return previous
+
+    def exit_stage(self, previous: Optional[str]):
+        if previous is None:
+            self.stages.pop(threading.get_ident(), None)
+        else:
+            self.stages[threading.get_ident()] = previous
+
+    @contextmanager
+    def stage(self, name: str):
+        """Tag samples taken inside the block (no-op while idle)"""
+        if not self.active:
+            yield
+            return
+        previous = self.enter_stage(name)
+        try:
+            yield
+        finally:
+            self.exit_stage(previous)
+
+    def write(self, path: str = None) -> str:
+        path = path or self.path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+        return path
+
+    def summary(self, top: int = 15) -> Dict[str, Any]:
+        """Hottest busy functions (self and inclusive samples) and samples per stage"""
+        own, inclusive, stages = Counter(), Counter(), Counter()
+        for stack, count in self.stacks.items():
+            if stack[-1].split(' ', 1)[0] in IDLE_FUNCTIONS:
+                continue
+            own[stack[-1]] += count
+            for label in set(stack):
+                inclusive[label] += count
+            stage = next((part[7:-1] for part in stack[:2] if part.startswith('[stage ')), None)
+            if stage:
+                stages[stage] += count
+        return {
+            'path': self.path,
+            'seconds': self.seconds,
+            'samples': self.samples,
+            'self': own.most_common(top),
+            'inclusive': [(label, n) for label, n in inclusive.most_common(top + 8) if ' (' in label][:top],
+            'stages': dict(stages.most_common())
+        }
+
+    def status(self) -> Dict[str, Any]:
+        if self.active:
+            return {'status': 'running', 'path': self.path, 'seconds': self.seconds,
+                    'elapsed': round(time.monotonic() - self.started, 2)}
+        return {'status': 'idle', **({'last': self.last_summary} if self.last_summary else {})}
+
+
+profiler = SamplingProfiler()
+
+
+def install_signal_trigger(seconds: float = 10.0, signum: int = getattr(signal, 'SIGUSR2', None)):
+    """Start a profile of this process on `kill -USR2 <pid>` (for worker and ring consumer processes)"""
+    if signum is None:
+        return
+
+    def _trigger(*_):
+        if profiler.start(seconds):
+            print(f"🔥 Profiling pid {os.getpid()} for {profiler.seconds:.0f}s -> {profiler.path}")
+
+    signal.signal(signum, _trigger)
@@ -0,0 +1,316 @@
+import os
+import json
+import time
+import zlib
+import struct
+import re
+import argparse
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+MAGIC = b'RMZA\x01'
+CHUNK_MAGIC = b'CHNK'
+INDEX_MAGIC = b'RMZI'
+CHUNK_HEADER = struct.Struct('<4sIIdQ')   # magic, compressed length, record count, first timestamp, first record
+RECORD_HEADER = struct.Struct('<dII')     # timestamp, frame length, payload length
+INDEX_ENTRY = struct.Struct('<QIIdQ')     # offset, compressed length, record count, first timestamp, first record
+FOOTER = struct.Struct('<QI4s')           # index offset, entry count, magic
+
+
+def natural_key(name: str):
+    """Sort key that orders frame_2 before frame_10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+class SessionRecorder:
+    """Appends (timestamp, encoded frame, payload) records to a chunked archive.
+
+    Records are buffered into chunks; an index of chunk offsets is written on close.
+    An archive cut short by a crash is still readable because every chunk carries
+    its own header and the reader rebuilds the index by scanning. Chunks are
+    compressed and written on a background thread, so a recorder attached to the
+    snapshot hub never blocks the event loop; frames are already PNG/JPEG, so the
+    default level 0 only frames them as stored zlib blocks.
+    """
+
+    def __init__(self, path: str, chunk_records: int = 32, level: int = 0, flush_interval: float = 5.0,
+                 append: bool = False):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.level = level
+        self.flush_interval = flush_interval
+        self.index: List[Tuple[int, int, int, float, int]] = []
+        self.records = 0   # records written to the file; advanced by the writer thread
+        self.lost = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            if not append:
+                raise FileExistsError(f"{path} already exists; append to it or choose a new archive")
+            self._reopen(path)
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(MAGIC)
+            self.file.flush()
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='session-writer')
+        self.last_flush = time.monotonic()
+        self.pending: List[bytes] = []
+        self.pending_first_ts = 0.0
+
+    def _reopen(self, path: str):
+        """Continue an existing archive after its last complete chunk (its index is rewritten on close)"""
+        archive = SessionArchive(path)
+        self.index = list(archive.index)
+        self.records = len(archive)
+        archive.close()
+        end = self.index[-1][0] + CHUNK_HEADER.size + self.index[-1][1] if self.index else len(MAGIC)
+        self.file = open(path, 'r+b')
+        self.file.seek(end)
+        self.file.truncate()
+
+    def append(self, timestamp: float, frame_bytes: bytes, payload_bytes: bytes):
+        frame_bytes = frame_bytes or b''
+        payload_bytes = payload_bytes or b''
+        if not self.pending:
+            self.pending_first_ts = timestamp
+        self.pending.append(RECORD_HEADER.pack(timestamp, len(frame_bytes), len(payload_bytes))
+                            + frame_bytes + payload_bytes)
+        if (len(self.pending) >= self.chunk_records
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def on_snapshot(self, snapshot):
+        """SnapshotHub listener: record the frame that produced a snapshot and its payload"""
+        if snapshot.frame_bytes:
+            self.append(snapshot.timestamp / 1000, snapshot.frame_bytes, snapshot.payload_bytes)
+
+    def flush(self):
+        """Hand the buffered records to the writer thread as one chunk"""
+        self.last_flush = time.monotonic()
+        if not self.pending:
+            return
+        self.writer.submit(self._write_chunk, self.pending, self.pending_first_ts)
+        self.pending = []
+
+    def _write_chunk(self, records: List[bytes], first_ts: float):
+        """Writer thread: numbering advances only for chunks that reached the file, so a failed
+        write loses its records without leaving a gap in the index"""
+        offset = self.file.tell()
+        try:
+            data = zlib.compress(b''.join(records), self.level)
+            self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, len(data), len(records), first_ts, self.records))
+            self.file.write(data)
+            self.file.flush()
+        except Exception as e:
+            self.lost += len(records)
+            print(f"❌ Session archive write error, {len(records)} frames lost: {e}")
+            try:
+                self.file.seek(offset)
+                self.file.truncate()   # drop the torn chunk so the next one follows the last good one
+            except (OSError, ValueError):
+                pass
+            return
+        self.index.append((offset, len(data), len(records), first_ts, self.records))
+        self.records += len(records)
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush()
+        self.writer.shutdown(wait=True)
+        index_offset = self.file.tell()
+        for entry in self.index:
+            self.file.write(INDEX_ENTRY.pack(*entry))
+        self.file.write(FOOTER.pack(index_offset, len(self.index), INDEX_MAGIC))
+        self.file.close()
+        print(f"✅ Recorded {self.records} frames to {self.path}"
+              + (f" ({self.lost} lost to write errors)" if self.lost else ""))
+
+
+class SessionArchive:
+    """Random access to a recorded session through its chunk index"""
+
+    def __init__(self, path: str, cache_chunks: int = 4):
+        self.path = path
+        self.file = open(path, 'rb')
+        if self.file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session archive")
+        self.index = self._read_index() or self._scan_index()
+        self.chunk_starts = [entry[4] for entry in self.index]
+        self.chunk_times = [entry[3] for entry in self.index]
+        self.cache: OrderedDict = OrderedDict()
+        self.cache_chunks = cache_chunks
+
+    def _read_index(self):
+        size = os.path.getsize(self.path)
+        if size < len(MAGIC) + FOOTER.size:
+            return None
+        self.file.seek(size - FOOTER.size)
+        index_offset, count, magic = FOOTER.unpack(self.file.read(FOOTER.size))
+        if magic != INDEX_MAGIC:
+            return None
+        self.file.seek(index_offset)
+        raw = self.file.read(count * INDEX_ENTRY.size)
+        return [INDEX_ENTRY.unpack_from(raw, i * INDEX_ENTRY.size) for i in range(count)]
+
+    def _scan_index(self):
+        """Rebuild the index from chunk headers when the footer is missing"""
+        index = []
+        size = os.path.getsize(self.path)
+        offset = len(MAGIC)
+        self.file.seek(offset)
+        while True:
+            header = self.file.read(CHUNK_HEADER.size)
+            if len(header) < CHUNK_HEADER.size:
+                break
+            magic, length, count, first_ts, first_record = CHUNK_HEADER.unpack(header)
+            if magic != CHUNK_MAGIC or offset + CHUNK_HEADER.size + length > size:
+                break  # torn write at the end of a crashed recording
+            index.append((offset, length, count, first_ts, first_record))
+            offset += CHUNK_HEADER.size + length
+            self.file.seek(offset)
+        print(f"⚠️ Rebuilt index for {self.path} ({len(index)} chunks)")
+        return index
+
+    def __len__(self) -> int:
+        if not self.index:
+            return 0
+        last = self.index[-1]
+        return last[4] + last[2]
+
+    @property
+    def start_time(self) -> float:
+        return self.index[0][3] if self.index else 0.0
+
+    def _chunk(self, chunk_no: int) -> List[Tuple[float, bytes, bytes]]:
+        if chunk_no in self.cache:
+            self.cache.move_to_end(chunk_no)
+            return self.cache[chunk_no]
+        offset, length, count, _, _ = self.index[chunk_no]
+        self.file.seek(offset + CHUNK_HEADER.size)
+        data = zlib.decompress(self.file.read(length))
+        records, pos = [], 0
+        for _ in range(count):
+            timestamp, frame_len, payload_len = RECORD_HEADER.unpack_from(data, pos)
+            pos += RECORD_HEADER.size
+            frame = data[pos:pos + frame_len]
+            pos += frame_len
+            records.append((timestamp, frame, data[pos:pos + payload_len]))
+            pos += payload_len
+        self.cache[chunk_no] = records
+        if len(self.cache) > self.cache_chunks:
+            self.cache.popitem(last=False)
+        return records
+
+    def read(self, record: int) -> Tuple[float, bytes, bytes]:
+        """(timestamp, encoded frame, payload bytes) of one record"""
+        if not 0 <= record < len(self):
+            raise IndexError(record)
+        chunk_no = bisect_right(self.chunk_starts, record) - 1
+        return self._chunk(chunk_no)[record - self.chunk_starts[chunk_no]]
+
+    def find_time(self, offset_seconds: float) -> int:
+        """Index of the first record at or after start_time + offset_seconds"""
+        if not self.index:
+            return 0
+        target = self.start_time + offset_seconds
+        chunk_no = max(0, bisect_right(self.chunk_times, target) - 1)
+        for i, (timestamp, _, _) in enumerate(self._chunk(chunk_no)):
+            if timestamp >= target:
+                return self.chunk_starts[chunk_no] + i
+        return min(len(self), self.chunk_starts[chunk_no] + self.index[chunk_no][2])
+
+    def close(self):
+        self.file.close()
+
+
+class ReplaySource:
+    """Capture source that plays an archive back at real-time, scaled or max (speed=0) speed"""
+
+    capture_interval = 0.0
+
+    def __init__(self, path: str, speed: float = 1.0, loop: bool = False):
+        self.archive = SessionArchive(path)
+        self.speed = speed
+        self.loop = loop
+        self.position = 0
+        self._anchor: Optional[Tuple[float, float]] = None
+        self.device_id = f"replay:{os.path.basename(path)}"
+
+    def seek(self, record: int):
+        self.position = max(0, min(record, len(self.archive)))
+        self._anchor = None
+
+    def seek_time(self, offset_seconds: float):
+        self.seek(self.archive.find_time(offset_seconds))
+
+    def read(self) -> Optional[bytes]:
+        """Next encoded frame, waiting until it is due; None at the end of the archive"""
+        if self.position >= len(self.archive):
+            if not self.loop or not len(self.archive):
+                return None
+            self.seek(0)
+        timestamp, frame, _ = self.archive.read(self.position)
+        self.position += 1
+        if self.speed > 0:
+            if self._anchor is None:
+                self._anchor = (time.monotonic(), timestamp)
+            wall_start, archive_start = self._anchor
+            delay = wall_start + (timestamp - archive_start) / self.speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return frame
+
+
+def _replay_benchmark(path: str, speed: float, start: float):
+    """Feed an archive through the detection pipeline and report throughput"""
+    import cv2
+    import numpy as np
+    import mobile_card_detection
+
+    source = ReplaySource(path, speed)
+    source.seek_time(start)
+    frames = 0
+    began = time.perf_counter()
+    while True:
+        frame_bytes = source.read()
+        if frame_bytes is None:
+            break
+        frame = cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_COLOR)
+        snapshot = mobile_card_detection.build_game_snapshot(frame, frames, frame_bytes)
+        frames += 1
+        print(f"🎞️ frame {frames}: {snapshot.message_type}")
+    elapsed = time.perf_counter() - began
+    print(f"📊 Replayed {frames} frames in {elapsed:.2f}s ({frames / elapsed if elapsed else 0:.2f} fps)")
+
+
+def _record_directory(directory: str, path: str, fps: float):
+    """Pack a directory of captures into an archive (payloads left empty)"""
+    recorder = SessionRecorder(path)
+    names = sorted((n for n in os.listdir(directory) if n.endswith(('.png', '.jpg'))), key=natural_key)
+    for i, name in enumerate(names):
+        with open(os.path.join(directory, name), 'rb') as f:
+            recorder.append(i / fps, f.read(), json.dumps({'source': name}).encode())
+    recorder.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Session archive tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    pack = sub.add_parser("pack", help="archive a directory of frames")
+    pack.add_argument("directory")
+    pack.add_argument("archive")
+    pack.add_argument("--fps", type=float, default=1.0)
+    replay = sub.add_parser("replay", help="run an archive through the detection pipeline")
+    replay.add_argument("archive")
+    replay.add_argument("--speed", type=float, default=0.0, help="1 = real time, 0 = as fast as possible")
+    replay.add_argument("--start", type=float, default=0.0, help="seconds from the start of the session")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        try:
+            _record_directory(args.directory, args.archive, args.fps)
+        except FileExistsError as e:
+            print(f"❌ {e}")
+    else:
+        _replay_benchmark(args.archive, args.speed, args.start)
@@ -131,7 +131,10 @@ class StrategyEmitter:
 
     def generate_melds(self, hand_cards: List[str]) -> List[List[str]]:
         """Generate melds from hand cards"""
-        analysis = self.analyze_meld_structure(hand_cards)
+        return self.melds_from_analysis(self.analyze_meld_structure(hand_cards))
+
+    def melds_from_analysis(self, analysis: Dict[str, Any]) -> List[List[str]]:
+        """Convert an existing meld analysis to string melds without re-analysing the hand"""
         melds = []
         
         # Convert sequences to string format
@@ -148,6 +151,13 @@ class StrategyEmitter:
         
         return melds
 
+    def analyze_many(self, hands, jokers=None, workers: int = None) -> Dict[str, Any]:
+        """Batch analysis returning columnar arrays; accepts card-string hands or an encoded array"""
+        import batch_analysis  # numpy + process pool; keeps the per-frame import path light
+        if isinstance(hands, list) and hands and isinstance(hands[0], list):
+            hands, jokers = batch_analysis.encode_hands(hands, jokers)
+        return batch_analysis.analyze_many(hands, jokers, workers=workers)
+
     def suggest_action(self, hand_cards: List[str], melds: List[List[str]], discard_card: List[str]) -> str:
         """Suggest optimal action based on current game state"""
         analysis = self.analyze_meld_structure(hand_cards)
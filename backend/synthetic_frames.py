@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import time
+import argparse
+import cv2
+import numpy as np
+from typing import Dict, Tuple, Any, Optional
+from card_codec import parse_card, card_name
+from warm_start import detection_rois, template_size
+
+CARD_TEMPLATE_DIR = 'templates/card_images'
+OUTPUT_DIR = 'synthetic_frames'
+LABEL_FILE = 'labels.json'
+DEFAULT_SIZE = (2460, 1080)        # width, height of the device captures in frames/
+MIN_FACE_INK = 0.02                # share of non-white pixels a template needs to count as a readable face
+MIN_BENCHMARK_RECALL = 0.2         # --benchmark fails below this: the frames no longer exercise the detector
+
+# Deck and cut joker sit left of the discard ROI (frame fractions of their top-left corner)
+DECK_POS = (0.36, 0.44)
+JOKER_POS = (0.30, 0.47)
+
+FELT = (36, 120, 32)
+FELT_RIM = (24, 40, 24)
+BACKGROUND = (22, 22, 22)
+CARD_BACK = (40, 30, 150)
+
+
+def load_card_faces(template_dir: str = CARD_TEMPLATE_DIR) -> Dict[int, np.ndarray]:
+    """One face image per card index, from templates with a readable face only.
+
+    Placeholder templates (a blank card with a tiny label) are skipped: cards
+    drawn from them carry nothing the detector could find.
+    """
+    faces = {}
+    for name in sorted(os.listdir(template_dir)):
+        if not name.endswith('.png'):
+            continue
+        index = parse_card(name[:-4])
+        image = cv2.imread(os.path.join(template_dir, name))
+        if index < 0 or image is None or (image.min(axis=2) < 200).mean() < MIN_FACE_INK:
+            continue
+        if index not in faces or image.size > faces[index].size:
+            faces[index] = image
+    return faces
+
+
+def _paste(canvas: np.ndarray, image: np.ndarray, x: int, y: int):
+    """Copy image onto canvas at (x, y), clipped to the canvas"""
+    h, w = image.shape[:2]
+    x0, y0 = max(x, 0), max(y, 0)
+    x1, y1 = min(x + w, canvas.shape[1]), min(y + h, canvas.shape[0])
+    if x1 > x0 and y1 > y0:
+        canvas[y0:y1, x0:x1] = image[y0 - y:y1 - y, x0 - x:x1 - x]
+
+
+def _card(face: np.ndarray, roi_shape: Tuple[int, int], scale: float = 1.0) -> np.ndarray:
+    """The face at the size TemplateBank scales templates to for this ROI (times `scale`)"""
+    width, height = template_size(face.shape, roi_shape)
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return cv2.resize(face, size, interpolation=cv2.INTER_AREA)
+
+
+class SyntheticTable:
+    """Composites readable card templates into rummy table frames with exact ground truth.
+
+    Cards are placed inside the detector's hand and discard ROIs at the size
+    the template bank scales templates to, so the frames exercise the real
+    matcher. Only cards with a readable template are dealt (see
+    load_card_faces); the hand is capped at what that shoe can deal.
+    Every frame is a deterministic function of (seed, frame index), so a
+    dataset can be regenerated or extended without storing it.
+    """
+
+    def __init__(self, width: int = DEFAULT_SIZE[0], height: int = DEFAULT_SIZE[1],
+                 noise: float = 6.0, scale_jitter: float = 0.02, overlap: float = 0.15,
+                 hand_size: int = 13, decks: int = 2,
+                 seed: int = 0, template_dir: str = CARD_TEMPLATE_DIR):
+        self.width = width
+        self.height = height
+        self.noise = noise
+        self.scale_jitter = scale_jitter
+        self.overlap = overlap
+        self.seed = seed
+        self.faces = load_card_faces(template_dir)
+        if not self.faces:
+            raise ValueError(f"No readable card templates in {template_dir}")
+        self.shoe = np.array(sorted(self.faces) * decks)
+        self.hand_size = min(hand_size, len(self.shoe) - 2)
+        self.hand_roi, self.discard_roi = detection_rois(height, width)
+        self.background = self._table()
+
+    def _table(self) -> np.ndarray:
+        table = np.full((self.height, self.width, 3), BACKGROUND, np.uint8)
+        center = (self.width // 2, int(self.height * 0.62))
+        axes = (int(self.width * 0.42), int(self.height * 0.45))
+        cv2.ellipse(table, center, (axes[0] + 18, axes[1] + 18), 0, 0, 360, FELT_RIM, -1)
+        cv2.ellipse(table, center, axes, 0, 0, 360, FELT, -1)
+        return table
+
+    def deal(self, index: int) -> Dict[str, Any]:
+        """Cards for frame `index`: hand (+1 card half the time, as after a draw), discard and joker"""
+        rng = np.random.default_rng((self.seed, index))
+        size = min(self.hand_size + int(rng.random() < 0.5), len(self.shoe) - 2)
+        cards = rng.permutation(self.shoe)[:size + 2]
+        return {
+            'screen': 'table',
+            'hand': [card_name(c) for c in cards[:size]],
+            'discard': card_name(cards[size]),
+            'joker': card_name(cards[-1]),
+            '_rng': rng
+        }
+
+    @staticmethod
+    def _roi_shape(roi: Tuple[int, int, int, int]) -> Tuple[int, int]:
+        y0, y1, x0, x1 = roi
+        return y1 - y0, x1 - x0
+
+    def render(self, index: int) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """(BGR frame, ground-truth label) for frame `index`"""
+        label = self.deal(index)
+        rng = label.pop('_rng')
+        frame = self.background.copy()
+        scale = 1 + rng.uniform(-self.scale_jitter, self.scale_jitter)
+        hand_shape, discard_shape = self._roi_shape(self.hand_roi), self._roi_shape(self.discard_roi)
+
+        # Cut joker peeks out rotated from under the closed deck, both outside the detection ROIs
+        joker = cv2.rotate(_card(self.faces[parse_card(label['joker'])], discard_shape, 0.8),
+                           cv2.ROTATE_90_CLOCKWISE)
+        _paste(frame, joker, int(self.width * JOKER_POS[0]), int(self.height * JOKER_POS[1]))
+        card_h, card_w = _card(next(iter(self.faces.values())), discard_shape).shape[:2]
+        back = np.full((card_h, card_w, 3), CARD_BACK, np.uint8)
+        cv2.rectangle(back, (3, 3), (card_w - 4, card_h - 4), (230, 230, 230), 1)
+        _paste(frame, back, int(self.width * DECK_POS[0]), int(self.height * DECK_POS[1]))
+
+        # Discard face up in the middle of the discard ROI
+        y0, y1, x0, x1 = self.discard_roi
+        discard = _card(self.faces[parse_card(label['discard'])], discard_shape, scale)
+        _paste(frame, discard, x0 + (x1 - x0 - discard.shape[1]) // 2, y0 + (y1 - y0 - discard.shape[0]) // 2)
+
+        # Hand: 3-4 groups across the hand ROI, each card partly covering the one before it
+        y0, y1, x0, x1 = self.hand_roi
+        hand = [_card(self.faces[parse_card(name)], hand_shape, scale) for name in label['hand']]
+        card_h, card_w = hand[0].shape[:2]
+        groups = np.array_split(np.arange(len(hand)), int(rng.integers(3, 5)))
+        step = max(1, int(card_w * (1 - self.overlap)))
+        gap = card_w // 2
+        total = sum((len(g) - 1) * step + card_w for g in groups) + gap * (len(groups) - 1)
+        x = x0 + max(0, (x1 - x0) - total) // 2
+        y = y0 + (y1 - y0 - card_h) // 2
+        for group in groups:
+            for i in group:
+                _paste(frame, hand[i], x, y + int(rng.integers(-3, 4)))
+                x += step
+            x += card_w - step + gap
+
+        if self.noise > 0:
+            noise = np.empty(frame.shape, np.int16)
+            cv2.randn(noise, 0, self.noise)
+            frame = cv2.add(frame, noise, dtype=cv2.CV_8U)
+        return frame, label
+
+
+class SyntheticSource:
+    """Capture source that renders synthetic frames at a fixed rate (drop-in for ReplaySource)"""
+
+    def __init__(self, table: SyntheticTable, fps: float = 1.0, frames: int = 0, encoding: str = '.png'):
+        self.table = table
+        self.capture_interval = 1.0 / fps if fps > 0 else 0.0
+        self.frames = frames
+        self.encoding = encoding
+        self.position = 0
+        self.last_label: Optional[Dict[str, Any]] = None
+        self.device_id = f"synthetic:{table.width}x{table.height}"
+
+    def read(self) -> Optional[bytes]:
+        """Next encoded frame; None once `frames` frames have been produced (0 = unlimited)"""
+        if self.frames and self.position >= self.frames:
+            return None
+        frame, self.last_label = self.table.render(self.position)
+        self.position += 1
+        ok, encoded = cv2.imencode(self.encoding, frame)
+        return encoded.tobytes() if ok else None
+
+
+def write_dataset(table: SyntheticTable, count: int, out_dir: str = OUTPUT_DIR,
+                  fps: float = 0.0, quality: int = 90) -> str:
+    """Write `count` frames and a labels.json in the detection_benchmark format; fps > 0 paces output"""
+    os.makedirs(out_dir, exist_ok=True)
+    labels = {}
+    interval = 1.0 / fps if fps > 0 else 0.0
+    started = time.perf_counter()
+    for i in range(count):
+        frame, label = table.render(i)
+        name = f"synthetic_{i:05d}.jpg"
+        cv2.imwrite(os.path.join(out_dir, name), frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        labels[name] = label
+        if interval:
+            delay = started + (i + 1) * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    path = os.path.join(out_dir, LABEL_FILE)
+    with open(path, 'w') as f:
+        json.dump({
+            "_comment": f"Synthetic ground truth ({table.width}x{table.height}, seed {table.seed}) "
+                        f"from synthetic_frames.py; regenerate rather than edit.",
+            "frames": labels
+        }, f, indent=1)
+    elapsed = time.perf_counter() - started
+    print(f"✅ Wrote {count} frames to {out_dir} in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.1f} fps)")
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic rummy table frames with ground truth")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--width", type=int, default=DEFAULT_SIZE[0])
+    parser.add_argument("--height", type=int, default=DEFAULT_SIZE[1])
+    parser.add_argument("--fps", type=float, default=0.0, help="pace output (0 = as fast as possible)")
+    parser.add_argument("--noise", type=float, default=6.0, help="gaussian noise sigma")
+    parser.add_argument("--scale-jitter", type=float, default=0.02)
+    parser.add_argument("--overlap", type=float, default=0.15, help="share of each hand card covered")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--benchmark", action="store_true", help="run detection_benchmark on the output")
+    args = parser.parse_args()
+
+    table = SyntheticTable(args.width, args.height, args.noise, args.scale_jitter, args.overlap, seed=args.seed)
+    write_dataset(table, args.count, args.out, args.fps)
+    if args.benchmark:
+        import detection_benchmark
+        results_path = os.path.join(args.out, 'benchmark.json')
+        code = detection_benchmark.main(["--frames", args.out, "--json", results_path])
+        with open(results_path) as f:
+            recall = {result['detector']: result['recall'] for result in json.load(f)}
+        if recall.get('template', 0.0) < MIN_BENCHMARK_RECALL:
+            print(f"❌ Synthetic recall {recall.get('template', 0.0):.3f} < {MIN_BENCHMARK_RECALL}: "
+                  f"the frames do not exercise the detector")
+            code = 1
+        sys.exit(code)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Backend modules are flat and read config.ini from the working directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.chdir(BACKEND_DIR)
@@ -0,0 +1,26 @@
+import numpy as np
+
+from batch_analysis import analyze_many, encode_hands, parity_mismatches, random_hands
+
+
+def test_random_two_deck_hands_match_per_hand_analysis():
+    hands, jokers = random_hands(3000, seed=7)
+    assert parity_mismatches(hands, jokers) == 0
+
+
+def test_duplicate_card_breaks_a_run_and_joker_completes_jacks():
+    hands, jokers = encode_hands([
+        ['5H', '6H', '6H', '7H', '2C', '9D', 'KS'],      # 5-6 | 6-7: no sequence
+        ['JS', 'JH', 'JK', '2C', '3C', '4C', '9D'],      # JK counts as a third suit
+    ])
+    result = analyze_many(hands, jokers)
+    assert result['sequences'].tolist() == [0, 1]
+    assert result['sets'].tolist() == [0, 1]
+    assert result['cards_in_melds'].tolist() == [0, 6]
+
+
+def test_parallel_chunks_match_single_pass():
+    hands, jokers = random_hands(1000, seed=3)
+    single = analyze_many(hands, jokers, workers=1)
+    parallel = analyze_many(hands, jokers, workers=2, chunk_size=300)
+    assert all(np.array_equal(single[key], parallel[key]) for key in single)
@@ -0,0 +1,38 @@
+from capture_scheduler import CaptureScheduler
+
+HAND = ['AS', '2S', '3S', '4H', '5H', '6H', '7D', '8D', '9D', '10C', 'JC', 'QC', 'KC']
+BRIGHT = 120.0
+
+
+def test_turn_follows_the_hand_size_and_discards():
+    scheduler = CaptureScheduler()
+    scheduler.observe(HAND, '5C', BRIGHT, now=0.0)
+    assert scheduler.turn is None                        # 13 cards alone say nothing yet
+    scheduler.observe(HAND + ['KH'], '5C', BRIGHT, now=1.0)
+    assert scheduler.turn == 'user'                      # drew a 14th card
+    scheduler.observe(HAND, 'KH', BRIGHT, now=2.0)
+    assert scheduler.turn == 'opponent'                  # discarded back to 13
+    scheduler.observe(HAND, 'KH', BRIGHT, now=3.0)
+    assert scheduler.turn == 'opponent'
+    scheduler.observe(HAND, '9H', BRIGHT, now=4.0)
+    assert scheduler.turn == 'user'                      # opponent's discard landed
+
+
+def test_misdetected_hand_sizes_leave_the_turn_alone():
+    scheduler = CaptureScheduler()
+    scheduler.observe(HAND + ['KH'], '5C', BRIGHT, now=0.0)
+    scheduler.observe(HAND, 'KH', BRIGHT, now=1.0)
+    scheduler.observe(HAND[:11], '9H', BRIGHT, now=2.0)
+    assert scheduler.turn == 'opponent'
+
+
+def test_mode_slows_down_on_an_unchanged_opponent_turn():
+    scheduler = CaptureScheduler(fast_hold=4.0)
+    scheduler.observe(HAND + ['KH'], '5C', BRIGHT, now=0.0)
+    assert scheduler.mode == 'fast'
+    scheduler.observe(HAND, 'KH', BRIGHT, now=1.0)
+    assert scheduler.mode == 'fast'                      # fresh change
+    scheduler.observe(HAND, 'KH', BRIGHT, now=10.0)
+    assert scheduler.mode == 'normal' and scheduler.interval() == 1.0
+    assert scheduler.observe(HAND, 'KH', 3.0, now=11.0) == 'screen_off'
+    assert scheduler.observe(HAND, 'KH', BRIGHT, now=12.0, game_state={'game_phase': 'finished'}) == 'results'
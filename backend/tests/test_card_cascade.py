@@ -0,0 +1,35 @@
+import cv2
+
+import mobile_card_detection as m
+from card_cascade import CardCascade
+from synthetic_frames import SyntheticTable
+from warm_start import detection_rois
+
+
+def _discard_roi(label_index: int):
+    frame, label = SyntheticTable(noise=0.0).render(label_index)
+    _, (y0, y1, x0, x1) = detection_rois(*frame.shape[:2])
+    return frame[y0:y1, x0:x1], label['discard']
+
+
+def _names(kept):
+    return {name for name, _ in kept}
+
+
+def test_cascade_keeps_the_card_on_screen():
+    bank = m.load_card_templates()
+    cascade = CardCascade()
+    for index in range(4):
+        roi, discard = _discard_roi(index)
+        scaled = bank.scaled(roi.shape[:2])
+        assert discard in _names(cascade.prune(roi, scaled))
+
+
+def test_cascade_drops_suits_without_matching_ink():
+    bank = m.load_card_templates()
+    cascade = CardCascade()
+    roi, _ = _discard_roi(0)
+    grey = cv2.cvtColor(cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR)
+    kept = _names(cascade.prune(grey, bank.scaled(grey.shape[:2])))
+    assert 'KH' not in kept and 'QD' not in kept
+    assert cascade.report()['colour']['rejected'] > 0
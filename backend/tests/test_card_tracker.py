@@ -0,0 +1,57 @@
+from agent_controller import AgentController
+from card_tracker import CardTracker
+from event_store import EventStore
+
+HAND = ['2S', '3S', '4S', '7H', '8H', '9H', 'JD', 'QD', 'KD', '5C', '5S', '5H', 'AC']
+
+
+def _tracker_after_user_discard():
+    tracker = CardTracker()
+    tracker.update_from_frame(HAND, '9C', 'user')
+    tracker.update_from_frame(HAND + ['6D'], '9C', 'user')       # drew from the deck
+    tracker.update_from_frame(HAND, '6D', 'opponent')            # discarded it
+    return tracker
+
+
+def test_opponent_taking_the_top_is_recorded_as_a_pick():
+    tracker = _tracker_after_user_discard()
+    tracker.update_from_frame(HAND, '9C', 'opponent')            # 6D gone, 9C showing again
+    assert tracker.opponent_interest('6D') == {'picked': 1, 'ignored': 0}
+    assert tracker.discard_pile == [tracker.discard_pile[0]]
+
+
+def test_opponent_covering_the_top_lets_it_pass():
+    tracker = _tracker_after_user_discard()
+    tracker.update_from_frame(HAND, 'KC', 'opponent')
+    assert tracker.opponent_interest('6D') == {'picked': 0, 'ignored': 1}
+
+
+def test_own_pick_from_discard_is_not_an_opponent_pick():
+    tracker = CardTracker()
+    tracker.update_from_frame(HAND, '9C', 'user')
+    tracker.update_from_frame(HAND, 'KC', 'opponent')
+    tracker.update_from_frame(HAND + ['KC'], '9C', 'user')
+    assert tracker.opponent_interest('KC')['picked'] == 0
+
+
+def test_discard_dropout_does_not_count_the_card_twice():
+    tracker = CardTracker()
+    tracker.update_from_frame(HAND, '9C', 'user')
+    remaining = tracker.remaining_count('9C')
+    tracker.update_from_frame(HAND, None, 'user')
+    tracker.update_from_frame(HAND, '9C', 'user')
+    assert tracker.remaining_count('9C') == remaining
+
+
+def test_suggestion_weighs_deck_odds_from_unseen_cards():
+    agent = AgentController(EventStore(':memory:'))
+    hand = ['2S', '9H', 'KD', '5C', 'AH', '7D']
+    agent.observe_frame(hand, 'QC')
+    fresh = agent.suggest_optimal_action(hand, [], ['QC'])
+    assert fresh['action'] == 'Pick from Deck' and fresh['draw_odds'] > 0
+    # Every helpful card already seen: the deck can no longer help
+    agent.card_tracker.remaining[:] = 0
+    agent.card_tracker.remaining[52] = agent.card_tracker.unseen_total = 4
+    drained = agent.suggest_optimal_action(hand, [], ['QC'])
+    assert drained['draw_odds'] == 0 and drained['confidence'] < fresh['confidence']
+
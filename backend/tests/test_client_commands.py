@@ -0,0 +1,100 @@
+import asyncio
+import json
+import pytest
+
+import mobile_card_detection as m
+from agent_controller import AgentController
+from event_store import EventStore
+
+
+class FakeSocket:
+    def __init__(self, *commands):
+        self.messages = [json.dumps(c) for c in commands]
+        self.sent = []
+
+    def __aiter__(self):
+        return self._messages()
+
+    async def _messages(self):
+        for message in self.messages:
+            yield message
+
+    async def send(self, data, text=None):
+        self.sent.append(json.loads(data))
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    agent = AgentController(EventStore(':memory:'))
+    for i in range(5):
+        agent.log_action('turn_change', {'i': i})
+    monkeypatch.setattr(m, 'agent', agent)
+    return agent
+
+
+def run(*commands, options=None):
+    socket = FakeSocket(*commands)
+    asyncio.run(m.read_client_commands(socket, options if options is not None else {'rate': 0, 'preview': True}))
+    return socket.sent
+
+
+def test_events_bad_paging_replies_with_error_and_keeps_reading(agent):
+    replies = run({'command': 'events', 'before': 'abc'}, {'command': 'events', 'limit': [1]},
+                  {'command': 'events', 'limit': 2})
+    assert [r['type'] for r in replies] == ['error', 'error', 'events']
+    assert len(replies[2]['payload']['events']) == 2
+
+
+def test_events_paging_is_clamped(agent):
+    replies = run({'command': 'events', 'limit': 10 ** 9, 'before': 10 ** 30}, {'command': 'events', 'limit': -3})
+    assert len(replies[0]['payload']['events']) == 5
+    assert len(replies[1]['payload']['events']) == 1
+
+
+def test_subscribe_rejects_bad_rate_and_keeps_the_last_one(agent):
+    options = {'rate': 2.0, 'preview': True}
+    replies = run({'command': 'subscribe', 'rate': 'fast'}, {'command': 'subscribe', 'rate': 'nan'},
+                  {'command': 'subscribe', 'rate': {'x': 1}}, options=options)
+    assert [r['type'] for r in replies] == ['error', 'error', 'error']
+    assert options['rate'] == 2.0
+
+
+def test_subscribe_clamps_negative_rate_to_unthrottled(agent):
+    options = {'rate': 2.0, 'preview': True}
+    run({'command': 'subscribe', 'rate': -5, 'preview': False}, options=options)
+    assert options == {'rate': 0.0, 'preview': False}
+
+
+def test_profile_rejects_bad_seconds_without_starting(agent):
+    replies = run({'command': 'profile', 'seconds': 'inf'}, {'command': 'profile', 'seconds': 'soon'})
+    assert [r['type'] for r in replies] == ['error', 'error']
+    assert not m.profiler.active
+
+
+def test_arrange_drags_the_latest_hand_into_its_melds(agent, monkeypatch):
+    from game_snapshot import GameSnapshot, SnapshotHub
+
+    hand = ['9C', '3H', 'KS', '4H', '5H', 'KD', '2C', 'KC', '7D', '8S', 'JD', 'QS', 'AH']
+    hub = SnapshotHub()
+    hub.publish(GameSnapshot(1, {'type': 'detection'}, detection={'cards': hand},
+                             melds=[['3H', '4H', '5H'], ['KS', 'KD', 'KC']]))
+    calls = []
+    monkeypatch.setattr(m, 'snapshot_hub', hub)
+    monkeypatch.setattr(m, 'frame_source', None)
+    monkeypatch.setattr(m, '_calibrated_shape', (1080, 2460, 3))
+    monkeypatch.setattr(m.conn_handler, 'swipe_sequence', lambda swipes: calls.append(swipes) or True)
+    reply, = run({'command': 'arrange'})
+    assert reply == {'type': 'arrange', 'payload': {'ok': True, 'moves': len(calls[0]), 'message': ''}}
+    assert 0 < len(calls[0]) < len(hand)
+    assert all(y1 == y2 == int(1080 * 0.8) for _, y1, _, y2 in calls[0])
+
+
+def test_arrange_refuses_a_partly_detected_hand(agent, monkeypatch):
+    from game_snapshot import GameSnapshot, SnapshotHub
+
+    hub = SnapshotHub()
+    hub.publish(GameSnapshot(1, {'type': 'detection'}, detection={'cards': ['AS', '2S']}))
+    monkeypatch.setattr(m, 'snapshot_hub', hub)
+    monkeypatch.setattr(m, 'frame_source', None)
+    reply, = run({'command': 'arrange'})
+    assert not reply['payload']['ok'] and '2 cards' in reply['payload']['message']
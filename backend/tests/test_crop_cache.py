@@ -0,0 +1,50 @@
+import numpy as np
+
+from crop_cache import CropClassificationCache, crop_hash
+
+
+def _crop(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (90, 60), dtype=np.uint8)
+
+
+def test_exact_hash_hits():
+    cache = CropClassificationCache()
+    cache.store(_crop(), 'QD', 0.9)
+    assert cache.lookup(_crop()) == 'QD'
+    assert cache.stats()['hits'] == 1
+
+
+def test_near_hash_within_max_distance_hits_the_nearest_card():
+    cache = CropClassificationCache(max_distance=6)
+    key = crop_hash(_crop())
+    cache.entries[key ^ 0b111] = 'QD'             # 3 bits away
+    cache.entries[key ^ (0xFF << 8)] = 'KH'       # 8 bits away
+    assert cache.lookup(_crop()) == 'QD'
+    assert next(reversed(cache.entries)) == key ^ 0b111   # refreshed in LRU order
+
+
+def test_equidistant_cards_are_ambiguous_and_far_ones_miss():
+    cache = CropClassificationCache(max_distance=6)
+    key = crop_hash(_crop())
+    cache.entries[key ^ 0b01] = 'QD'
+    cache.entries[key ^ 0b10] = 'KH'
+    assert cache.lookup(_crop()) is None
+    assert cache.ambiguous == 1
+    cache.entries.clear()
+    cache.entries[key ^ 0x7F] = 'QD'              # 7 bits away
+    assert cache.lookup(_crop()) is None
+    assert cache.misses == 1
+
+
+def test_low_scores_and_flat_crops_are_not_stored():
+    cache = CropClassificationCache(store_score=0.75)
+    cache.store(_crop(), 'QD', 0.5)
+    cache.store(np.full((90, 60), 128, np.uint8), 'KH', 0.99)
+    assert len(cache) == 0
+
+
+def test_capacity_evicts_least_recently_used():
+    cache = CropClassificationCache(capacity=2)
+    for seed, name in enumerate(['AS', 'KH', 'QD']):
+        cache.store(_crop(seed), name, 0.9)
+    assert sorted(cache.entries.values()) == ['KH', 'QD']
@@ -0,0 +1,11 @@
+from collections import defaultdict
+
+from detection_benchmark import score_frame
+
+
+def test_duplicate_cards_are_scored_per_copy():
+    counts = defaultdict(lambda: {'tp': 0, 'fp': 0, 'fn': 0})
+    score_frame(counts, ['7H', 'KS', 'KS', 'QD'], ['7H', '7H', 'KS', '2C'])
+    assert counts['7H'] == {'tp': 1, 'fp': 0, 'fn': 1}
+    assert counts['KS'] == {'tp': 1, 'fp': 1, 'fn': 0}
+    assert counts['QD']['fp'] == 1 and counts['2C']['fn'] == 1
@@ -0,0 +1,58 @@
+from agent_controller import AgentController
+from event_store import EventStore, MAX_PAGE_SIZE
+
+
+def _store(n, path=':memory:', recent=50):
+    store = EventStore(path, recent=recent)
+    for i in range(n):
+        store.append({'timestamp': i, 'action': 'turn_change' if i % 2 else 'ai_suggestion',
+                      'turn': 'user', 'round': 1, 'details': {'i': i}})
+    return store
+
+
+def test_event_store_opens_on_first_use(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    agent = AgentController()
+    assert not (tmp_path / 'events.db').exists()
+    agent.log_action('turn_change', {'turn': 'opponent'})
+    assert (tmp_path / 'events.db').exists() and agent.event_store.count == 1
+    agent.event_store.close()
+
+
+def test_pages_walk_newest_first_until_next_before_runs_out():
+    store = _store(12)
+    seen, before = [], None
+    while True:
+        page = store.query(before, 5)
+        seen += [event['details']['i'] for event in page['events']]
+        before = page['next_before']
+        if before is None:
+            break
+    assert seen == list(range(11, -1, -1))
+    assert page['total'] == 12
+
+
+def test_action_filter_and_limit_clamp():
+    store = _store(12)
+    page = store.query(None, 100, 'turn_change')
+    assert [event['details']['i'] for event in page['events']] == [11, 9, 7, 5, 3, 1]
+    assert page['next_before'] is None
+    assert len(store.query(None, 0)['events']) == 1
+    assert len(_store(MAX_PAGE_SIZE + 5).query(None, 10 ** 6)['events']) == MAX_PAGE_SIZE
+
+
+def test_recent_tail_survives_reopening(tmp_path):
+    path = str(tmp_path / 'events.db')
+    _store(8, path).close()
+    reopened = EventStore(path, recent=3)
+    assert [event['details']['i'] for event in reopened.recent_events()] == [5, 6, 7]
+    assert reopened.count == 8
+    reopened.close()
+
+
+def test_repeated_suggestion_is_logged_once():
+    agent = AgentController(EventStore(':memory:'))
+    hand = ['2S', '9H', 'KD', '5C', 'AH', '7D']
+    for _ in range(5):
+        agent.suggest_optimal_action(hand, [], [])
+    assert len(agent.event_store.query(None, 50, 'ai_suggestion')['events']) == 1
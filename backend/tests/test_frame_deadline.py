@@ -0,0 +1,55 @@
+from frame_deadline import FrameDeadline, StageCosts, LEVELS
+
+STAGES = ['detect', 'ocr', 'strategy', 'preview', 'serialize']
+
+
+def costs(**seconds):
+    stage_costs = StageCosts(smoothing=0.5, margin=1.0)
+    for stage, value in seconds.items():
+        stage_costs.observe(stage, value)
+    return stage_costs
+
+
+TYPICAL = dict(detect=0.10, ocr=0.05, strategy=0.01, preview=0.20, serialize=0.01, serialize_lite=0.005)
+
+
+def test_runs_full_when_everything_fits():
+    deadline = FrameDeadline(0.5, costs(**TYPICAL))
+    assert LEVELS[deadline.plan(STAGES)] == 'full'
+    assert deadline.allows('skip_ocr', 'ocr')
+
+
+def test_degrades_to_cheapest_level_that_fits():
+    deadline = FrameDeadline(0.2, costs(**TYPICAL))
+    # full 0.37, skip_ocr 0.32, low_detection 0.22 (detect_low unmeasured), reuse_strategy 0.21
+    assert LEVELS[deadline.plan(STAGES)] == 'skip_preview'
+    assert not deadline.allows('skip_preview', 'preview')
+
+
+def test_level_only_rises_within_a_frame():
+    deadline = FrameDeadline(0.2, costs(**TYPICAL))
+    deadline.plan(STAGES)
+    assert LEVELS[deadline.plan(['serialize'])] == 'skip_preview'
+
+
+def test_skipped_stage_estimate_relaxes():
+    stage_costs = costs(**TYPICAL)
+    deadline = FrameDeadline(0.0, stage_costs)
+    deadline.plan(STAGES)
+    deadline.allows('skip_preview', 'preview')
+    assert stage_costs.typical['preview'] < TYPICAL['preview']
+
+
+def test_budget_ignores_zero_capture_interval():
+    import mobile_card_detection as m
+
+    class PacedBySource:
+        capture_interval = 0.0   # replays and synthetic sources at fps 0
+
+    previous = m.frame_source
+    m.frame_source = PacedBySource()
+    try:
+        budget = m.new_deadline().budget
+    finally:
+        m.frame_source = previous
+    assert budget == m.DEADLINE_CONFIG['frame_budget_ms'] / 1000 > 0
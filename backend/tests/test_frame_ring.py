@@ -0,0 +1,33 @@
+import os
+import numpy as np
+import pytest
+
+from frame_ring import FrameRing, slot_capacity_for
+
+
+@pytest.fixture
+def ring():
+    ring = FrameRing(f"rmz_test_{os.getpid()}", slots=2, create=True)
+    yield ring
+    ring.close()
+
+
+def test_default_slots_hold_device_frames(ring):
+    frame = np.random.default_rng(0).integers(0, 255, (1080, 2460, 3), dtype=np.uint8)
+    seq = ring.write(frame)
+    assert np.array_equal(ring.get(seq).image, frame)
+
+
+def test_slot_capacity_follows_calibrated_shape():
+    assert slot_capacity_for((2160, 3840, 3)) == 2160 * 3840 * 3
+    assert slot_capacity_for(None) == slot_capacity_for((10, 10, 3))
+
+
+def test_oversized_frame_skips_only_the_ring(ring):
+    import mobile_card_detection as m
+    previous, m.frame_ring = m.frame_ring, ring
+    try:
+        m.share_frame(np.zeros((2000, 3000, 3), np.uint8))
+    finally:
+        m.frame_ring = previous
+    assert ring.last_seq == 0
@@ -0,0 +1,99 @@
+import numpy as np
+
+from frame_tracker import TemporalCardTracker
+
+SIZE = (50, 70)   # card w, h
+
+
+def _frame(cards, background=40):
+    """Grey frame with a noise-textured card at each (x, y); each card keeps its own texture"""
+    frame = np.full((400, 600), background, np.uint8)
+    for seed, (x, y) in cards.items():
+        frame[y:y + SIZE[1], x:x + SIZE[0]] = np.random.default_rng(seed).integers(0, 255, SIZE[::-1])
+    return frame
+
+
+class StubDetect:
+    def __init__(self, *detections):
+        self.detections = list(detections)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.detections
+
+
+def _det(name, x, y, region='hand'):
+    return (region, name, (x, y, *SIZE), 0.9)
+
+
+def test_a_card_needs_a_second_vote_before_it_is_reported():
+    tracker = TemporalCardTracker(full_every=5)
+    frame = _frame({1: (100, 200)})
+    detect = StubDetect(_det('7H', 100, 200))
+    assert tracker.update(frame, detect) == ([], [], True)
+    assert tracker.needs_full()                      # unconfirmed identity
+    hand, _, full = tracker.update(frame, detect)
+    assert hand == ['7H'] and full
+    assert tracker.tracks[('hand', '7H')].confidence == 0.7
+
+
+def test_confirmed_cards_are_followed_without_detection_until_the_schedule():
+    tracker = TemporalCardTracker(full_every=4)
+    detect = StubDetect(_det('7H', 100, 200), _det('KS', 300, 200))
+    frame = _frame({1: (100, 200), 2: (300, 200)})
+    tracker.update(frame, detect)
+    tracker.update(frame, detect)
+    moved = _frame({1: (104, 203), 2: (300, 200)})
+    for _ in range(3):
+        hand, _, full = tracker.update(moved, detect)
+        assert hand == ['7H', 'KS'] and not full
+    assert detect.calls == 2
+    assert tracker.tracks[('hand', '7H')].box[:2] == (104, 203)
+    assert tracker.needs_full()                      # frames_since_full + 1 reaches full_every
+    assert tracker.update(moved, detect)[2] and detect.calls == 3
+
+
+def test_single_hit_is_dropped_and_confirmed_cards_fade_gradually():
+    tracker = TemporalCardTracker(full_every=1)
+    frame = _frame({1: (100, 200), 2: (300, 200)})
+    tracker.update(frame, StubDetect(_det('7H', 100, 200)))
+    tracker.update(frame, StubDetect(_det('7H', 100, 200), _det('QD', 300, 200)))
+    hand, _, _ = tracker.update(frame, StubDetect(_det('7H', 100, 200)))
+    assert ('hand', 'QD') not in tracker.tracks      # seen once, then missed: a false match
+    assert hand == ['7H']
+
+    empty = StubDetect()
+    confidences = []
+    while ('hand', '7H') in tracker.tracks:
+        hand, _, _ = tracker.update(frame, empty)
+        track = tracker.tracks.get(('hand', '7H'))
+        confidences.append((hand, round(track.confidence, 3) if track else None))
+    assert confidences[0] == (['7H'], 0.637)        # one miss does not remove a confirmed card
+    assert confidences[1][0] == []                   # below show_confidence: tracked, not reported
+    assert confidences[-1] == ([], None)             # finally dropped below drop_confidence
+
+
+def test_scene_change_resets_tracks_and_trusts_the_new_detection():
+    tracker = TemporalCardTracker(full_every=10)
+    detect = StubDetect(_det('7H', 100, 200))
+    frame = _frame({1: (100, 200)})
+    tracker.update(frame, detect)
+    tracker.update(frame, detect)
+    new_screen = _frame({3: (250, 100)}, background=200)
+    hand, _, full = tracker.update(new_screen, StubDetect(_det('AS', 250, 100)))
+    assert full and hand == ['AS']                   # reported at once, no second vote
+    assert list(tracker.tracks) == [('hand', 'AS')]
+    assert tracker.scene_changes == 1
+
+
+def test_lost_track_forces_the_next_full_detection():
+    tracker = TemporalCardTracker(full_every=10)
+    detect = StubDetect(_det('7H', 100, 200), _det('KS', 300, 200, 'discard'))
+    frame = _frame({1: (100, 200), 2: (300, 200)})
+    tracker.update(frame, detect)
+    tracker.update(frame, detect)
+    covered = _frame({1: (100, 200), 5: (300, 200)})  # another card now lies on the discard
+    hand, discard, full = tracker.update(covered, detect)
+    assert not full and hand == ['7H']
+    assert tracker.lost and tracker.needs_full()
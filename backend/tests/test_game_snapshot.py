@@ -0,0 +1,42 @@
+import json
+import pytest
+
+from game_snapshot import GameSnapshot
+
+
+def _snapshot():
+    payload = {'type': 'game_update', 'payload': {'hand': ['AS', '2S'], 'framePreview': 'abc',
+                                                  'melds': [['AS', '2S', '3S']]}}
+    return GameSnapshot(1, payload, detection={'hand': ['AS', '2S'], 'boxes': [{'x': 1}]},
+                        analysis={'sequences': [{'cards': ['AS']}]}, melds=[['AS', '2S', '3S']])
+
+
+def test_nested_structures_are_read_only():
+    snapshot = _snapshot()
+    with pytest.raises(AttributeError):
+        snapshot.payload['payload']['hand'].append('KH')
+    with pytest.raises(AttributeError):
+        snapshot.detection['hand'].append('KH')
+    with pytest.raises(TypeError):
+        snapshot.detection['boxes'][0]['x'] = 2
+    with pytest.raises(TypeError):
+        snapshot.analysis['sequences'][0]['cards'] += ('KH',)
+    with pytest.raises(AttributeError):
+        snapshot.payload = {}
+
+
+def test_caller_mutation_after_build_does_not_leak_in():
+    payload = {'type': 'game_update', 'payload': {'hand': ['AS']}}
+    snapshot = GameSnapshot(1, payload)
+    payload['payload']['hand'].append('KH')
+    assert snapshot.payload['payload']['hand'] == ('AS',)
+    assert json.loads(snapshot.payload_bytes)['payload']['hand'] == ['AS']
+
+
+def test_lite_payload_drops_only_the_preview_and_is_encoded_once():
+    snapshot = _snapshot()
+    lite = snapshot.bytes_for(preview=False)
+    assert json.loads(lite) == {'type': 'game_update',
+                                'payload': {'hand': ['AS', '2S'], 'melds': [['AS', '2S', '3S']]}}
+    assert snapshot.bytes_for(preview=False) is lite
+    assert snapshot.bytes_for(preview=True) is snapshot.payload_bytes
@@ -0,0 +1,49 @@
+import random
+
+from hand_arranger import plan_moves, target_order, moves_to_swipes
+
+
+def _apply(order, moves):
+    hand = list(order)
+    for src, dst, card in moves:
+        assert hand[src] == card
+        hand.insert(dst, hand.pop(src))
+    return hand
+
+
+def _lis_length(values):
+    best = []
+    for i, value in enumerate(values):
+        best.append(1 + max((best[j] for j in range(i) if values[j] < value), default=0))
+    return max(best, default=0)
+
+
+def test_arranged_hand_needs_no_moves():
+    hand = ['3H', '4H', '5H', 'KS', 'KD', 'KC', '9C']
+    assert plan_moves(hand, [['3H', '4H', '5H'], ['KS', 'KD', 'KC']]) == []
+
+
+def test_moves_reach_the_meld_layout_with_the_fewest_drags():
+    rng = random.Random(5)
+    deck = [f"{r}{s}" for s in 'SHDC' for r in ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']]
+    for _ in range(200):
+        hand = rng.sample(deck, 13)
+        groups = [hand[i:i + 3] for i in (2, 7)]
+        rng.shuffle(groups[0])
+        target = target_order(hand, groups)
+        moves = plan_moves(hand, groups)
+        assert _apply(hand, moves) == target
+        assert len(moves) == 13 - _lis_length([target.index(card) for card in hand])
+
+
+def test_duplicate_cards_move_as_separate_instances():
+    hand = ['7S', '2D', '7S', '8S', '9S', '2D']
+    groups = [['7S', '8S', '9S']]
+    moves = plan_moves(hand, groups)
+    assert _apply(hand, moves) == target_order(hand, groups)
+    assert len(moves) == 2      # 2D and the second 7S; the first 7S, 8S and 9S stay
+
+
+def test_swipes_run_along_the_hand_strip():
+    swipes = moves_to_swipes([(0, 3, '7S')], 4, (1000, 500))
+    assert swipes == [(200, 400, 800, 400)]
@@ -0,0 +1,91 @@
+import asyncio
+import cv2
+import numpy as np
+import pytest
+from websockets.datastructures import Headers
+from websockets.http11 import Request
+
+import game_snapshot
+import mobile_card_detection as m
+from game_snapshot import GameSnapshot, SnapshotHub
+
+
+class Counting:
+    def __init__(self, fn):
+        self.fn = fn
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        return self.fn(*args, **kwargs)
+
+
+@pytest.fixture
+def hub(monkeypatch):
+    hub = SnapshotHub()
+    monkeypatch.setattr(m, 'snapshot_hub', hub)
+    frame = np.random.default_rng(0).integers(0, 255, (60, 80, 3), dtype=np.uint8)
+    payload = {'type': 'detection', 'payload': {'handCards': ['AS'], 'framePreview': 'abc'}}
+    hub.publish(GameSnapshot(7, payload, frame_bytes=cv2.imencode('.png', frame)[1].tobytes(), device='dev1'))
+    return hub
+
+
+def get(path, etag=None):
+    headers = Headers()
+    if etag:
+        headers['If-None-Match'] = etag
+    return asyncio.run(m.process_request(None, Request(path, headers)))
+
+
+@pytest.mark.parametrize('path', ['/state', '/state?preview=0', '/frame.jpg',
+                                  '/devices/dev1/state', '/devices/dev1/frame.jpg'])
+def test_matching_etag_gets_304_without_a_body(hub, path):
+    first = get(path)
+    assert first.status_code == 200 and first.body
+    again = get(path, first.headers['ETag'])
+    assert again.status_code == 304 and again.body == b''
+    assert again.headers['ETag'] == first.headers['ETag']
+
+
+def test_polling_encodes_the_jpeg_and_lite_payload_once(hub, monkeypatch):
+    imencode = Counting(cv2.imencode)
+    encode = Counting(game_snapshot.encode_timed)
+    monkeypatch.setattr(cv2, 'imencode', imencode)
+    monkeypatch.setattr(game_snapshot, 'encode_timed', encode)
+    etag = None
+    for _ in range(3):
+        etag = get('/frame.jpg', etag).headers['ETag']
+        get('/frame.jpg')
+        get('/state?preview=0', get('/state?preview=0').headers['ETag'])
+    assert imencode.calls == 1
+    assert encode.calls == 1          # the lite payload; the full one was encoded at build time
+
+
+def test_lite_and_full_state_have_distinct_etags(hub):
+    assert get('/state').headers['ETag'] != get('/state?preview=0').headers['ETag']
+    assert get('/state', get('/state?preview=0').headers['ETag']).status_code == 200
+
+
+def test_unknown_device_and_new_snapshot(hub):
+    assert get('/devices/other/state').status_code == 404
+    etag = get('/state').headers['ETag']
+    hub.publish(GameSnapshot(8, {'type': 'detection', 'payload': {}}, device='dev1'))
+    assert get('/state', etag).status_code == 200
+
+
+def test_metrics_are_rendered_once_per_published_version(hub, monkeypatch):
+    render = Counting(m.metrics.render_text)
+    monkeypatch.setattr(m.metrics, 'render_text', render)
+    m.metrics._text_cache.clear()
+    first = get('/metrics')
+    assert first.status_code == 200
+    assert get('/metrics', first.headers['ETag']).status_code == 304
+    get('/metrics')
+    assert render.calls == 1
+
+
+@pytest.mark.parametrize('value', ['abc', 'nan', 'inf', '-inf'])
+def test_profile_rejects_non_finite_seconds(value, monkeypatch):
+    monkeypatch.setattr(m.profiler, 'start', lambda seconds: pytest.fail("profiler started"))
+    response = asyncio.run(m.profile_endpoint({'seconds': [value]}))
+    assert response.status_code == 400
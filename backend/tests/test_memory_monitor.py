@@ -0,0 +1,34 @@
+import asyncio
+import json
+
+import mobile_card_detection as m
+from memory_monitor import MemoryMonitor
+
+
+def test_over_budget_subsystem_is_evicted():
+    evicted = []
+    monitor = MemoryMonitor(crop_cache_mb=1e-6)
+    monitor.register('crop_cache', lambda: 0 if evicted else 4096, lambda: evicted.append(True))
+    warnings = monitor.check()
+    assert evicted and warnings[0]['subsystem'] == 'crop_cache' and warnings[0]['afterBytes'] == 0
+
+
+def _no_check(now=None):
+    raise AssertionError("only the capture loop may run a check")
+
+
+def test_endpoint_only_requests_a_check(monkeypatch):
+    monitor = MemoryMonitor(interval=3600)
+    monkeypatch.setattr(monitor, 'check', _no_check)
+    monkeypatch.setattr(m, 'memory_monitor', monitor)
+    assert not monitor.due()
+    response = asyncio.run(m.memory_endpoint({'check': ['1']}))
+    assert json.loads(response.body)['checkPending']
+    assert monitor.due()
+
+
+def test_check_clears_the_request():
+    monitor = MemoryMonitor(interval=3600)
+    monitor.request_check()
+    monitor.check()
+    assert not monitor.due() and not monitor.report()['checkPending']
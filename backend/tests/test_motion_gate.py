@@ -0,0 +1,36 @@
+import numpy as np
+
+from motion_gate import MotionGate
+
+ROIS = [(0, 80, 0, 160), (100, 160, 40, 120)]
+
+
+def _frame(seed):
+    return np.random.default_rng(seed).integers(0, 255, (160, 160, 3), dtype=np.uint8)
+
+
+def test_motion_holds_detection_until_the_table_settles():
+    gate = MotionGate(stable_frames=2, max_hold=10)
+    assert gate.observe(_frame(0), ROIS)            # first frame: nothing to compare
+    assert gate.observe(_frame(0), ROIS) and not gate.settled
+    assert not gate.observe(_frame(1), ROIS)        # cards moved
+    assert not gate.observe(_frame(1), ROIS)        # one still frame, two needed
+    assert gate.observe(_frame(1), ROIS) and gate.settled
+    assert gate.observe(_frame(1), ROIS) and not gate.settled
+    assert gate.held_frames == 2
+
+
+def test_small_changes_are_not_motion():
+    gate = MotionGate(pixel_delta=18)
+    frame = _frame(0)
+    gate.observe(frame, ROIS)
+    assert gate.observe(np.clip(frame.astype(int) + 10, 0, 255).astype(np.uint8), ROIS)
+    assert gate.motion == 0.0
+
+
+def test_endless_animation_is_processed_every_max_hold_frames():
+    gate = MotionGate(stable_frames=1, max_hold=3)
+    gate.observe(_frame(0), ROIS)
+    runs = [gate.observe(_frame(seed), ROIS) for seed in range(1, 9)]
+    assert runs == [False, False, False, True, False, False, False, True]
+    assert gate.forced == 2 and not gate.settled
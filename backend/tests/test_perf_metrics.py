@@ -0,0 +1,75 @@
+import re
+
+from perf_metrics import PipelineMetrics, RollingHistogram
+
+
+def _metrics():
+    metrics = PipelineMetrics()
+    metrics.record('detect', 0.02, 'dev1')
+    metrics.record_frame(13, 0.9, 'dev1')
+    metrics.record_degradation('skip_preview', overran=True, device='dev1')
+    return metrics
+
+
+def test_overruns_counter_is_declared_once_before_its_samples():
+    text = _metrics().render_text()
+    lines = text.splitlines()
+    declared = lines.index('# TYPE rmz_deadline_overruns_total counter')
+    sample = next(i for i, line in enumerate(lines) if line.startswith('rmz_deadline_overruns_total{'))
+    assert declared < sample
+    assert lines[sample] == 'rmz_deadline_overruns_total{device="dev1"} 1'
+    assert text.count('# TYPE rmz_deadline_overruns_total') == 1
+
+
+def _undeclared(text):
+    declared, missing = set(), []
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            declared.add(line.split()[2])
+        else:
+            family = re.match(r'[a-z_]+', line).group()
+            if not any(family == name or family.startswith(name + '_') for name in declared):
+                missing.append(family)
+    return missing
+
+
+def test_serialization_counters_are_declared():
+    metrics = _metrics()
+    metrics.record_encode('game_update', 0.003, 1200)
+    metrics.record_delivery('game_update', 3)
+    text = metrics.render_text()
+    assert 'rmz_message_deliveries_total{type="game_update"} 3' in text
+    assert not [f for f in _undeclared(text) if 'serialize' in f or 'deliveries' in f]
+
+
+def test_memory_gauges_and_evictions_are_declared():
+    from memory_monitor import MemoryMonitor
+
+    monitor = MemoryMonitor(tracker_mb=1e-6)
+    monitor.register('tracker', lambda: 4096, lambda: None)
+    monitor.check()
+    metrics = _metrics()
+    metrics.record_memory(monitor.report())
+    text = metrics.render_text()
+    assert 'rmz_memory_evictions_total{subsystem="tracker"} 1' in text
+    assert _undeclared(text) == []
+
+
+def test_rendering_survives_stages_and_devices_added_mid_iteration(monkeypatch):
+    metrics = _metrics()
+    metrics.record('ocr', 0.01, 'dev1')
+    original = RollingHistogram.quantiles
+    added = []
+
+    def quantiles_while_capturing(hist):
+        # What the capture thread does between two steps of the event loop's iteration
+        metrics.record(f'stage{len(added)}', 0.001, 'dev1')
+        metrics.record('detect', 0.001, f'dev{len(added) + 2}')
+        metrics.record_degradation(f'mode{len(added)}', device='dev1')
+        added.append(hist)
+        return original(hist)
+
+    monkeypatch.setattr(RollingHistogram, 'quantiles', quantiles_while_capturing)
+    assert 'rmz_frames_total{device="dev1"} 1' in metrics.render_text()
+    assert metrics.summary('dev1')['totalFrames'] == 1
+    assert metrics.maybe_publish(interval=0.0)
@@ -0,0 +1,79 @@
+import json
+import pytest
+
+from session_archive import SessionRecorder, SessionArchive, _record_directory
+
+
+def _write(path, start, count, append=False):
+    recorder = SessionRecorder(str(path), chunk_records=4, append=append)
+    for i in range(start, start + count):
+        recorder.append(i * 0.1, f"frame{i}".encode(), json.dumps({'i': i}).encode())
+    recorder.close()
+
+
+def test_round_trip_through_background_writer(tmp_path):
+    path = tmp_path / "session.rmz"
+    _write(path, 0, 10)
+    archive = SessionArchive(str(path))
+    assert len(archive) == 10
+    assert archive.read(7) == (pytest.approx(0.7), b"frame7", b'{"i": 7}')
+    archive.close()
+
+
+def test_existing_archive_is_refused_unless_appending(tmp_path):
+    path = tmp_path / "session.rmz"
+    _write(path, 0, 6)
+    with pytest.raises(FileExistsError):
+        SessionRecorder(str(path))
+    _write(path, 6, 5, append=True)
+    archive = SessionArchive(str(path))
+    assert len(archive) == 11
+    assert [archive.read(i)[1] for i in (0, 5, 6, 10)] == [b"frame0", b"frame5", b"frame6", b"frame10"]
+    archive.close()
+
+
+def test_pack_orders_frames_naturally(tmp_path):
+    frames = tmp_path / "frames"
+    frames.mkdir()
+    for n in (10, 2, 1):
+        (frames / f"frame_{n}.png").write_bytes(f"png{n}".encode())
+    path = tmp_path / "packed.rmz"
+    _record_directory(str(frames), str(path), fps=10)
+    archive = SessionArchive(str(path))
+    assert [json.loads(archive.read(i)[2])['source'] for i in range(3)] == \
+        ["frame_1.png", "frame_2.png", "frame_10.png"]
+    archive.close()
+
+
+class FlakyFile:
+    """File wrapper whose writes fail while `failing` is set, after writing part of the data"""
+
+    def __init__(self, file):
+        self.file = file
+        self.failing = False
+
+    def write(self, data):
+        if self.failing:
+            self.file.write(data[:3])
+            raise OSError("disk full")
+        return self.file.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def test_failed_chunk_leaves_no_gap_in_the_numbering(tmp_path):
+    path = tmp_path / "session.rmz"
+    recorder = SessionRecorder(str(path), chunk_records=2)
+    recorder.file = FlakyFile(recorder.file)
+    for i in range(6):
+        recorder.file.failing = i in (2, 3)          # the second chunk fails
+        recorder.append(i * 0.1, f"frame{i}".encode(), b'')
+        recorder.writer.submit(lambda: None).result()  # let the writer finish this chunk first
+    recorder.file.failing = False
+    recorder.close()
+    archive = SessionArchive(str(path))
+    assert len(archive) == 4 and recorder.lost == 2
+    assert [archive.read(i)[1] for i in range(4)] == [b"frame0", b"frame1", b"frame4", b"frame5"]
+    assert [entry[4] for entry in archive.index] == [0, 2]
+    archive.close()
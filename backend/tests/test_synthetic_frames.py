@@ -0,0 +1,32 @@
+from collections import Counter
+
+import mobile_card_detection as m
+from synthetic_frames import SyntheticTable
+from warm_start import detection_rois
+
+
+def test_cards_are_dealt_inside_the_detection_rois():
+    table = SyntheticTable(noise=0.0)
+    frame, _ = table.render(0)
+    (hy0, hy1, hx0, hx1), (dy0, dy1, dx0, dx1) = detection_rois(*frame.shape[:2])
+    felt = table.background
+    changed = (frame != felt).any(axis=2)
+    hand_area = changed[hy0:hy1, hx0:hx1].sum()
+    discard_area = changed[dy0:dy1, dx0:dx1].sum()
+    assert hand_area > 0 and discard_area > 0
+    # Nothing but the deck and cut joker lies outside the two ROIs
+    changed[hy0:hy1, hx0:hx1] = changed[dy0:dy1, dx0:dx1] = False
+    assert changed.sum() < discard_area * 3
+
+
+def test_template_detector_finds_synthetic_cards():
+    table = SyntheticTable()
+    templates = m.load_card_templates()
+    found = expected = 0
+    for index in range(3):
+        frame, label = table.render(index)
+        hand, discard = m.detect_cards(frame, templates)
+        assert label['discard'] in discard
+        expected += len(label['hand'])
+        found += sum((Counter(hand) & Counter(label['hand'])).values())
+    assert found / expected > 0.5
@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import threading
+import configparser
+import cv2
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional
+
+WARM_CACHE_DIR = '.warm_cache'
+TEMPLATE_CACHE = 'templates.npz'
+CALIBRATION_FILE = 'calibration.json'
+CONFIG_FILE = 'config.ini'
+TEMPLATE_SCALE = 0.3   # template width as a share of the ROI, as used by match_card_templates
+DEFAULT_BUDGETS = {
+    'import_ms': 800.0,         # process start -> all modules imported
+    'ready_ms': 1500.0,         # process start -> templates warm and server accepting clients
+    'first_frame_ratio': 1.5    # first frame time / steady-state median frame time
+}
+_MODULE_LOADED = time.perf_counter()
+
+
+def process_uptime() -> float:
+    """Seconds since this process started, interpreter start-up included where /proc is available"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter() - _MODULE_LOADED
+
+
+class StartupTimer:
+    """Milestones (ms since process start) recorded the first time each is reached"""
+
+    def __init__(self):
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> float:
+        if name not in self.marks:
+            self.marks[name] = process_uptime() * 1000
+        return self.marks[name]
+
+    def report(self) -> str:
+        return " | ".join(f"{name} {ms:.0f} ms" for name, ms in self.marks.items())
+
+
+startup = StartupTimer()
+
+
+def load_budgets(path: str = CONFIG_FILE) -> Dict[str, float]:
+    """Start-up budgets from the [STARTUP] section of config.ini"""
+    budgets = dict(DEFAULT_BUDGETS)
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if parser.has_section('STARTUP'):
+        for key in budgets:
+            if parser.has_option('STARTUP', key):
+                budgets[key] = parser.getfloat('STARTUP', key)
+    return budgets
+
+
+def _source_signature(template_dir: str) -> str:
+    entries = []
+    for name in sorted(os.listdir(template_dir)):
+        if name.endswith('.png'):
+            stat = os.stat(os.path.join(template_dir, name))
+            entries.append(f"{name}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "|".join(entries)
+
+
+def detection_rois(h, w):
+    """(y0, y1, x0, x1) of the hand and discard ROIs for a frame of this size"""
+    hand = (int(h*0.7), int(h*0.9), int(w*0.1), int(w*0.9))
+    discard = (int(h*0.4), int(h*0.6), int(w*0.4), int(w*0.6))
+    return hand, discard
+
+
+def template_size(template_shape, roi_shape) -> Tuple[int, int]:
+    """(width, height) a template is resized to for an ROI of this shape"""
+    h, w = template_shape[:2]
+    scale = min(roi_shape[1] / w, roi_shape[0] / h) * TEMPLATE_SCALE
+    return int(w * scale), int(h * scale)
+
+
+class TemplateBank(dict):
+    """Grayscale card templates plus their per-ROI resized variants.
+
+    Both are compiled once and written to the warm-start cache, so a restarted
+    process matches its first frame with the same prepared templates as its last.
+    """
+
+    def __init__(self, templates: Dict[str, np.ndarray] = None, signature: str = '',
+                 cache_path: Optional[str] = None):
+        super().__init__()
+        for name, template in (templates or {}).items():
+            self[name] = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY) if template.ndim == 3 else template
+        self.signature = signature
+        self.cache_path = cache_path
+        self.scaled_sets: Dict[Tuple[int, int], List[Tuple[str, np.ndarray]]] = {}
+        self.coarse_cache: Dict = {}   # downsampled templates for the coarse-to-fine matcher
+        self.lock = threading.Lock()
+
+    def scaled(self, roi_shape) -> List[Tuple[str, np.ndarray]]:
+        """Templates resized for an ROI of this shape (computed once per shape)"""
+        key = (int(roi_shape[0]), int(roi_shape[1]))
+        if key not in self.scaled_sets:
+            with self.lock:
+                if key not in self.scaled_sets:
+                    resized = []
+                    for name, gray in self.items():
+                        new_w, new_h = template_size(gray.shape, key)
+                        if new_w > 0 and new_h > 0:
+                            resized.append((name, cv2.resize(gray, (new_w, new_h))))
+                    self.scaled_sets[key] = resized
+                    if self.cache_path:
+                        self.save(self.cache_path)
+        return self.scaled_sets[key]
+
+    def nbytes(self) -> int:
+        """Bytes of the grey templates, every resized set and the coarse-matcher downsamples"""
+        total = sum(gray.nbytes for gray in self.values())
+        total += sum(image.nbytes for resized in self.scaled_sets.values() for _, image in resized)
+        return total + sum(getattr(image, 'nbytes', 0) for image in self.coarse_cache.values())
+
+    def trim(self, keep_shapes=()):
+        """Drop resized sets for ROI shapes not in keep_shapes and all coarse downsamples (rebuilt on use)"""
+        keep = {(int(shape[0]), int(shape[1])) for shape in keep_shapes}
+        with self.lock:
+            self.scaled_sets = {key: resized for key, resized in self.scaled_sets.items() if key in keep}
+            self.coarse_cache.clear()
+
+    def save(self, path: str):
+        arrays = {f"g:{name}": gray for name, gray in self.items()}
+        for (h, w), resized in self.scaled_sets.items():
+            arrays.update({f"s:{h}x{w}:{name}": image for name, image in resized})
+        arrays['signature'] = np.array(self.signature)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, signature: str) -> Optional['TemplateBank']:
+        """Cached bank, or None if it is missing or was built from different template files"""
+        try:
+            with np.load(path) as data:
+                if str(data['signature']) != signature:
+                    return None
+                bank = cls(signature=signature, cache_path=path)
+                for key in data.files:
+                    if key.startswith('g:'):
+                        bank[key[2:]] = data[key]
+                    elif key.startswith('s:'):
+                        _, shape, name = key.split(':', 2)
+                        h, w = map(int, shape.split('x'))
+                        bank.scaled_sets.setdefault((h, w), []).append((name, data[key]))
+                return bank
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+def load_template_bank(template_dir: str, cache_dir: str = WARM_CACHE_DIR) -> TemplateBank:
+    """Templates from the warm-start cache, rebuilt from the PNGs when those have changed"""
+    if not os.path.exists(template_dir):
+        return TemplateBank()
+    signature = _source_signature(template_dir)
+    cache_path = os.path.join(cache_dir, TEMPLATE_CACHE)
+    bank = TemplateBank.load(cache_path, signature)
+    if bank is not None:
+        return bank
+    templates = {}
+    for name in sorted(os.listdir(template_dir)):
+        if name.endswith('.png'):
+            template = cv2.imread(os.path.join(template_dir, name))
+            if template is not None:
+                templates[name[:-4]] = template
+    bank = TemplateBank(templates, signature, cache_path)
+    bank.save(cache_path)
+    return bank
+
+
+def load_calibration(device_id: str, cache_dir: str = WARM_CACHE_DIR) -> Dict[str, Any]:
+    """Last calibration (screen size, frame shape) stored for a device"""
+    try:
+        with open(os.path.join(cache_dir, CALIBRATION_FILE)) as f:
+            return json.load(f).get(device_id or 'default', {})
+    except (OSError, ValueError):
+        return {}
+
+
+def save_calibration(device_id: str, cache_dir: str = WARM_CACHE_DIR, **values):
+    path = os.path.join(cache_dir, CALIBRATION_FILE)
+    try:
+        with open(path) as f:
+            calibration = json.load(f)
+    except (OSError, ValueError):
+        calibration = {}
+    entry = calibration.setdefault(device_id or 'default', {})
+    entry.update(values, updated=int(time.time()))
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(calibration, f, indent=1)
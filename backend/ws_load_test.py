@@ -0,0 +1,173 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import resource
+import subprocess
+from typing import Dict, List, Any, Optional
+import websockets
+
+DEFAULT_URI = "ws://localhost:8787"
+RATE_CHOICES = [0, 0, 1, 2, 5]        # detection messages/s requested per client (0 = every frame)
+PREVIEW_RATIO = 0.25                  # share of clients that ask for framePreview
+
+
+class LoadStats:
+    """Counters shared by every simulated client"""
+
+    def __init__(self):
+        self.connected = 0
+        self.failed = 0
+        self.dropped = 0
+        self.messages = 0
+        self.bytes = 0
+        self.latencies: List[float] = []
+
+    def percentiles(self) -> Dict[str, float]:
+        if not self.latencies:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        ordered = sorted(self.latencies)
+        last = len(ordered) - 1
+        return {f"p{q}": ordered[min(last, len(ordered) * q // 100)] for q in (50, 95, 99)}
+
+
+def raise_fd_limit(clients: int):
+    """Thousands of sockets need more than the default 1024 descriptors"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = min(hard, max(soft, clients + 256))
+    if wanted > soft:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (wanted, hard))
+
+
+def sample_process(pid: int, previous: Optional[tuple] = None) -> Dict[str, Any]:
+    """CPU% since the previous sample and RSS of the server process, read from /proc"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu_ticks = int(fields[11]) + int(fields[12])
+        with open(f"/proc/{pid}/statm") as f:
+            rss_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return {'cpu_percent': None, 'rss_mb': None, 'raw': None}
+    now = time.monotonic()
+    cpu = None
+    if previous:
+        ticks, then = previous
+        cpu = 100 * (cpu_ticks - ticks) / os.sysconf('SC_CLK_TCK') / max(now - then, 1e-6)
+    return {
+        'cpu_percent': cpu,
+        'rss_mb': rss_pages * os.sysconf('SC_PAGE_SIZE') / 1e6,
+        'raw': (cpu_ticks, now)
+    }
+
+
+async def run_client(uri: str, stats: LoadStats, deadline: float, rate: float, preview: bool):
+    try:
+        async with websockets.connect(uri, max_size=None, open_timeout=30) as ws:
+            stats.connected += 1
+            await ws.send(json.dumps({'command': 'subscribe', 'rate': rate, 'preview': preview}))
+            while time.time() < deadline:
+                try:
+                    message = await asyncio.wait_for(ws.recv(), timeout=max(0.1, deadline - time.time()))
+                except asyncio.TimeoutError:
+                    break
+                received = time.time() * 1000
+                stats.messages += 1
+                stats.bytes += len(message)
+                try:
+                    data = json.loads(message)
+                except ValueError:
+                    continue
+                sent = data.get('payload', {}).get('timestamp') if isinstance(data.get('payload'), dict) else None
+                if data.get('type') == 'detection' and sent:
+                    stats.latencies.append(received - sent)
+    except websockets.exceptions.ConnectionClosed:
+        stats.dropped += 1
+    except Exception:
+        stats.failed += 1
+
+
+async def run_load(uri: str, clients: int, duration: float, ramp: float,
+                   server_pid: Optional[int] = None, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    stats = LoadStats()
+    start = time.time()
+    deadline = start + ramp + duration
+    tasks = []
+    for i in range(clients):
+        rate = rng.choice(RATE_CHOICES)
+        preview = rng.random() < PREVIEW_RATIO
+        tasks.append(asyncio.create_task(run_client(uri, stats, deadline, rate, preview)))
+        if ramp > 0:
+            await asyncio.sleep(ramp / clients)
+
+    samples = []
+    previous = None
+    while time.time() < deadline:
+        if server_pid:
+            sample = sample_process(server_pid, previous)
+            previous = sample['raw']
+            if sample['cpu_percent'] is not None:
+                samples.append(sample)
+        print(f"⏱️ {time.time() - start:5.1f}s | connected {stats.connected} | failed {stats.failed} | "
+              f"messages {stats.messages}")
+        await asyncio.sleep(1)
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    elapsed = time.time() - start
+    return {
+        'clients': clients,
+        'connected': stats.connected,
+        'failed': stats.failed,
+        'dropped': stats.dropped,
+        'messages': stats.messages,
+        'messages_per_second': stats.messages / elapsed,
+        'mb_per_second': stats.bytes / elapsed / 1e6,
+        'latency_ms': stats.percentiles(),
+        'server_cpu_percent': max((s['cpu_percent'] for s in samples), default=None),
+        'server_rss_mb': max((s['rss_mb'] for s in samples), default=None)
+    }
+
+
+def spawn_replay_server(archive: str, speed: float) -> subprocess.Popen:
+    """Start the detection server on a looping replay so no device is needed"""
+    server = subprocess.Popen([sys.executable, 'mobile_card_detection.py', '--replay', archive,
+                               '--loop', '--speed', str(speed)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    time.sleep(3)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WebSocket fan-out load generator")
+    parser.add_argument("--uri", default=DEFAULT_URI)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to hold all clients")
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds to open all connections")
+    parser.add_argument("--server-pid", type=int, help="sample CPU/RSS of an already running server")
+    parser.add_argument("--spawn-replay", metavar="ARCHIVE", help="start a replay-backed server for the run")
+    parser.add_argument("--replay-speed", type=float, default=1.0)
+    args = parser.parse_args()
+
+    raise_fd_limit(args.clients)
+    server = spawn_replay_server(args.spawn_replay, args.replay_speed) if args.spawn_replay else None
+    pid = server.pid if server else args.server_pid
+    try:
+        result = asyncio.run(run_load(args.uri, args.clients, args.duration, args.ramp, pid))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    latency = result['latency_ms']
+    print(f"📊 {result['connected']}/{result['clients']} connected | failed {result['failed']} | "
+          f"dropped {result['dropped']}")
+    print(f"📨 {result['messages']} messages | {result['messages_per_second']:.1f} msg/s | "
+          f"{result['mb_per_second']:.2f} MB/s")
+    print(f"⏱️ publish->receive latency p50 {latency['p50']:.1f} ms | p95 {latency['p95']:.1f} ms | "
+          f"p99 {latency['p99']:.1f} ms")
+    if result['server_cpu_percent'] is not None:
+        print(f"🖥️ server peak CPU {result['server_cpu_percent']:.0f}% | peak RSS {result['server_rss_mb']:.1f} MB")